@@ -0,0 +1,33 @@
+"""Add move vectors job kind
+
+Revision ID: ee781fb440be
+Revises: 4499a3a13037
+Create Date: 2026-10-17 21:41:46.950068
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'ee781fb440be'
+down_revision = '4499a3a13037'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TYPE jobkind ADD VALUE IF NOT EXISTS 'MOVE_VECTORS'")
+
+
+def downgrade():
+    # Postgres cannot drop an enum value: rebuild the type without it
+    op.execute("DELETE FROM ingestionjob WHERE kind = 'MOVE_VECTORS'")
+    op.execute("ALTER TYPE jobkind RENAME TO jobkind_old")
+    sa.Enum('PROCESS_PDF', 'GENERATE_QUIZZES', name='jobkind').create(op.get_bind())
+    op.execute(
+        "ALTER TABLE ingestionjob ALTER COLUMN kind TYPE jobkind "
+        "USING kind::text::jobkind"
+    )
+    op.execute("DROP TYPE jobkind_old")
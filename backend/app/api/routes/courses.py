@@ -6,7 +6,8 @@ from http import HTTPStatus
 from random import shuffle
 from typing import Annotated, Any, cast
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import JSONResponse
 from sqlalchemy import desc
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import QueryableAttribute, selectinload
@@ -14,7 +15,6 @@ from sqlalchemy.sql import and_, text
 from sqlmodel import func, select
 
 from app.api.deps import CurrentUser, SessionDep
-from app.llm_clients.openai_client import INDEX_NAME
 from app.models.common import Message
 from app.models.course import (
     Course,
@@ -25,12 +25,12 @@ from app.models.course import (
 from app.models.document import Document
 from app.models.embeddings import Chunk
 from app.models.quizzes import Quiz, QuizSession
-from app.prompts.flashcards import PROMPT
 from app.schemas.internal import QuizFilterParams
 from app.schemas.public import (
     CoursePublic,
     CoursesPublic,
     DocumentPublic,
+    DocumentStatus,
     QuizChoice,
     QuizPublic,
     QuizSessionPublic,
@@ -38,11 +38,18 @@ from app.schemas.public import (
     QuizStats,
     QuizzesPublic,
 )
-from app.services.courses import generate_flashcards_from_text, get_retrieved_docs
+from app.services.flashcards import (
+    content_version,
+    enqueue_flashcards,
+    flashcards_pending,
+    get_deck,
+)
+from app.services.namespaces import course_namespaces, delete_course_vectors
 from app.tasks import (
     fetch_and_format_quizzes,
     select_quizzes_by_course_criteria,
 )
+from app.vector_stores import get_vector_store
 
 
 class CourseWithDocuments(CoursePublic):
@@ -154,9 +161,21 @@ def update_course(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def delete_course_vectors_task(course_id: uuid.UUID, namespaces: list[str | None]):
+    """Background task to drop a deleted course's vectors."""
+    try:
+        delete_course_vectors(get_vector_store(), course_id, namespaces)
+    except Exception as e:
+        logger.error(f"Failed to delete embeddings for course {course_id}: {e}")
+
+
 @router.delete("/{id}", response_model=Message)
 def delete_course(
-    *, session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    background_tasks: BackgroundTasks,
 ) -> Any:
     """
     Delete an course.
@@ -166,6 +185,9 @@ def delete_course(
         raise HTTPException(status_code=404, detail="Course not found")
     if not current_user.is_superuser and (course.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    background_tasks.add_task(
+        delete_course_vectors_task, id, course_namespaces(session, id)
+    )
     session.delete(course)
     session.commit()
     return {"message": "Course deleted successfully"}
@@ -423,16 +445,9 @@ def get_quiz_stats(
     )
 
 
-@router.get("/{id}/flashcards", response_model=list[QAItem])
-async def generate_flashcards_by_course_id(
-    id: uuid.UUID,
-    session: SessionDep,
-    current_user: CurrentUser,
-) -> list[QAItem]:
-    """
-    Generate flashcards for the most recent document associated with a course.
-    """
-
+def _latest_course_document(
+    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> Document:
     statement = (
         select(Course).where(Course.id == id).options(selectinload(Course.owner))
     )
@@ -457,20 +472,64 @@ async def generate_flashcards_by_course_id(
             status_code=HTTPStatus.NOT_FOUND,
             detail="No documents found for this course.",
         )
+    return document
 
-    try:
-        retrieved_texts = await get_retrieved_docs(
-            document_id=document.id, index_name=INDEX_NAME, query=PROMPT
-        )
-    except ConnectionError as exc:
-        raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail=str(exc))
 
-    if not retrieved_texts:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail="No relevant content found for flashcard generation.",
+@router.get(
+    "/{id}/flashcards",
+    response_model=list[QAItem],
+    responses={HTTPStatus.ACCEPTED: {"model": Message}},
+)
+def generate_flashcards_by_course_id(
+    id: uuid.UUID,
+    session: SessionDep,
+    current_user: CurrentUser,
+) -> Any:
+    """
+    Flashcards for the most recent document associated with a course.
+
+    Decks are generated by a background job when a document finishes
+    processing and served from the database; this endpoint never calls
+    the LLM or queues work. While the document is processing or its deck
+    job is waiting it answers 202; without a deck otherwise (the job failed
+    for good, or the document predates decks) it answers 404 and
+    POST /{id}/flashcards/regenerate queues one.
+    """
+    document = _latest_course_document(session, current_user, id)
+
+    version = content_version(session, document.id)
+    flashcards = get_deck(session, document.id, version) if version else None
+    if flashcards is not None:
+        return flashcards
+
+    if document.status in (
+        DocumentStatus.PENDING,
+        DocumentStatus.PROCESSING,
+    ) or flashcards_pending(session, document.id):
+        return JSONResponse(
+            status_code=HTTPStatus.ACCEPTED,
+            content=Message(message="Flashcards are being generated").model_dump(),
         )
+    raise HTTPException(
+        status_code=HTTPStatus.NOT_FOUND,
+        detail="No flashcards are available for this document.",
+    )
 
-    flashcards = await generate_flashcards_from_text(retrieved_texts)
 
-    return flashcards
+@router.post("/{id}/flashcards/regenerate", status_code=HTTPStatus.ACCEPTED)
+def regenerate_flashcards_by_course_id(
+    id: uuid.UUID,
+    session: SessionDep,
+    current_user: CurrentUser,
+) -> Message:
+    """
+    Queue a new flashcard deck for the most recent document of a course.
+    """
+    document = _latest_course_document(session, current_user, id)
+    if document.status != DocumentStatus.COMPLETED:
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail="Document is still being processed.",
+        )
+    enqueue_flashcards(session, document.id, force=True)
+    return Message(message="Flashcards are being regenerated")
@@ -1,34 +1,79 @@
 import asyncio
 import os
-import shutil
-import tempfile
+import time
 import uuid
 from asyncio.log import logger
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
+from functools import partial
 from typing import Any
 
-import aiofiles
 import openai
-from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, UploadFile
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from pinecone import Pinecone, ServerlessSpec
-from pypdf import PdfReader
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import selectinload
-from sqlmodel import select
+from sqlmodel import Session, col, delete, select, update
 
+from app import crud
 from app.api.deps import CurrentUser, SessionDep
+from app.core.config import settings
+from app.core.db import engine, session_scope
 from app.models.common import Message
 from app.models.course import Course
-from app.models.document import Document
-from app.models.embeddings import Chunk
-from app.schemas.public import DocumentStatus
-from app.tasks import generate_quizzes_task
+from app.models.document import Document, DocumentFingerprint
+from app.models.embeddings import Chunk, ChunkCreate
+from app.models.flashcards import FlashcardDeck
+from app.models.jobs import IngestionJob, JobKind, JobStatus
+from app.models.quizzes import Quiz
+from app.schemas.public import (
+    DocumentProgressPublic,
+    DocumentStatus,
+    IngestionStage,
+)
+from app.services.checkpoints import (
+    CheckpointTracker,
+    checkpoint_key,
+    clear_checkpoint,
+    resume_point,
+)
+from app.services.chunk_texts import vector_metadata
+from app.services.dedup import clone_document, find_duplicate_source
+from app.services.embedding_cache import CachedEmbedder
+from app.services.flashcards import enqueue_flashcards
+from app.services.ingestion import (
+    IngestionMetrics,
+    batched,
+    chunk_uuid,
+    content_hash,
+    embed_batches,
+    hash_pages,
+    iter_text_chunks,
+    skip,
+)
+from app.services.job_queue import QueueFullError, check_admission, enqueue_job
+from app.services.namespaces import ingestion_namespace
+from app.services.pdf_extraction import iter_pdf_pages
+from app.services.progress import (
+    PIPELINE_STAGES,
+    ProgressTracker,
+    format_event,
+    get_progress,
+)
+from app.services.reingest import reingest_document, stored_pages
+from app.services.uploads import UploadTooLargeError, job_upload_path, save_upload
+from app.services.vector_upsert import UpsertStage
+from app.vector_stores import get_vector_store
 
 router = APIRouter(prefix="/documents", tags=["documents"])
-index_name = "developer-quickstart-py"
 
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_ENV_NAME = os.getenv("PINECONE_ENV_NAME")
 EMBEDDING_MODEL = "text-embedding-3-small"
 
 EXPECTED_DIMENSION = 1536
@@ -36,43 +81,9 @@ MAX_FILES = 10
 MAX_FILE_SIZE_MB = 25
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
-pc = Pinecone(api_key=PINECONE_API_KEY, environment=PINECONE_ENV_NAME)
-
-task_status: dict[str, str] = {}
-
 async_openai_client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
-def ensure_index_exists():
-    """Ensure Pinecone index exists with the correct dimension, recreate if wrong."""
-    if pc.has_index(index_name):
-        existing = pc.describe_index(index_name)
-        if existing.dimension != EXPECTED_DIMENSION:
-            pc.delete_index(index_name)
-            pc.create_index(
-                name=index_name,
-                dimension=EXPECTED_DIMENSION,
-                metric="cosine",
-                spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-            )
-    else:
-        pc.create_index(
-            name=index_name,
-            dimension=EXPECTED_DIMENSION,
-            metric="cosine",
-            spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-        )
-
-
-def chunk_text(text: str):
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        separators=["\n\n", "\n", ".", "!", "?", " ", ""],
-    )
-    return splitter.split_text(text)
-
-
 async def embed_chunks(chunks: list[str]) -> list[list[float]]:
     try:
         # Use the asynchronous client
@@ -85,160 +96,399 @@ async def embed_chunks(chunks: list[str]) -> list[list[float]]:
         raise HTTPException(status_code=500, detail=f"Embedding generation failed: {e}")
 
 
-def store_embeddings(
-    chunks: list[str],
-    embeddings: list[list[float]],
-    course_id: str,
-    document_id: str,
-    index,
-):
-    vectors = [
-        {
-            "id": str(uuid.uuid4()),
-            "values": embedding,
-            "metadata": {
-                "course_id": course_id,
-                "document_id": document_id,
-                "text": chunk,
-                "chunk_index": i,
-            },
-        }
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings, strict=False))
-    ]
-    index.upsert(vectors)
-
-
-async def process_pdf_task(
-    file_path: str, document_id: uuid.UUID, course_id: uuid.UUID, session: SessionDep
-):
-    """Background task to parse, chunk, embed, and store PDF."""
+def _mark_document(
+    session: Session,
+    document_id: uuid.UUID,
+    status: DocumentStatus,
+    chunk_count: int | None = None,
+) -> None:
     document = session.get(Document, document_id)
     if not document:
         return
+    document.status = status
+    if chunk_count is not None:
+        document.chunk_count = chunk_count
+        document.updated_at = datetime.now(timezone.utc)
+    session.add(document)
 
-    try:
-        ensure_index_exists()
-        index = pc.Index(index_name)
 
-        document.status = DocumentStatus.PROCESSING
-        session.add(document)
-        session.commit()
+def _record_fingerprint(
+    session: Session, document_id: uuid.UUID, sha256: str, size: int
+) -> None:
+    fingerprint = session.get(DocumentFingerprint, document_id)
+    fingerprint = fingerprint or DocumentFingerprint(
+        document_id=document_id, sha256=sha256, size=size
+    )
+    fingerprint.sha256 = sha256
+    fingerprint.size = size
+    session.add(fingerprint)
 
-        with open(file_path, "rb") as f:
-            reader = PdfReader(f)
-            full_text = "\n".join(
-                [page.extract_text() for page in reader.pages if page.extract_text()]
-            )
 
-        if not full_text.strip():
-            document.status = DocumentStatus.FAILED
-            session.add(document)
-            session.commit()
-            return
+async def process_pdf_task(
+    file_path: str,
+    document_id: uuid.UUID,
+    course_id: uuid.UUID,
+    content_sha256: str | None = None,
+    replace: bool = False,
+):
+    """
+    Ingestion job to parse, chunk, embed, and store PDF.
 
-        chunks = chunk_text(full_text)
+    With `replace`, the file is a new version of an ingested document: only
+    chunks whose content changed are embedded, and untouched chunks keep
+    their ids and quizzes. The quiz bank is not regenerated.
 
-        chunk_records = []
-        for chunk in chunks:
-            chunk_record = Chunk(
-                document_id=document_id,
-                text_content=chunk,
-                embedding_id=uuid.uuid4().hex,
-            )
-            session.add(chunk_record)
-            chunk_records.append(chunk_record)
-        session.commit()
+    When another completed document has the same `content_sha256`, its
+    chunks, vectors and quizzes are copied instead and nothing is re-embedded.
 
-        embeddings = []
-        BATCH_SIZE = 50
-        for i in range(0, len(chunks), BATCH_SIZE):
-            batch = chunks[i : i + BATCH_SIZE]
-            embeddings.extend(await embed_chunks(batch))
-            await asyncio.sleep(0)
+    Pages stream into the splitter, finished chunks stream into embedding
+    batches (several in flight at once), and every batch is persisted and
+    upserted as soon as it is embedded, so the first chunks are searchable
+    long before the last page has been read.
 
-        vectors_to_upsert = []
+    The job opens its own short-lived sessions: every stage is a separate
+    transaction and none is held open while extracting, embedding or
+    talking to the vector store, so concurrent jobs only borrow pool
+    connections for the duration of their writes.
 
-        for i, (record, embedding) in enumerate(
-            zip(chunk_records, embeddings, strict=False)
-        ):
-            embedding_uuid = str(uuid.uuid4())
-            record.embedding_id = embedding_uuid
-            _vector = {
-                "id": embedding_uuid,
-                "values": embedding,
-                "metadata": {
-                    "course_id": str(course_id),
-                    "document_id": str(document_id),
-                    "chunk_id": str(record.id),
-                    "text": record.text_content,
-                    "chunk_index": i,
-                },
-            }
-            vectors_to_upsert.append(_vector)
+    Every stage records its progress for GET /documents/{id}/events.
 
-        session.commit()
+    Chunk and vector ids derive from the document id and chunk ordinal, and
+    a checkpoint records the stored prefix of chunks. Errors are re-raised
+    after the document is marked FAILED so the job queue can retry: a retry
+    of the same file resumes after the checkpoint (re-reading the PDF but
+    embedding only what is missing), otherwise chunks left behind by the
+    earlier attempt are discarded.
+    """
+    key = None if replace else checkpoint_key(content_sha256, EMBEDDING_MODEL)
+    with session_scope() as session:
+        document = session.get(Document, document_id)
+        if not document:
+            return
+        has_chunks = (
+            session.exec(
+                select(Chunk.id).where(Chunk.document_id == document_id)
+            ).first()
+            is not None
+        )
+        resume_from = resume_point(session, document_id, key) if has_chunks else 0
+
+    progress = ProgressTracker(document_id)
+    progress.reset(
+        PIPELINE_STAGES
+        if replace
+        else [*PIPELINE_STAGES, IngestionStage.QUIZ_GENERATION]
+    )
+    try:
+        store = get_vector_store()
+        await asyncio.to_thread(store.ensure_index)
+        embedder = CachedEmbedder(embed_chunks, EMBEDDING_MODEL, EXPECTED_DIMENSION)
+        embed = embedder if settings.EMBEDDING_CACHE_ENABLED else embed_chunks
+
+        if replace:
+            with session_scope() as session:
+                _mark_document(session, document_id, DocumentStatus.PROCESSING)
+
+            started = time.perf_counter()
+            result = await reingest_document(
+                document,
+                progress.count(IngestionStage.EXTRACT, iter_pdf_pages(file_path)),
+                store,
+                embed,
+                progress=progress,
+            )
+            logger.info(
+                f"[process_pdf_task] Re-ingested document {document_id} in "
+                f"{time.perf_counter() - started:.2f}s: {result.summary()}"
+            )
+            with session_scope() as session:
+                _mark_document(
+                    session,
+                    document_id,
+                    DocumentStatus.COMPLETED
+                    if result.chunk_count
+                    else DocumentStatus.FAILED,
+                    chunk_count=result.chunk_count,
+                )
+                if result.chunk_count:
+                    if content_sha256:
+                        _record_fingerprint(
+                            session,
+                            document_id,
+                            content_sha256,
+                            os.path.getsize(file_path),
+                        )
+                    # A no-op when the pages did not change
+                    enqueue_flashcards(session, document_id)
+            return
 
-        index = pc.Index(index_name)
-        index.upsert(vectors=vectors_to_upsert)
+        if resume_from:
+            logger.info(
+                f"[process_pdf_task] Resuming document {document_id} after "
+                f"{resume_from} stored chunks"
+            )
+            namespace = document.embedding_namespace
+            with session_scope() as session:
+                _mark_document(session, document_id, DocumentStatus.PROCESSING)
+        else:
+            if has_chunks:
+                await asyncio.to_thread(
+                    store.delete,
+                    filter={"document_id": str(document_id)},
+                    namespace=document.embedding_namespace,
+                )
+            namespace = ingestion_namespace(course_id)
+            with session_scope() as session:
+                if has_chunks:
+                    # Core deletes skip the ORM cascade; quiz.chunk_id has no
+                    # ON DELETE, so the chunks' quizzes and the deck go first
+                    old_chunks = select(Chunk.id).where(
+                        Chunk.document_id == document_id
+                    )
+                    session.execute(
+                        delete(Quiz).where(col(Quiz.chunk_id).in_(old_chunks))
+                    )
+                    session.execute(
+                        delete(FlashcardDeck).where(
+                            col(FlashcardDeck.document_id) == document_id
+                        )
+                    )
+                    session.execute(
+                        delete(Chunk).where(Chunk.document_id == document_id)
+                    )
+                session.execute(
+                    update(Document)
+                    .where(col(Document.id) == document_id)
+                    .values(embedding_namespace=namespace)
+                )
+                _mark_document(session, document_id, DocumentStatus.PROCESSING)
+            document.embedding_namespace = namespace
+
+        started = time.perf_counter()
+        source = None
+        if content_sha256 and not resume_from:
+            with session_scope() as session:
+                source = find_duplicate_source(session, content_sha256, document_id)
+        cloned = await clone_document(source, document, store) if source else None
+        if source and cloned:
+            chunk_count, quiz_count = cloned
+            with session_scope() as session:
+                _mark_document(
+                    session,
+                    document_id,
+                    DocumentStatus.COMPLETED,
+                    chunk_count=chunk_count,
+                )
+                if not quiz_count:
+                    enqueue_job(session, JobKind.GENERATE_QUIZZES, document_id)
+                enqueue_flashcards(session, document_id)
+            logger.info(
+                f"[process_pdf_task] Document {document_id} duplicates {source.id}: "
+                f"copied {chunk_count} chunks and {quiz_count} quizzes "
+                f"in {time.perf_counter() - started:.3f}s"
+            )
+            return
 
-        document.updated_at = datetime.now(timezone.utc)
-        document.status = DocumentStatus.COMPLETED
-        document.chunk_count = len(chunks)
-        session.add(document)
-        session.commit()
+        metrics = IngestionMetrics()
+        checkpoint = CheckpointTracker(document_id, key, done=resume_from)
+        checkpoint.start()
+        chunk_count = resume_from
+        page_hashes: list[str] = []
+        page_texts: list[bytes] = []
+        pages = progress.count(IngestionStage.EXTRACT, iter_pdf_pages(file_path))
+        chunks = progress.count(
+            IngestionStage.CHUNK,
+            iter_text_chunks(hash_pages(pages, page_hashes, page_texts)),
+        )
+        batches = batched(skip(chunks, resume_from), settings.EMBEDDING_BATCH_SIZE)
+        embedded = progress.count(
+            IngestionStage.EMBED,
+            embed_batches(batches, embed),
+            size=lambda result: len(result[0]),
+        )
 
-        await generate_quizzes_task(document_id, session)
+        progress.start(IngestionStage.UPSERT)
+        async with UpsertStage(store, namespace=namespace) as upserts:
+            async for batch, embeddings in embedded:
+                start = chunk_count
+                chunk_count += len(batch)
+                chunk_ids = [
+                    chunk_uuid(document_id, ordinal)
+                    for ordinal in range(start, chunk_count)
+                ]
+                with session_scope() as session:
+                    crud.create_chunks(
+                        session=session,
+                        chunks_in=[
+                            ChunkCreate(
+                                document_id=document_id,
+                                text_content=chunk,
+                                embedding_id=str(chunk_id),
+                                content_hash=content_hash(chunk),
+                            )
+                            for chunk, chunk_id in zip(batch, chunk_ids, strict=True)
+                        ],
+                        commit=False,
+                        ids=chunk_ids,
+                        skip_existing=True,
+                    )
+
+                vectors_to_upsert = [
+                    {
+                        "id": str(chunk_id),
+                        "values": embedding,
+                        "metadata": vector_metadata(
+                            course_id, document_id, chunk_id, chunk, start + i
+                        ),
+                    }
+                    for i, (chunk, chunk_id, embedding) in enumerate(
+                        zip(batch, chunk_ids, embeddings, strict=True)
+                    )
+                ]
+                await upserts.submit(
+                    vectors_to_upsert,
+                    on_stored=partial(checkpoint.stored, start, chunk_count),
+                )
+                progress.update(IngestionStage.UPSERT, upserts.stats.vectors)
+        progress.update(IngestionStage.UPSERT, upserts.stats.vectors)
+        progress.finish(IngestionStage.UPSERT)
+
+        metrics.chunks = chunk_count
+        metrics.upsert = upserts.stats
+        metrics.total_seconds = time.perf_counter() - started
+        if upserts.first_completed_at is not None:
+            metrics.first_searchable_seconds = upserts.first_completed_at - started
+        if settings.EMBEDDING_CACHE_ENABLED:
+            metrics.embedding_cache_hits = embedder.hits
+            metrics.embedding_cache_misses = embedder.misses
+        logger.info(
+            f"[process_pdf_task] Ingested document {document_id}: {metrics.summary()}"
+        )
+
+        with session_scope() as session:
+            clear_checkpoint(session, document_id)
+            if chunk_count == 0:
+                _mark_document(session, document_id, DocumentStatus.FAILED)
+                return
+            crud.replace_document_pages(
+                session=session,
+                document_id=document_id,
+                page_hashes=page_hashes,
+                page_texts=page_texts,
+                commit=False,
+            )
+            _mark_document(
+                session,
+                document_id,
+                DocumentStatus.COMPLETED,
+                chunk_count=chunk_count,
+            )
+            enqueue_job(session, JobKind.GENERATE_QUIZZES, document_id)
+            enqueue_flashcards(session, document_id)
 
     except Exception as e:
         logger.error(f"[process_pdf_task] Error processing document: {e}")
-        document.status = DocumentStatus.FAILED
-        session.add(document)
-        session.commit()
-    finally:
-        os.remove(file_path)
+        progress.fail_running()
+        with session_scope() as session:
+            _mark_document(session, document_id, DocumentStatus.FAILED)
+        raise
 
 
-async def handle_document_processing(
-    file: UploadFile, document_id: uuid.UUID, session: SessionDep
-):
+async def _iter_pages(pages: list[str]) -> AsyncIterator[str]:
+    for page in pages:
+        yield page
+
+
+async def rebuild_document_task(document_id: uuid.UUID, reembed: bool = False):
     """
-    Background task to handle all blocking I/O:
-    saving the file and then calling the main processing task.
+    Re-chunk a document from its stored page text, without the PDF.
+
+    Used after the chunking settings change (RECHUNK jobs); chunks whose
+    text survives keep their ids, vectors and quizzes. With `reembed`
+    (REEMBED jobs, after the embedding model changes) every chunk is
+    embedded again and its vector overwritten in place.
     """
-    tmp_dir = tempfile.mkdtemp()
-    tmp_path = os.path.join(tmp_dir, f"{document_id}_{file.filename}")
+    with session_scope() as session:
+        document = session.get(Document, document_id)
+        if not document:
+            return
+        if document.status in (DocumentStatus.PENDING, DocumentStatus.PROCESSING):
+            raise RuntimeError(f"Document {document_id} is being ingested")
+        pages = stored_pages(session, document_id)
+        if pages is None:
+            logger.warning(
+                f"[rebuild_document_task] Document {document_id} has no stored "
+                "text; upload it again instead"
+            )
+            return
+        _mark_document(session, document_id, DocumentStatus.PROCESSING)
 
+    progress = ProgressTracker(document_id)
+    progress.reset(PIPELINE_STAGES)
     try:
-        with open(tmp_path, "wb") as buffer:
-            while True:
-                chunk = await file.read(1024)  # Read in 1KB chunks
-                if not chunk:
-                    break
-                buffer.write(chunk)
-
-        await process_pdf_task(tmp_path, document_id, session)
-
+        progress.record(IngestionStage.EXTRACT, len(pages), 0.0, total=len(pages))
+        store = get_vector_store()
+        await asyncio.to_thread(store.ensure_index)
+        embedder = CachedEmbedder(embed_chunks, EMBEDDING_MODEL, EXPECTED_DIMENSION)
+        embed = embedder if settings.EMBEDDING_CACHE_ENABLED else embed_chunks
+
+        started = time.perf_counter()
+        result = await reingest_document(
+            document,
+            _iter_pages(pages),
+            store,
+            embed,
+            progress=progress,
+            rebuild=True,
+            reembed=reembed,
+        )
+        logger.info(
+            f"[rebuild_document_task] Rebuilt document {document_id} in "
+            f"{time.perf_counter() - started:.2f}s: {result.summary()}"
+        )
+        with session_scope() as session:
+            _mark_document(
+                session,
+                document_id,
+                DocumentStatus.COMPLETED
+                if result.chunk_count
+                else DocumentStatus.FAILED,
+                chunk_count=result.chunk_count,
+            )
+            if result.chunk_count:
+                enqueue_flashcards(session, document_id)
     except Exception as e:
-        logger.error(f"[handle_document_processing] Error processing document: {e}")
-        document = session.get(Document, document_id)
-        if document:
-            document.status = DocumentStatus.FAILED
-            session.add(document)
-            session.commit()
+        logger.error(f"[rebuild_document_task] Error rebuilding document: {e}")
+        progress.fail_running()
+        with session_scope() as session:
+            _mark_document(session, document_id, DocumentStatus.FAILED)
+        raise
 
-    finally:
-        shutil.rmtree(tmp_dir)
+
+def admit_jobs(session: SessionDep, owner_id: uuid.UUID, new_jobs: int = 1) -> None:
+    """Reject the upload with 429 and Retry-After when the queue is full."""
+    try:
+        check_admission(session, owner_id, new_jobs)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
 
 
 @router.post("/process")
 async def process_multiple_documents(
     session: SessionDep,
-    background_tasks: BackgroundTasks,
     files: list[UploadFile] = File(...),
     course_id: uuid.UUID = Form(...),
 ):
     """
-    Accept multiple PDF uploads, save to temp files, and queue a background task for each.
+    Accept multiple PDF uploads, save them to the upload directory, and queue
+    a durable ingestion job for each.
+
+    Responds 429 with Retry-After when the ingestion backlog, globally or for
+    the course owner, is too deep to take the whole batch.
     """
     if len(files) > MAX_FILES:
         raise HTTPException(
@@ -246,6 +496,11 @@ async def process_multiple_documents(
             detail=f"You can only upload a maximum of {MAX_FILES} files at a time.",
         )
 
+    course = session.get(Course, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    admit_jobs(session, course.owner_id, len(files))
+
     results = []
 
     for file in files:
@@ -255,11 +510,15 @@ async def process_multiple_documents(
                 detail=f"File '{file.filename}' is not a PDF. Only PDF files are supported.",
             )
 
-        if file.size and file.size > MAX_FILE_SIZE_BYTES:
+        save_started = time.perf_counter()
+        try:
+            upload = await save_upload(file, MAX_FILE_SIZE_BYTES)
+        except UploadTooLargeError:
             raise HTTPException(
                 status_code=400,
                 detail=f"File '{file.filename}' exceeds the {MAX_FILE_SIZE_MB}MB size limit.",
             )
+        save_seconds = time.perf_counter() - save_started
 
         filename_str = file.filename if file.filename is not None else ""
         title_without_extension = os.path.splitext(filename_str)[0]
@@ -270,18 +529,30 @@ async def process_multiple_documents(
             course_id=course_id,
         )
         session.add(db_document)
+        session.add(
+            DocumentFingerprint(
+                document_id=db_document.id, sha256=upload.sha256, size=upload.size
+            )
+        )
         session.commit()
         session.refresh(db_document)
 
-        tmp_dir = tempfile.mkdtemp()
-        tmp_path = os.path.join(tmp_dir, f"{db_document.id}_{file.filename}")
-
-        async with aiofiles.open(tmp_path, "wb") as buffer:
-            while chunk := await file.read(1024):
-                await buffer.write(chunk)
+        upload_path = job_upload_path(db_document.id)
+        os.replace(upload.path, upload_path)
+        ProgressTracker(db_document.id).record(
+            IngestionStage.SAVE, upload.size, save_seconds, total=upload.size
+        )
 
-        background_tasks.add_task(
-            process_pdf_task, tmp_path, db_document.id, db_document.course_id, session
+        enqueue_job(
+            session,
+            JobKind.PROCESS_PDF,
+            db_document.id,
+            {
+                "file_path": upload_path,
+                "course_id": str(db_document.course_id),
+                "sha256": upload.sha256,
+                "size": upload.size,
+            },
         )
 
         results.append(
@@ -316,12 +587,161 @@ def read_document(session: SessionDep, current_user: CurrentUser, id: uuid.UUID)
     return document
 
 
-def delete_embeddings_task(document_id: uuid.UUID):
-    """Background task to delete embeddings from Pinecone."""
+async def progress_events(request: Request, id: uuid.UUID) -> AsyncIterator[str]:
+    """Push a `progress` event whenever the document's stages change."""
+    last = None
+    last_sent = time.monotonic()
+    while not await request.is_disconnected():
+
+        def snapshot() -> DocumentProgressPublic | None:
+            with Session(engine) as session:
+                document = session.get(Document, id)
+                return get_progress(session, document) if document else None
+
+        progress = await asyncio.to_thread(snapshot)
+        if progress is None:
+            yield format_event("end", {"document_id": str(id), "deleted": True})
+            return
+        if progress != last:
+            yield format_event("progress", progress.model_dump(mode="json"))
+            last = progress
+            last_sent = time.monotonic()
+        elif (
+            time.monotonic() - last_sent >= settings.INGESTION_EVENTS_KEEPALIVE_SECONDS
+        ):
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        if progress.finished:
+            yield format_event("end", {"document_id": str(id), "deleted": False})
+            return
+        await asyncio.sleep(settings.INGESTION_EVENTS_POLL_SECONDS)
+
+
+@router.get("/{id}/events", response_class=StreamingResponse)
+def stream_document_events(
+    request: Request, session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> StreamingResponse:
+    """
+    Server-sent events with per-stage ingestion progress of a document.
+
+    A `progress` event carries every recorded stage (counters, status and
+    durations) and is sent whenever one of them changes; `end` is sent once
+    the document is completed or failed with no job left to run.
+    """
+    document = session.exec(
+        select(Document)
+        .join(Course)
+        .where(Document.id == id)
+        .where(Course.owner_id == current_user.id)
+    ).first()
+    if not document:
+        raise HTTPException(
+            status_code=404,
+            detail="Document not found or you do not have permission to access it.",
+        )
+
+    return StreamingResponse(
+        progress_events(request, id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{id}/replace")
+async def replace_document(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    file: UploadFile = File(...),
+):
+    """
+    Upload a new version of a document. Only changed chunks are re-embedded;
+    unchanged chunks keep their ids and quizzes.
+    """
+    document = session.exec(
+        select(Document)
+        .join(Course)
+        .where(Document.id == id)
+        .where(Course.owner_id == current_user.id)
+    ).first()
+    if not document:
+        raise HTTPException(
+            status_code=404,
+            detail="Document not found or you do not have permission to access it.",
+        )
+    active_job = session.exec(
+        select(IngestionJob.id).where(
+            IngestionJob.document_id == id,
+            col(IngestionJob.status).in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+        )
+    ).first()
+    # A FAILED document may still have a retry waiting to read its upload
+    if active_job or document.status in (
+        DocumentStatus.PENDING,
+        DocumentStatus.PROCESSING,
+    ):
+        raise HTTPException(
+            status_code=409, detail="Document is still being processed."
+        )
+    if file.content_type != "application/pdf":
+        raise HTTPException(
+            status_code=400,
+            detail=f"File '{file.filename}' is not a PDF. Only PDF files are supported.",
+        )
+    admit_jobs(session, current_user.id)
+
+    save_started = time.perf_counter()
+    try:
+        upload = await save_upload(file, MAX_FILE_SIZE_BYTES)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File '{file.filename}' exceeds the {MAX_FILE_SIZE_MB}MB size limit.",
+        )
+    save_seconds = time.perf_counter() - save_started
+
+    # The fingerprint is only updated once a replace succeeds
+    fingerprint = session.get(DocumentFingerprint, id)
+    if (
+        document.status == DocumentStatus.COMPLETED
+        and fingerprint
+        and fingerprint.sha256 == upload.sha256
+    ):
+        os.remove(upload.path)
+        return {"document_id": id, "status": document.status, "changed": False}
+
+    document.filename = file.filename or document.filename
+    document.status = DocumentStatus.PENDING
+    session.add(document)
+    session.commit()
+
+    upload_path = job_upload_path(id)
+    os.replace(upload.path, upload_path)
+    ProgressTracker(id).record(
+        IngestionStage.SAVE, upload.size, save_seconds, total=upload.size
+    )
+
+    enqueue_job(
+        session,
+        JobKind.PROCESS_PDF,
+        id,
+        {
+            "file_path": upload_path,
+            "course_id": str(document.course_id),
+            "sha256": upload.sha256,
+            "size": upload.size,
+            "replace": True,
+        },
+    )
+    return {"document_id": id, "status": document.status, "changed": True}
+
+
+def delete_embeddings_task(document_id: uuid.UUID, namespace: str | None = None):
+    """Background task to delete embeddings from the vector store."""
     try:
-        if pc.has_index(index_name):
-            index = pc.Index(index_name)
-            index.delete(filter={"document_id": str(document_id)})
+        get_vector_store().delete(
+            filter={"document_id": str(document_id)}, namespace=namespace
+        )
     except Exception as e:
         logger.error(f"Failed to delete embeddings for document {document_id}: {e}")
 
@@ -351,7 +771,7 @@ def delete_document(
             detail="Not enough permissions to delete this document.",
         )
 
-    background_tasks.add_task(delete_embeddings_task, id)
+    background_tasks.add_task(delete_embeddings_task, id, document.embedding_namespace)
 
     session.delete(document)
     session.commit()
@@ -1,8 +1,17 @@
+import uuid
+
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
-from app.api.deps import get_current_active_superuser
+from app.api.deps import SessionDep, get_current_active_superuser
 from app.models.common import Message
+from app.models.jobs import JobKind
+from app.schemas.public import CompletionCacheStatsPublic, IngestionQueuePublic
+from app.services.completion_cache import completion_cache_stats
+from app.services.flashcards import enqueue_missing_decks
+from app.services.job_queue import queue_stats
+from app.services.namespaces import enqueue_namespace_moves
+from app.services.reingest import enqueue_rebuilds
 from app.utils import generate_test_email, send_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
@@ -29,3 +38,88 @@ def test_email(email_to: EmailStr) -> Message:
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get(
+    "/ingestion-queue/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=IngestionQueuePublic,
+)
+def ingestion_queue(session: SessionDep) -> IngestionQueuePublic:
+    """
+    Ingestion queue depth and running jobs.
+    """
+    return queue_stats(session)
+
+
+@router.get(
+    "/llm-cache/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=CompletionCacheStatsPublic,
+)
+def llm_cache(session: SessionDep) -> CompletionCacheStatsPublic:
+    """
+    Hit/miss counters of this process's LLM completion cache.
+    """
+    return completion_cache_stats(session)
+
+
+@router.post(
+    "/vector-namespaces/migrate/",
+    dependencies=[Depends(get_current_active_superuser)],
+    status_code=202,
+)
+def migrate_vector_namespaces(session: SessionDep) -> Message:
+    """
+    Queue jobs moving every ingested document's vectors into its course namespace.
+    """
+    queued = enqueue_namespace_moves(session)
+    return Message(message=f"Queued {queued} documents for namespace migration")
+
+
+@router.post(
+    "/ingestion/rechunk/",
+    dependencies=[Depends(get_current_active_superuser)],
+    status_code=202,
+)
+def rechunk_documents(
+    session: SessionDep, course_id: uuid.UUID | None = None
+) -> Message:
+    """
+    Queue jobs re-chunking documents from their stored text, e.g. after the
+    chunking settings changed. Only chunks whose text changed are embedded.
+    """
+    queued = enqueue_rebuilds(session, JobKind.RECHUNK, course_id)
+    return Message(message=f"Queued {queued} documents for re-chunking")
+
+
+@router.post(
+    "/ingestion/reembed/",
+    dependencies=[Depends(get_current_active_superuser)],
+    status_code=202,
+)
+def reembed_documents(
+    session: SessionDep, course_id: uuid.UUID | None = None
+) -> Message:
+    """
+    Queue jobs re-chunking and re-embedding every chunk of documents from
+    their stored text, e.g. after the embedding model changed.
+    """
+    queued = enqueue_rebuilds(session, JobKind.REEMBED, course_id)
+    return Message(message=f"Queued {queued} documents for re-embedding")
+
+
+@router.post(
+    "/flashcards/backfill/",
+    dependencies=[Depends(get_current_active_superuser)],
+    status_code=202,
+)
+def backfill_flashcards(
+    session: SessionDep, course_id: uuid.UUID | None = None
+) -> Message:
+    """
+    Queue flashcard decks for completed documents that have none for their
+    current content, e.g. documents processed before decks existed.
+    """
+    queued = enqueue_missing_decks(session, course_id)
+    return Message(message=f"Queued {queued} documents for flashcards")
@@ -54,6 +54,9 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # Pool shared by requests and by every ingestion job in the process
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 10
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -89,6 +92,74 @@ class Settings(BaseSettings):
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
+    # Document ingestion
+    # Chunk sizes are in tokens of CHUNK_ENCODING (the embedding model's encoding)
+    CHUNK_SIZE_TOKENS: int = 300
+    CHUNK_OVERLAP_TOKENS: int = 30
+    CHUNK_ENCODING: str = "cl100k_base"
+    PDF_EXTRACTION_WORKERS: int = 2
+    PDF_EXTRACTION_PAGES_PER_TASK: int = 25
+    EMBEDDING_BATCH_SIZE: int = 50
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 3
+    EMBEDDING_CACHE_ENABLED: bool = True
+    VECTOR_UPSERT_BATCH_SIZE: int = 100
+    # Pinecone rejects upsert requests over 2MB
+    VECTOR_UPSERT_MAX_BYTES: int = 2 * 1000 * 1000
+    VECTOR_UPSERT_CONCURRENCY: int = 4
+    VECTOR_UPSERT_MAX_RETRIES: int = 3
+    UPLOAD_DIR: str = "/tmp/study-companion-uploads"
+    UPLOAD_BUFFER_BYTES: int = 1024 * 1024
+    # Chat completions in flight at once per process, shared by every quiz job
+    LLM_CONCURRENCY: int = 4
+    # Quiz prompts cover windows of this many chunk tokens; the quizzes kept
+    # per difficulty level are capped across all of a document's windows
+    QUIZ_WINDOW_TOKENS: int = 8000
+    QUIZ_MAX_PER_DIFFICULTY: int = 10
+    # "per_difficulty": one prompt per window and level; "combined": one prompt
+    # per window returning every level, sending each window's text once
+    QUIZ_GENERATION_MODE: Literal["per_difficulty", "combined"] = "per_difficulty"
+    # Identical quiz and flashcard completion requests are served from Postgres
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Ingestion job queue; jobs run in app.worker unless the API process is
+    # allowed to run them too (local development only)
+    INGESTION_EMBEDDED_WORKER: bool = False
+    INGESTION_WORKER_CONCURRENCY: int = 2
+    INGESTION_JOB_POLL_SECONDS: float = 1.0
+    INGESTION_JOB_LEASE_SECONDS: int = 120
+    INGESTION_JOB_MAX_ATTEMPTS: int = 5
+    INGESTION_JOB_RETRY_BASE_SECONDS: int = 10
+    # Admission control: jobs running at once across all workers, and the
+    # backlog beyond which uploads get 429 with Retry-After
+    INGESTION_MAX_RUNNING_JOBS: int = 4
+    INGESTION_MAX_QUEUED_JOBS: int = 200
+    INGESTION_MAX_QUEUED_JOBS_PER_USER: int = 30
+    INGESTION_RETRY_AFTER_SECONDS: int = 30
+    # Stage progress is written at most this often per stage, and polled by
+    # the /documents/{id}/events stream at the poll interval
+    INGESTION_PROGRESS_FLUSH_SECONDS: float = 0.5
+    INGESTION_EVENTS_POLL_SECONDS: float = 1.0
+    INGESTION_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Vector store: "pinecone", or "local" for memory-mapped files on disk
+    VECTOR_STORE_BACKEND: Literal["pinecone", "local"] = "pinecone"
+    PINECONE_INDEX_NAME: str = "developer-quickstart-py"
+    VECTOR_STORE_LOCAL_DIR: str = "/tmp/study-companion-vectors"
+    # Data-plane host of the Pinecone index; looked up once at startup if empty
+    PINECONE_INDEX_HOST: str = ""
+    # Keep-alive connections shared by concurrent upserts and queries
+    PINECONE_CONNECTION_POOL_MAXSIZE: int = 16
+    # Copy chunk text into vector metadata; when off, vectors only carry ids
+    # and retrieval reads the text from Postgres (cached per process)
+    VECTOR_METADATA_TEXT: bool = True
+    # New vectors go to a namespace per course instead of the shared one;
+    # POST /utils/vector-namespaces/migrate/ moves existing documents
+    VECTOR_NAMESPACE_PER_COURSE: bool = True
+    CHUNK_TEXT_CACHE_SIZE: int = 10_000
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
@@ -1,10 +1,37 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
 from app.models.user import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    pool_size=settings.POSTGRES_POOL_SIZE,
+    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Short-lived session for one stage of a background job.
+
+    The block is one transaction: committed when it exits cleanly, rolled
+    back otherwise, and its connection goes back to the pool either way.
+    Loaded objects stay readable after the commit, so a stage can hand ids
+    and values to the next one without keeping a connection across awaits.
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        try:
+            yield session
+            session.commit()
+        except BaseException:
+            session.rollback()
+            raise
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
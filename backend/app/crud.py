@@ -1,10 +1,14 @@
 import uuid
 from typing import Any
 
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import Session, select
 
 from app.core.security import get_password_hash, verify_password
 from app.models.course import Course, CourseCreate
+from app.models.document import DocumentPage
+from app.models.embeddings import Chunk, ChunkCreate
 from app.models.item import Item, ItemCreate
 from app.models.user import User, UserCreate, UserUpdate
 
@@ -64,3 +68,68 @@ def create_course(
     session.commit()
     session.refresh(db_course)
     return db_course
+
+
+def create_chunks(
+    *,
+    session: Session,
+    chunks_in: list[ChunkCreate],
+    commit: bool = True,
+    ids: list[uuid.UUID] | None = None,
+    skip_existing: bool = False,
+) -> list[uuid.UUID]:
+    """
+    Insert many chunks with a single multi-row INSERT ... RETURNING,
+    bypassing the ORM unit of work. Returned ids follow the input order.
+    Pass `ids` to use ids chosen in advance instead of new ones, and
+    `skip_existing` to leave rows with those ids as they are.
+    """
+    if not chunks_in:
+        return []
+    ids = ids or [uuid.uuid4() for _ in chunks_in]
+    rows = [
+        {"id": chunk_id, **chunk_in.model_dump()}
+        for chunk_id, chunk_in in zip(ids, chunks_in, strict=True)
+    ]
+    if skip_existing:
+        session.execute(
+            pg_insert(Chunk).on_conflict_do_nothing(index_elements=["id"]), rows
+        )
+        if commit:
+            session.commit()
+        return ids
+    result = session.execute(
+        insert(Chunk).returning(Chunk.id, sort_by_parameter_order=True),  # type: ignore[arg-type]
+        rows,
+    )
+    chunk_ids = list(result.scalars())
+    if commit:
+        session.commit()
+    return chunk_ids
+
+
+def replace_document_pages(
+    *,
+    session: Session,
+    document_id: uuid.UUID,
+    page_hashes: list[str],
+    page_texts: list[bytes] | None = None,
+    commit: bool = True,
+) -> None:
+    session.execute(delete(DocumentPage).where(DocumentPage.document_id == document_id))  # type: ignore[arg-type]
+    texts = page_texts or [None] * len(page_hashes)
+    if page_hashes:
+        session.execute(
+            insert(DocumentPage),
+            [
+                {
+                    "document_id": document_id,
+                    "page_number": i,
+                    "content_hash": h,
+                    "text_gzip": t,
+                }
+                for i, (h, t) in enumerate(zip(page_hashes, texts, strict=True))
+            ],
+        )
+    if commit:
+        session.commit()
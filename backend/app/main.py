@@ -1,3 +1,9 @@
+import asyncio
+import contextlib
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
@@ -5,6 +11,13 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.services.pdf_extraction import shutdown_extraction_executor
+from app.services.vector_upsert import shutdown_upsert_executor
+from app.vector_stores import warm_vector_store
+from app.worker import run_worker
+
+# Seconds to let the embedded worker finish its current jobs on shutdown
+WORKER_SHUTDOWN_GRACE_SECONDS = 10
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,8 +27,36 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Check the index in the background so startup never waits on the network
+    threading.Thread(
+        target=warm_vector_store, name="vector-store-bootstrap", daemon=True
+    ).start()
+
+    stop_worker = asyncio.Event()
+    worker = None
+    if settings.INGESTION_EMBEDDED_WORKER:
+        worker = asyncio.create_task(run_worker(stop_worker))
+
+    yield
+
+    if worker is not None:
+        stop_worker.set()
+        try:
+            await asyncio.wait_for(worker, timeout=WORKER_SHUTDOWN_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            # Unfinished jobs are picked up again once their lease expires
+            with contextlib.suppress(asyncio.CancelledError):
+                await worker
+    shutdown_extraction_executor()
+    shutdown_upsert_executor()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
@@ -1,10 +1,29 @@
 from .chat import Chat  # noqa: F401
 from .common import *  # noqa: F403, if you have base mixins here
+from .completions import CompletionCache  # noqa: F401
 from .course import Course  # noqa: F401
-from .document import Document  # noqa: F401
-from .embeddings import Chunk  # noqa: F401
+from .document import Document, DocumentFingerprint, DocumentPage  # noqa: F401
+from .embeddings import Chunk, EmbeddingCache  # noqa: F401
+from .flashcards import FlashcardDeck  # noqa: F401
 from .item import Item  # noqa: F401
+from .jobs import IngestionCheckpoint, IngestionJob, IngestionProgress  # noqa: F401
 from .quizzes import Quiz  # noqa: F401
 from .user import User  # noqa: F401
 
-__all__ = ["User", "Item", "Course", "Document", "Chunk", "Quiz", "Chat"]  # type: ignore
+__all__ = [
+    "User",
+    "Item",
+    "Course",
+    "Document",
+    "DocumentFingerprint",
+    "DocumentPage",
+    "Chunk",
+    "EmbeddingCache",
+    "CompletionCache",
+    "FlashcardDeck",
+    "IngestionCheckpoint",
+    "IngestionJob",
+    "IngestionProgress",
+    "Quiz",
+    "Chat",
+]  # type: ignore
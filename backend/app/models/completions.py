@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Column, DateTime, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class CompletionCache(SQLModel, table=True):
+    """
+    Chat completions keyed by sha256 of the request (model, messages,
+    response_format, temperature).
+    """
+
+    request_hash: str = Field(primary_key=True, max_length=64)
+    model: str = Field(max_length=255)
+    # The ChatCompletion as returned by the API
+    response: dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(
+            DateTime(timezone=True),
+            nullable=False,
+            index=True,
+            server_default=text("CURRENT_TIMESTAMP"),
+        ),
+    )
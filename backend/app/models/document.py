@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import text
+from sqlalchemy import Column, LargeBinary, text
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.course import Course
@@ -40,3 +40,31 @@ class Document(DocumentBase, table=True):
     chunks: list[Chunk] = Relationship(
         back_populates="document", sa_relationship_kwargs={"cascade": "delete"}
     )
+
+
+class DocumentFingerprint(SQLModel, table=True):
+    """sha256 of the uploaded file, used to reuse the work done for duplicates."""
+
+    document_id: uuid.UUID = Field(
+        foreign_key="document.id", primary_key=True, ondelete="CASCADE"
+    )
+    sha256: str = Field(index=True, max_length=64)
+    size: int
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+    )
+
+
+class DocumentPage(SQLModel, table=True):
+    """Per-page content hash and text of the last ingested version of a document."""
+
+    document_id: uuid.UUID = Field(
+        foreign_key="document.id", primary_key=True, ondelete="CASCADE"
+    )
+    page_number: int = Field(primary_key=True)
+    content_hash: str = Field(max_length=64)
+    # gzip-compressed extracted text, so the document can be re-chunked and
+    # re-embedded without its PDF; None for pages ingested before it was kept
+    text_gzip: bytes | None = Field(default=None, sa_column=Column(LargeBinary))
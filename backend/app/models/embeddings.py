@@ -1,6 +1,8 @@
 import uuid
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Column, LargeBinary, text
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -12,6 +14,8 @@ class ChunkBase(SQLModel):
     text_content: str
     embedding_id: str = Field(unique=True)
     document_id: uuid.UUID
+    # sha256 of the normalized text, used to diff re-uploaded documents
+    content_hash: str | None = Field(default=None, max_length=64)
 
 
 class ChunkCreate(ChunkBase):
@@ -32,3 +36,18 @@ class Chunk(ChunkBase, table=True):
     quizzes: list["Quiz"] = Relationship(
         back_populates="chunk", sa_relationship_kwargs={"cascade": "delete"}
     )
+
+
+class EmbeddingCache(SQLModel, table=True):
+    """Embedding vectors keyed by sha256(normalized text + model + dimensions)."""
+
+    content_hash: str = Field(primary_key=True, max_length=64)
+    model: str = Field(max_length=255)
+    dimensions: int
+    # float32 little-endian packed vector
+    vector: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+    )
@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Column, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class FlashcardDeck(SQLModel, table=True):
+    """
+    Flashcards generated from one version of a document's content.
+
+    `content_version` is derived from the document's page hashes, so a
+    replaced or re-extracted document no longer matches its old deck.
+    """
+
+    document_id: uuid.UUID = Field(
+        foreign_key="document.id", primary_key=True, ondelete="CASCADE"
+    )
+    content_version: str = Field(primary_key=True, max_length=64)
+    # QAItem dicts, in the order the model returned them
+    cards: list[dict[str, Any]] = Field(
+        sa_column=Column(JSONB, nullable=False), default_factory=list
+    )
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+    )
@@ -0,0 +1,109 @@
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import Column, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+from app.schemas.public import IngestionStage, StageStatus
+
+
+class JobKind(str, Enum):
+    PROCESS_PDF = "process_pdf"
+    GENERATE_QUIZZES = "generate_quizzes"
+    MOVE_VECTORS = "move_vectors"
+    RECHUNK = "rechunk"
+    REEMBED = "reembed"
+    GENERATE_FLASHCARDS = "generate_flashcards"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class IngestionJob(SQLModel, table=True):
+    """A durable unit of ingestion work claimed by workers with SKIP LOCKED."""
+
+    __table_args__ = (Index("ix_ingestionjob_status_run_at", "status", "run_at"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    kind: JobKind
+    status: JobStatus = Field(default=JobStatus.QUEUED)
+    document_id: uuid.UUID = Field(foreign_key="document.id", ondelete="CASCADE")
+    # Course owner, so workers can share capacity fairly between users
+    owner_id: uuid.UUID | None = Field(
+        default=None, foreign_key="users.id", ondelete="CASCADE", index=True
+    )
+    payload: dict[str, Any] = Field(sa_column=Column(JSONB), default_factory=dict)
+
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=5)
+    last_error: str | None = None
+
+    # Earliest time the job may be claimed; pushed forward on retry backoff
+    run_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    locked_by: str | None = Field(default=None, max_length=255)
+    lease_expires_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={
+            "server_default": text("CURRENT_TIMESTAMP"),
+            "onupdate": func.now(),
+        },
+    )
+
+
+class IngestionProgress(SQLModel, table=True):
+    """Progress counter and timing of one ingestion stage of a document."""
+
+    document_id: uuid.UUID = Field(
+        foreign_key="document.id", primary_key=True, ondelete="CASCADE"
+    )
+    stage: IngestionStage = Field(primary_key=True)
+    status: StageStatus = Field(default=StageStatus.RUNNING)
+    done: int = Field(default=0)
+    total: int | None = None
+
+    started_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+    finished_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+    # Wall time from the first to the last unit of work; stages overlap
+    seconds: float = Field(default=0.0)
+    updated_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+
+
+class IngestionCheckpoint(SQLModel, table=True):
+    """
+    How far a document's ingestion got: chunks [0, chunks_done) are stored
+    with their vectors. Only valid for the same `key` (file fingerprint and
+    chunking settings), since those decide the chunk ordinals.
+    """
+
+    document_id: uuid.UUID = Field(
+        foreign_key="document.id", primary_key=True, ondelete="CASCADE"
+    )
+    key: str = Field(max_length=255)
+    chunks_done: int = Field(default=0)
+    updated_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
@@ -1,52 +1,82 @@
+from typing import Any
+
 from openai.types.chat import ChatCompletion
 
 from app.llm_clients.openai_client import client
+from app.services.completion_cache import completion_cache, is_json_completion
+from app.services.llm_limits import llm_semaphore
+
+# Difficulty levels generated for every document
+QUIZ_LEVELS = ["easy", "medium", "hard"]
+
+QUIZ_ITEM_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "quiz": {"type": "string"},
+        "correct_answer": {"type": "string"},
+        "distraction_1": {"type": "string"},
+        "distraction_2": {"type": "string"},
+        "distraction_3": {"type": "string"},
+        "topic": {"type": "string"},
+        "source": {"type": "integer"},
+    },
+    "required": [
+        "quiz",
+        "correct_answer",
+        "distraction_1",
+        "distraction_2",
+        "distraction_3",
+        "topic",
+        "source",
+    ],
+    "additionalProperties": False,
+}
 
 
-async def get_quiz_prompt(prompt: str) -> ChatCompletion:
-    return await client.chat.completions.create(
-        model="gpt-4o",
-        response_format={
-            "type": "json_schema",
-            "json_schema": {
-                "name": "quiz_list",
-                "schema": {
-                    "type": "object",
-                    "properties": {
-                        "quizzes": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "quiz": {"type": "string"},
-                                    "correct_answer": {"type": "string"},
-                                    "distraction_1": {"type": "string"},
-                                    "distraction_2": {"type": "string"},
-                                    "distraction_3": {"type": "string"},
-                                    "topic": {"type": "string"},
-                                },
-                                "required": [
-                                    "quiz",
-                                    "correct_answer",
-                                    "distraction_1",
-                                    "distraction_2",
-                                    "distraction_3",
-                                    "topic",
-                                ],
-                                "additionalProperties": False,
-                            },
-                        }
-                    },
-                    "required": ["quizzes"],
-                    "additionalProperties": False,
+def _response_format(name: str, lists: list[str]) -> dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    key: {"type": "array", "items": QUIZ_ITEM_SCHEMA} for key in lists
                 },
+                "required": lists,
+                "additionalProperties": False,
             },
         },
-        messages=[
+    }
+
+
+QUIZ_LIST_FORMAT = _response_format("quiz_list", ["quizzes"])
+# One list per difficulty level, so a document's text is sent once, not per level
+QUIZ_LEVELS_FORMAT = _response_format("quiz_levels", QUIZ_LEVELS)
+
+
+async def get_quiz_prompt(prompt: str, combined: bool = False) -> ChatCompletion:
+    """
+    Structured quiz completion: a `quizzes` list, or with `combined` an
+    `easy`, `medium` and `hard` list from the same prompt. Identical
+    prompts are answered from the completion cache.
+    """
+    request = {
+        "model": "gpt-4o",
+        "response_format": QUIZ_LEVELS_FORMAT if combined else QUIZ_LIST_FORMAT,
+        "messages": [
             {
                 "role": "system",
                 "content": "You are a quiz generator. Only output valid JSON.",
             },
             {"role": "user", "content": prompt},
         ],
+    }
+    return await completion_cache.complete(
+        request, _create_completion, validate=is_json_completion
     )
+
+
+async def _create_completion(request: dict[str, Any]) -> ChatCompletion:
+    async with llm_semaphore():
+        return await client.chat.completions.create(**request)
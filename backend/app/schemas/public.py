@@ -43,6 +43,59 @@ class DocumentPublic(PydanticBase):
     status: DocumentStatus
 
 
+class IngestionStage(str, Enum):
+    SAVE = "save"
+    EXTRACT = "extract"
+    CHUNK = "chunk"
+    EMBED = "embed"
+    UPSERT = "upsert"
+    QUIZ_GENERATION = "quiz_generation"
+
+
+class StageStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class StageProgressPublic(PydanticBase):
+    stage: IngestionStage
+    status: StageStatus
+    done: int
+    total: int | None = None
+    unit: str
+    seconds: float
+    started_at: datetime
+    finished_at: datetime | None = None
+
+
+class DocumentProgressPublic(BaseModel):
+    document_id: uuid.UUID
+    status: DocumentStatus
+    finished: bool
+    stages: list[StageProgressPublic]
+
+
+class IngestionQueuePublic(BaseModel):
+    queued: int
+    queued_by_kind: dict[str, int]
+    # Waiting for a retry backoff to pass
+    delayed: int
+    running: int
+    max_running: int
+    owners_waiting: int
+    oldest_queued_seconds: float
+
+
+class CompletionCacheStatsPublic(BaseModel):
+    enabled: bool
+    # Counted by the serving process since it started
+    hits: int
+    misses: int
+    hit_rate: float
+    entries: int
+
+
 class CoursePublic(PydanticBase):
     id: uuid.UUID
     owner_id: uuid.UUID
@@ -204,6 +257,7 @@ class ChatPublic(PydanticBase):
     created_at: datetime
     updated_at: datetime
 
+
 class ChatMessage(BaseModel):
     message: str
     continue_response: bool = False  # Flag to continue previous response
@@ -214,4 +268,4 @@ class ChatMessage(BaseModel):
                 "message": "What is the main topic of the course?",
                 "continue_response": False,
             }
-        }
\ No newline at end of file
+        }
@@ -9,4 +9,21 @@ __all__ = [
     "chat_cache",
     "rag_service",
     "openai_service",
+    "pdf_extraction",
+    "ingestion",
+    "chunking",
+    "uploads",
+    "dedup",
+    "embedding_cache",
+    "job_queue",
+    "vector_upsert",
+    "reingest",
+    "progress",
+    "chunk_texts",
+    "namespaces",
+    "checkpoints",
+    "llm_limits",
+    "quiz_windows",
+    "completion_cache",
+    "flashcards",
 ]
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Checkpoints that let a retried ingestion job resume where it stopped
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.jobs import IngestionCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_key(content_sha256: str | None, embedding_model: str) -> str | None:
+    """
+    What chunk ordinals depend on: the file and the chunking and embedding
+    settings. Without a fingerprint a job cannot resume.
+    """
+    if not content_sha256:
+        return None
+    return (
+        f"{content_sha256}:{settings.CHUNK_ENCODING}:{settings.CHUNK_SIZE_TOKENS}:"
+        f"{settings.CHUNK_OVERLAP_TOKENS}:{embedding_model}"
+    )
+
+
+def resume_point(session: Session, document_id: uuid.UUID, key: str | None) -> int:
+    """Chunks already stored by an earlier attempt with the same `key`."""
+    if key is None:
+        return 0
+    checkpoint = session.get(IngestionCheckpoint, document_id)
+    if checkpoint is None or checkpoint.key != key:
+        return 0
+    return checkpoint.chunks_done
+
+
+def clear_checkpoint(session: Session, document_id: uuid.UUID) -> None:
+    session.execute(
+        delete(IngestionCheckpoint).where(
+            IngestionCheckpoint.document_id == document_id  # type: ignore[arg-type]
+        )
+    )
+
+
+class CheckpointTracker:
+    """
+    Advance a document's checkpoint as embedding batches are stored.
+
+    Batches finish out of order when several upserts are in flight; the
+    checkpoint only moves over a contiguous prefix, so everything before it
+    is known to be stored. Each write uses its own short session. Failed
+    writes are logged, not raised: the next batch writes again, and at worst
+    a resumed job redoes a few batches.
+    """
+
+    def __init__(self, document_id: uuid.UUID, key: str | None, done: int = 0) -> None:
+        self.document_id = document_id
+        self.key = key
+        self.done = done
+        self._stored: dict[int, int] = {}
+
+    def start(self) -> None:
+        self._write()
+
+    def stored(self, start: int, end: int) -> None:
+        """Chunks [start, end) have their rows and vectors stored."""
+        self._stored[start] = end
+        advanced = False
+        while self.done in self._stored:
+            self.done = self._stored.pop(self.done)
+            advanced = True
+        if advanced:
+            self._write()
+
+    def _write(self) -> None:
+        if self.key is None:
+            return
+        values = {
+            "key": self.key,
+            "chunks_done": self.done,
+            "updated_at": datetime.now(timezone.utc),
+        }
+        statement = (
+            insert(IngestionCheckpoint)
+            .values(document_id=self.document_id, **values)
+            .on_conflict_do_update(index_elements=["document_id"], set_=values)
+        )
+        try:
+            with Session(engine) as session:
+                session.execute(statement)
+                session.commit()
+        except Exception as e:
+            logger.warning(f"Could not checkpoint {self.document_id}: {e}")
@@ -0,0 +1,132 @@
+"""
+Chunk texts for vector matches, read from Postgres when vectors carry only ids
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Uuid
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.embeddings import Chunk
+from app.vector_stores.base import VectorMatch
+
+
+def vector_metadata(
+    course_id: uuid.UUID,
+    document_id: uuid.UUID,
+    chunk_id: uuid.UUID,
+    text: str,
+    chunk_index: int,
+) -> dict[str, Any]:
+    """Metadata stored with a chunk's vector; text only with VECTOR_METADATA_TEXT."""
+    metadata: dict[str, Any] = {
+        "course_id": str(course_id),
+        "document_id": str(document_id),
+        "chunk_id": str(chunk_id),
+        "chunk_index": chunk_index,
+    }
+    if settings.VECTOR_METADATA_TEXT:
+        metadata["text"] = text
+    return metadata
+
+
+class ChunkTextCache:
+    """
+    In-process LRU of chunk texts by chunk id.
+
+    Chunks are never edited in place (a changed passage gets a new row), so
+    entries never go stale; a deleted chunk's entry is simply not asked for
+    again once its vector is gone.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._texts: OrderedDict[uuid.UUID, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, chunk_ids: list[uuid.UUID]) -> dict[uuid.UUID, str]:
+        found = {}
+        with self._lock:
+            for chunk_id in chunk_ids:
+                text = self._texts.get(chunk_id)
+                if text is None:
+                    self.misses += 1
+                    continue
+                self._texts.move_to_end(chunk_id)
+                found[chunk_id] = text
+                self.hits += 1
+        return found
+
+    def put_many(self, texts: dict[uuid.UUID, str]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for chunk_id, text in texts.items():
+                self._texts[chunk_id] = text
+                self._texts.move_to_end(chunk_id)
+            while len(self._texts) > self.maxsize:
+                self._texts.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._texts.clear()
+            self.hits = self.misses = 0
+
+
+chunk_text_cache = ChunkTextCache(settings.CHUNK_TEXT_CACHE_SIZE)
+
+
+def get_chunk_texts(
+    session: Session, chunk_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, str]:
+    """Texts of `chunk_ids`, from the cache or one `id = ANY(...)` query."""
+    texts = chunk_text_cache.get_many(chunk_ids)
+    missing = list(dict.fromkeys(i for i in chunk_ids if i not in texts))
+    if missing:
+        rows = session.exec(
+            select(Chunk.id, Chunk.text_content).where(
+                Chunk.id == any_(literal(missing, ARRAY(Uuid())))  # type: ignore[arg-type]
+            )
+        ).all()
+        loaded: dict[uuid.UUID, str] = dict(rows)  # type: ignore[arg-type]
+        chunk_text_cache.put_many(loaded)
+        texts.update(loaded)
+    return texts
+
+
+def match_texts(matches: list[VectorMatch]) -> list[str]:
+    """
+    Chunk texts of `matches`, in match order.
+
+    Text stored in the metadata is used as is; matches carrying only a
+    `chunk_id` are filled from Postgres in one batch. Matches whose chunk no
+    longer exists are dropped.
+    """
+    chunk_ids = [
+        uuid.UUID(match.metadata["chunk_id"])
+        for match in matches
+        if "text" not in match.metadata and "chunk_id" in match.metadata
+    ]
+    texts: dict[uuid.UUID, str] = {}
+    if chunk_ids:
+        with Session(engine) as session:
+            texts = get_chunk_texts(session, chunk_ids)
+
+    result = []
+    for match in matches:
+        if "text" in match.metadata:
+            result.append(match.metadata["text"])
+        elif "chunk_id" in match.metadata:
+            text = texts.get(uuid.UUID(match.metadata["chunk_id"]))
+            if text is not None:
+                result.append(text)
+    return result
@@ -0,0 +1,123 @@
+"""
+Token-aware, sentence-respecting text chunker
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Protocol
+
+import tiktoken
+
+from app.core.config import settings
+
+# A sentence ends at . ! or ? followed by whitespace, or at a blank line.
+# Single newlines are not boundaries: PDF extraction wraps lines mid-sentence.
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+class Encoding(Protocol):
+    def encode_ordinary(self, text: str) -> list[int]: ...
+
+    def decode(self, tokens: list[int]) -> str: ...
+
+
+@lru_cache
+def get_encoding(name: str | None = None) -> Encoding:
+    return tiktoken.get_encoding(name or settings.CHUNK_ENCODING)
+
+
+class TokenChunker:
+    """
+    Pack whole sentences into chunks of at most `chunk_tokens` tokens.
+
+    Consecutive chunks share trailing sentences worth up to `overlap_tokens`.
+    Text is fed incrementally (one page at a time): only the unfinished last
+    sentence is held back, so the sentence split and the token count each
+    touch every character once and chunking runs in linear time. A single
+    sentence longer than `chunk_tokens` is cut on token boundaries.
+    """
+
+    def __init__(
+        self,
+        chunk_tokens: int | None = None,
+        overlap_tokens: int | None = None,
+        encoding: Encoding | None = None,
+    ) -> None:
+        self.chunk_tokens = chunk_tokens or settings.CHUNK_SIZE_TOKENS
+        overlap = (
+            settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        )
+        if not 0 <= overlap < self.chunk_tokens:
+            raise ValueError("overlap_tokens must be in [0, chunk_tokens)")
+        self.overlap_tokens = overlap
+        self.encoding = encoding or get_encoding()
+        # Text with no sentence boundary is force-split past this length
+        self.max_pending_chars = self.chunk_tokens * 16
+
+        self._pending = ""
+        self._window: deque[tuple[str, int]] = deque()
+        self._window_tokens = 0
+        self._fresh = 0
+
+    def feed(self, text: str) -> list[str]:
+        """Add text and return the chunks it completed."""
+        if not text:
+            return []
+        buffer = f"{self._pending}\n{text}" if self._pending else text
+
+        chunks: list[str] = []
+        start = 0
+        for boundary in SENTENCE_BOUNDARY.finditer(buffer):
+            self._add_sentence(buffer[start : boundary.start()], chunks)
+            start = boundary.end()
+        self._pending = buffer[start:]
+        if len(self._pending) > self.max_pending_chars:
+            self._add_sentence(self._pending, chunks)
+            self._pending = ""
+        return chunks
+
+    def flush(self) -> list[str]:
+        """Return the remaining chunks once the text stream has ended."""
+        chunks: list[str] = []
+        self._add_sentence(self._pending, chunks)
+        self._pending = ""
+        if self._fresh:
+            chunks.append(self._emit())
+        self._window.clear()
+        self._window_tokens = 0
+        return chunks
+
+    def _add_sentence(self, sentence: str, chunks: list[str]) -> None:
+        sentence = sentence.strip()
+        if not sentence:
+            return
+        tokens = self.encoding.encode_ordinary(sentence)
+        if len(tokens) <= self.chunk_tokens:
+            self._push(sentence, len(tokens), chunks)
+            return
+        for i in range(0, len(tokens), self.chunk_tokens):
+            piece = tokens[i : i + self.chunk_tokens]
+            self._push(self.encoding.decode(piece).strip(), len(piece), chunks)
+
+    def _push(self, sentence: str, tokens: int, chunks: list[str]) -> None:
+        if self._window and self._window_tokens + tokens > self.chunk_tokens:
+            if self._fresh:
+                chunks.append(self._emit())
+            # Keep the tail as overlap, leaving room for the new sentence
+            budget = min(self.overlap_tokens, self.chunk_tokens - tokens)
+            while self._window and self._window_tokens > budget:
+                _, dropped = self._window.popleft()
+                self._window_tokens -= dropped
+        self._window.append((sentence, tokens))
+        self._window_tokens += tokens
+        self._fresh += 1
+
+    def _emit(self) -> str:
+        self._fresh = 0
+        return " ".join(sentence for sentence, _ in self._window)
+
+
+def chunk_text(text: str, chunker: TokenChunker | None = None) -> list[str]:
+    chunker = chunker or TokenChunker()
+    return chunker.feed(text) + chunker.flush()
@@ -0,0 +1,183 @@
+"""
+Content-addressed chat completion cache backed by Postgres
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from openai.types.chat import ChatCompletion
+from sqlalchemy import delete, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.completions import CompletionCache
+from app.schemas.public import CompletionCacheStatsPublic
+
+logger = logging.getLogger(__name__)
+
+CreateFn = Callable[[dict[str, Any]], Awaitable[ChatCompletion]]
+ValidateFn = Callable[[ChatCompletion], bool]
+
+# Request fields that decide the completion; anything else is ignored
+KEY_FIELDS = ("model", "messages", "response_format", "temperature")
+
+
+def completion_cache_key(request: dict[str, Any]) -> str:
+    payload = json.dumps(
+        {field: request.get(field) for field in KEY_FIELDS},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_completion(
+    session: Session, key: str, ttl_seconds: int
+) -> ChatCompletion | None:
+    entry = session.get(CompletionCache, key)
+    if entry is None:
+        return None
+    if entry.created_at < datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds):
+        return None
+    return ChatCompletion.model_validate(entry.response)
+
+
+def store_cached_completion(
+    session: Session,
+    key: str,
+    response: ChatCompletion,
+    ttl_seconds: int,
+    max_entries: int,
+) -> None:
+    """Upsert a completion, then evict expired and overflow entries in one DELETE."""
+    values = {
+        "request_hash": key,
+        "model": response.model,
+        "response": response.model_dump(mode="json"),
+        "created_at": datetime.now(timezone.utc),
+    }
+    session.execute(
+        insert(CompletionCache)
+        .values(**values)
+        .on_conflict_do_update(index_elements=["request_hash"], set_=values)
+    )
+    expired = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    newest = (
+        select(CompletionCache.request_hash)
+        .order_by(col(CompletionCache.created_at).desc())
+        .limit(max_entries)
+    )
+    session.execute(
+        delete(CompletionCache).where(
+            or_(
+                col(CompletionCache.created_at) < expired,
+                col(CompletionCache.request_hash).not_in(newest),
+            )
+        )
+    )
+    session.commit()
+
+
+def _load_completion(key: str) -> ChatCompletion | None:
+    with Session(engine) as session:
+        return get_cached_completion(session, key, settings.LLM_CACHE_TTL_SECONDS)
+
+
+def _store_completion(key: str, response: ChatCompletion) -> None:
+    with Session(engine) as session:
+        store_cached_completion(
+            session,
+            key,
+            response,
+            settings.LLM_CACHE_TTL_SECONDS,
+            settings.LLM_CACHE_MAX_ENTRIES,
+        )
+
+
+class CompletionCacheClient:
+    """
+    Serve identical chat completion requests from the persistent cache.
+
+    Requests are keyed by model, messages, response_format and temperature,
+    so a re-processed document or a repeated flashcard request costs no
+    tokens. Entries expire after LLM_CACHE_TTL_SECONDS and the table keeps
+    the newest LLM_CACHE_MAX_ENTRIES. Only finished completions are stored,
+    and callers can reject others (unparsable output, say) with `validate`
+    so a bad answer is not served again. Cache errors fall back to the API.
+    Cache reads and writes run in a thread, off the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def complete(
+        self,
+        request: dict[str, Any],
+        create: CreateFn,
+        validate: ValidateFn | None = None,
+        refresh: bool = False,
+    ) -> ChatCompletion:
+        """Cached completion of `request`; `refresh` skips the lookup but stores."""
+        if not settings.LLM_CACHE_ENABLED:
+            return await create(request)
+
+        key = completion_cache_key(request)
+        cached = None
+        if not refresh:
+            try:
+                cached = await asyncio.to_thread(_load_completion, key)
+            except Exception as e:
+                logger.warning(f"Could not read the completion cache: {e}")
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        response = await create(request)
+        finished = bool(response.choices) and all(
+            choice.finish_reason == "stop" for choice in response.choices
+        )
+        if finished and (validate is None or validate(response)):
+            try:
+                await asyncio.to_thread(_store_completion, key, response)
+            except Exception as e:
+                logger.warning(f"Could not store a completion in the cache: {e}")
+        return response
+
+
+completion_cache = CompletionCacheClient()
+
+
+def completion_cache_stats(session: Session) -> CompletionCacheStatsPublic:
+    """This process's hit/miss counters and the number of stored entries."""
+    entries = session.exec(select(func.count()).select_from(CompletionCache)).one()
+    return CompletionCacheStatsPublic(
+        enabled=settings.LLM_CACHE_ENABLED,
+        hits=completion_cache.hits,
+        misses=completion_cache.misses,
+        hit_rate=completion_cache.hit_rate,
+        entries=entries,
+    )
+
+
+def is_json_completion(response: ChatCompletion) -> bool:
+    """Whether the first choice's content parses as JSON."""
+    try:
+        json.loads((response.choices[0].message.content or "").strip())
+    except ValueError:
+        return False
+    return True
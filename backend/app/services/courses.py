@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import uuid
@@ -6,23 +7,24 @@ from http import HTTPStatus
 from fastapi import HTTPException
 
 from app.llm_clients.openai_client import client
-from app.llm_clients.pinecone_config import pc
 from app.models.course import (
     QAItem,
 )
 from app.prompts.flashcards import PROMPT
+from app.services.chunk_texts import match_texts
+from app.services.completion_cache import completion_cache, is_json_completion
+from app.services.namespaces import query_document
+from app.vector_stores import get_vector_store
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def get_retrieved_docs(
-    document_id: uuid.UUID, index_name: str, query: str, top_k: int = 5
-):
+async def get_retrieved_docs(document_id: uuid.UUID, query: str, top_k: int = 5):
     """
-    Retrieve text chunks directly from Pinecone for a specific document.
+    Retrieve text chunks directly from the vector store for a specific document.
     """
-    index = pc.Index(index_name)
+    store = get_vector_store()
 
     try:
         embed = await client.embeddings.create(
@@ -31,18 +33,15 @@ async def get_retrieved_docs(
         )
         query_vector = embed.data[0].embedding
 
-        results = index.query(
-            vector=query_vector,
-            top_k=top_k,
-            include_metadata=True,
-            filter={"document_id": str(document_id)},
+        matches = await asyncio.to_thread(
+            query_document, store, document_id, query_vector, top_k
         )
 
-        return [match["metadata"]["text"] for match in results["matches"]]
+        return await asyncio.to_thread(match_texts, matches)
 
     except Exception as exc:
         logger.error(
-            f"Pinecone retrieval failed for document {document_id}: {exc}",
+            f"Vector store retrieval failed for document {document_id}: {exc}",
             exc_info=True,
         )
         raise ConnectionError(
@@ -50,9 +49,14 @@ async def get_retrieved_docs(
         ) from exc
 
 
-async def generate_flashcards_from_text(chunks: list[str]) -> list[QAItem]:
+async def generate_flashcards_from_text(
+    chunks: list[str], refresh: bool = False
+) -> list[QAItem]:
     """
     Calls an LLM to generate flashcards directly from text chunks.
+
+    Identical requests are answered from the completion cache unless
+    `refresh` asks for a new answer.
     """
     joined_text = "\n\n".join(chunks)
     system_prompt = (
@@ -63,10 +67,15 @@ async def generate_flashcards_from_text(chunks: list[str]) -> list[QAItem]:
     user_prompt = f"{system_prompt}\n\nText:\n{joined_text}\n\n{PROMPT}"
 
     try:
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": user_prompt}],
-            temperature=0.7,
+        response = await completion_cache.complete(
+            {
+                "model": "gpt-4o-mini",
+                "messages": [{"role": "user", "content": user_prompt}],
+                "temperature": 0.7,
+            },
+            lambda request: client.chat.completions.create(**request),
+            validate=is_json_completion,
+            refresh=refresh,
         )
 
         answer_text = response.choices[0].message.content.strip()
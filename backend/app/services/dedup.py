@@ -0,0 +1,172 @@
+"""
+Whole-document deduplication by file fingerprint
+"""
+
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.db import session_scope
+from app.models.document import Document, DocumentFingerprint, DocumentPage
+from app.models.embeddings import Chunk, ChunkCreate
+from app.models.flashcards import FlashcardDeck
+from app.models.quizzes import Quiz
+from app.schemas.public import DocumentStatus
+from app.services.ingestion import chunk_uuid
+from app.services.vector_upsert import upsert_vectors
+from app.vector_stores import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+def find_duplicate_source(
+    session: Session, sha256: str, document_id: uuid.UUID
+) -> Document | None:
+    """Return the oldest other COMPLETED document uploaded with the same bytes."""
+    statement = (
+        select(Document)
+        .join(DocumentFingerprint, DocumentFingerprint.document_id == Document.id)  # type: ignore[arg-type]
+        .where(
+            DocumentFingerprint.sha256 == sha256,
+            Document.id != document_id,
+            Document.status == DocumentStatus.COMPLETED,
+        )
+        .order_by(Document.created_at)  # type: ignore[arg-type]
+        .limit(1)
+    )
+    return session.exec(statement).first()
+
+
+async def clone_document(
+    source: Document, target: Document, store: VectorStore
+) -> tuple[int, int] | None:
+    """
+    Give `target` copies of the chunks, vectors, quiz bank and flashcard
+    decks of `source`.
+
+    Vectors are fetched from the source's namespace and upserted into the
+    target's with the target's metadata, so nothing is parsed, embedded or
+    generated again. Copies get the ids ingestion would give them,
+    `chunk_uuid(target.id, ordinal)` over the source chunks in id order, so
+    a retried clone overwrites an earlier attempt's rows and vectors.
+    Returns (chunks, quizzes) copied, or None when the source vectors are
+    incomplete and the document has to be processed from scratch.
+
+    Each database step runs in its own short transaction and none is open
+    while the vector store is called. Chunks are committed before their
+    vectors are upserted; the page hashes, quizzes and decks after.
+    """
+    with session_scope() as session:
+        source_chunks = session.exec(
+            select(Chunk).where(Chunk.document_id == source.id).order_by(Chunk.id)  # type: ignore[arg-type]
+        ).all()
+    if not source_chunks:
+        return None
+
+    vectors = await asyncio.to_thread(
+        store.fetch,
+        [chunk.embedding_id for chunk in source_chunks],
+        source.embedding_namespace,
+    )
+    if len(vectors) != len(source_chunks):
+        logger.warning(
+            f"Duplicate source {source.id} has {len(vectors)} of "
+            f"{len(source_chunks)} vectors; processing {target.id} from scratch"
+        )
+        return None
+
+    chunk_ids = [
+        chunk_uuid(target.id, ordinal) for ordinal in range(len(source_chunks))
+    ]
+    with session_scope() as session:
+        crud.create_chunks(
+            session=session,
+            chunks_in=[
+                ChunkCreate(
+                    document_id=target.id,
+                    text_content=chunk.text_content,
+                    embedding_id=str(chunk_id),
+                    content_hash=chunk.content_hash,
+                )
+                for chunk, chunk_id in zip(source_chunks, chunk_ids, strict=True)
+            ],
+            commit=False,
+            ids=chunk_ids,
+            skip_existing=True,
+        )
+    copies = {
+        chunk.embedding_id: chunk_id
+        for chunk, chunk_id in zip(source_chunks, chunk_ids, strict=True)
+    }
+
+    await upsert_vectors(
+        store,
+        [
+            {
+                "id": str(copies[vector["id"]]),
+                "values": vector["values"],
+                "metadata": {
+                    **vector["metadata"],
+                    "course_id": str(target.course_id),
+                    "document_id": str(target.id),
+                    "chunk_id": str(copies[vector["id"]]),
+                },
+            }
+            for vector in vectors
+        ],
+        namespace=target.embedding_namespace,
+    )
+
+    chunk_map = {
+        chunk.id: chunk_id
+        for chunk, chunk_id in zip(source_chunks, chunk_ids, strict=True)
+    }
+    with session_scope() as session:
+        pages = session.exec(
+            select(DocumentPage.content_hash, DocumentPage.text_gzip)
+            .where(DocumentPage.document_id == source.id)
+            .order_by(DocumentPage.page_number)  # type: ignore[arg-type]
+        ).all()
+        crud.replace_document_pages(
+            session=session,
+            document_id=target.id,
+            page_hashes=[page_hash for page_hash, _ in pages],
+            page_texts=[text for _, text in pages],
+            commit=False,
+        )
+
+        quizzes = session.exec(
+            select(Quiz).where(Quiz.chunk_id.in_(chunk_map))  # type: ignore[attr-defined]
+        ).all()
+        if quizzes:
+            session.execute(
+                insert(Quiz),
+                [
+                    {
+                        **quiz.model_dump(
+                            exclude={"id", "chunk_id", "created_at", "updated_at"}
+                        ),
+                        "id": uuid.uuid4(),
+                        "chunk_id": chunk_map[quiz.chunk_id],
+                    }
+                    for quiz in quizzes
+                ],
+            )
+
+        # Same pages, so the decks' content versions hold for the copy too
+        for deck in session.exec(
+            select(FlashcardDeck).where(FlashcardDeck.document_id == source.id)
+        ).all():
+            session.add(
+                FlashcardDeck(
+                    document_id=target.id,
+                    content_version=deck.content_version,
+                    cards=deck.cards,
+                )
+            )
+
+    return len(chunk_ids), len(quizzes)
@@ -0,0 +1,130 @@
+"""
+Content-addressed embedding cache backed by Postgres
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import unicodedata
+from typing import TYPE_CHECKING
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.models.embeddings import EmbeddingCache
+
+if TYPE_CHECKING:
+    from app.services.ingestion import EmbedFn
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Normalize text so whitespace-only differences share a cache entry."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def embedding_cache_key(text: str, model: str, dimensions: int) -> str:
+    payload = f"{model}\x00{dimensions}\x00{normalize_chunk_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def pack_vector(vector: list[float]) -> bytes:
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def unpack_vector(data: bytes) -> list[float]:
+    return np.frombuffer(data, dtype="<f4").tolist()
+
+
+def get_cached_embeddings(session: Session, keys: list[str]) -> dict[str, list[float]]:
+    if not keys:
+        return {}
+    statement = select(EmbeddingCache).where(
+        EmbeddingCache.content_hash.in_(keys)  # type: ignore[attr-defined]
+    )
+    return {
+        entry.content_hash: unpack_vector(entry.vector)
+        for entry in session.exec(statement).all()
+    }
+
+
+def store_cached_embeddings(
+    session: Session,
+    entries: dict[str, list[float]],
+    model: str,
+    dimensions: int,
+) -> None:
+    if not entries:
+        return
+    statement = (
+        insert(EmbeddingCache)
+        .values(
+            [
+                {
+                    "content_hash": key,
+                    "model": model,
+                    "dimensions": dimensions,
+                    "vector": pack_vector(vector),
+                }
+                for key, vector in entries.items()
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["content_hash"])
+    )
+    session.exec(statement)  # type: ignore[call-overload]
+    session.commit()
+
+
+class CachedEmbedder:
+    """
+    Wrap an embedding function with the persistent cache.
+
+    Only chunks whose key is missing from the cache are sent to `embed`; the
+    hit/miss counters let callers report a per-document hit rate. Cache
+    reads and writes run in a thread, off the event loop.
+    """
+
+    def __init__(self, embed: "EmbedFn", model: str, dimensions: int) -> None:
+        self.embed = embed
+        self.model = model
+        self.dimensions = dimensions
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _load(self, keys: list[str]) -> dict[str, list[float]]:
+        with Session(engine) as session:
+            return get_cached_embeddings(session, keys)
+
+    def _store(self, entries: dict[str, list[float]]) -> None:
+        with Session(engine) as session:
+            store_cached_embeddings(session, entries, self.model, self.dimensions)
+
+    async def __call__(self, batch: list[str]) -> list[list[float]]:
+        keys = [embedding_cache_key(t, self.model, self.dimensions) for t in batch]
+        cached = await asyncio.to_thread(self._load, keys)
+
+        missing = {
+            key: text
+            for key, text in zip(keys, batch, strict=True)
+            if key not in cached
+        }
+        if missing:
+            fresh = await self.embed(list(missing.values()))
+            new_entries = dict(zip(missing, fresh, strict=True))
+            await asyncio.to_thread(self._store, new_entries)
+            cached.update(new_entries)
+
+        self.hits += len(batch) - len(missing)
+        self.misses += len(missing)
+        return [cached[key] for key in keys]
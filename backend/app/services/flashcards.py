@@ -0,0 +1,169 @@
+"""
+Flashcard decks precomputed per document and content version
+"""
+
+import hashlib
+import logging
+import uuid
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.models.course import QAItem
+from app.models.document import Document, DocumentPage
+from app.models.embeddings import Chunk
+from app.models.flashcards import FlashcardDeck
+from app.models.jobs import IngestionJob, JobKind, JobStatus
+from app.prompts.flashcards import PROMPT
+from app.schemas.public import DocumentStatus
+from app.services.courses import generate_flashcards_from_text, get_retrieved_docs
+from app.services.job_queue import enqueue_job
+
+logger = logging.getLogger(__name__)
+
+
+class EmptyDeckError(Exception):
+    """No flashcards could be made from a document's content (yet)."""
+
+
+def content_version(session: Session, document_id: uuid.UUID) -> str | None:
+    """
+    Version of a document's ingested content: a hash of its page hashes.
+
+    Documents ingested before page hashes were recorded are versioned by
+    their chunk ids instead. None when the document has no content.
+    """
+    parts = session.exec(
+        select(DocumentPage.content_hash)
+        .where(DocumentPage.document_id == document_id)
+        .order_by(DocumentPage.page_number)  # type: ignore[arg-type]
+    ).all()
+    if not parts:
+        chunk_ids = session.exec(
+            select(Chunk.id).where(Chunk.document_id == document_id)
+        ).all()
+        parts = sorted(str(chunk_id) for chunk_id in chunk_ids)
+    if not parts:
+        return None
+    return hashlib.sha256("\n".join(parts).encode("ascii")).hexdigest()
+
+
+def get_deck(
+    session: Session, document_id: uuid.UUID, version: str
+) -> list[QAItem] | None:
+    deck = session.get(FlashcardDeck, (document_id, version))
+    if deck is None:
+        return None
+    return [QAItem.model_validate(card) for card in deck.cards]
+
+
+def store_deck(
+    session: Session, document_id: uuid.UUID, version: str, cards: list[QAItem]
+) -> None:
+    """Save the deck of `version`, replacing it and dropping older versions."""
+    values = {
+        "document_id": document_id,
+        "content_version": version,
+        "cards": [card.model_dump() for card in cards],
+    }
+    session.execute(
+        insert(FlashcardDeck)
+        .values(**values)
+        .on_conflict_do_update(
+            index_elements=["document_id", "content_version"],
+            set_={"cards": values["cards"]},
+        )
+    )
+    session.execute(
+        delete(FlashcardDeck).where(
+            col(FlashcardDeck.document_id) == document_id,
+            col(FlashcardDeck.content_version) != version,
+        )
+    )
+
+
+async def build_deck(document_id: uuid.UUID, refresh: bool = False) -> list[QAItem]:
+    """
+    Retrieve a document's most relevant chunks and turn them into flashcards.
+
+    With `refresh` the completion cache is bypassed, so an explicit
+    regeneration gets a new deck. Raises ConnectionError when the vector
+    store cannot be queried, and EmptyDeckError when it returns nothing
+    (freshly upserted vectors may not be visible yet) or the model made no
+    cards, so the job is retried rather than an empty deck saved.
+    """
+    texts = await get_retrieved_docs(document_id=document_id, query=PROMPT)
+    if not texts:
+        raise EmptyDeckError(f"No chunks retrieved for document {document_id}")
+    cards = await generate_flashcards_from_text(texts, refresh=refresh)
+    if not cards:
+        raise EmptyDeckError(f"No flashcards generated for document {document_id}")
+    return cards
+
+
+def _deck_jobs(
+    document_id: uuid.UUID, statuses: list[JobStatus]
+) -> SelectOfScalar[uuid.UUID]:
+    return select(IngestionJob.id).where(
+        IngestionJob.document_id == document_id,
+        IngestionJob.kind == JobKind.GENERATE_FLASHCARDS,
+        col(IngestionJob.status).in_(statuses),
+    )
+
+
+def flashcards_pending(session: Session, document_id: uuid.UUID) -> bool:
+    """Whether a deck job for the document is queued or running."""
+    pending = _deck_jobs(document_id, [JobStatus.QUEUED, JobStatus.RUNNING])
+    return session.exec(pending).first() is not None
+
+
+def enqueue_flashcards(
+    session: Session, document_id: uuid.UUID, force: bool = False
+) -> IngestionJob | None:
+    """
+    Queue a GENERATE_FLASHCARDS job unless the current content already has
+    a deck, a job for the document is waiting, or a job for the same
+    content version failed for good (a deck that cannot be made is not paid
+    for again). With `force` the deck is regenerated regardless.
+    """
+    version = content_version(session, document_id)
+    if not force:
+        if version and session.get(FlashcardDeck, (document_id, version)):
+            return None
+        failed = _deck_jobs(document_id, [JobStatus.FAILED]).where(
+            IngestionJob.payload["content_version"].astext == version  # type: ignore[index]
+        )
+        if session.exec(failed).first():
+            return None
+    pending = _deck_jobs(document_id, [JobStatus.QUEUED, JobStatus.RUNNING])
+    if force:
+        # Only a forced job that has not started yet covers this request
+        pending = pending.where(
+            IngestionJob.status == JobStatus.QUEUED,
+            IngestionJob.payload["force"].as_boolean(),  # type: ignore[index]
+        )
+    if session.exec(pending).first():
+        return None
+    return enqueue_job(
+        session,
+        JobKind.GENERATE_FLASHCARDS,
+        document_id,
+        {"force": force, "content_version": version},
+    )
+
+
+def enqueue_missing_decks(session: Session, course_id: uuid.UUID | None = None) -> int:
+    """
+    Queue a deck for every completed document without one for its current
+    content, such as documents processed before decks existed. Returns the
+    number queued.
+    """
+    statement = select(Document.id).where(Document.status == DocumentStatus.COMPLETED)
+    if course_id:
+        statement = statement.where(Document.course_id == course_id)
+    return sum(
+        enqueue_flashcards(session, document_id) is not None
+        for document_id in session.exec(statement).all()
+    )
@@ -0,0 +1,186 @@
+"""
+Streaming stages for the document ingestion pipeline
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import uuid
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
+
+from app.core.config import settings
+from app.services.chunking import TokenChunker
+from app.services.embedding_cache import normalize_chunk_text
+from app.services.vector_upsert import UpsertStats
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+@dataclass
+class IngestionMetrics:
+    """Per-document counters reported when ingestion finishes."""
+
+    chunks: int = 0
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
+    first_searchable_seconds: float | None = None
+    total_seconds: float = 0.0
+    upsert: UpsertStats = field(default_factory=UpsertStats)
+
+    @property
+    def embedding_cache_hit_rate(self) -> float:
+        total = self.embedding_cache_hits + self.embedding_cache_misses
+        return self.embedding_cache_hits / total if total else 0.0
+
+    def summary(self) -> str:
+        first = (
+            f"{self.first_searchable_seconds:.2f}s"
+            if self.first_searchable_seconds is not None
+            else "n/a"
+        )
+        return (
+            f"{self.chunks} chunks in {self.total_seconds:.2f}s "
+            f"(first searchable after {first}); "
+            f"embedding cache {self.embedding_cache_hit_rate:.0%} hit rate; "
+            f"upserted {self.upsert.vectors} vectors / {self.upsert.bytes} bytes "
+            f"in {self.upsert.requests} requests "
+            f"({self.upsert.vectors_per_second:.1f} vectors/s, "
+            f"{self.upsert.retries} retries)"
+        )
+
+
+def chunk_uuid(document_id: uuid.UUID, ordinal: int) -> uuid.UUID:
+    """
+    Id of the document's `ordinal`-th chunk, also used as its vector id, so
+    a retried job overwrites what an earlier attempt stored instead of
+    leaving duplicates behind.
+    """
+    return uuid.uuid5(document_id, str(ordinal))
+
+
+def content_hash(text: str) -> str:
+    """sha256 of the normalized text, stable across re-extraction of a PDF."""
+    return hashlib.sha256(normalize_chunk_text(text).encode()).hexdigest()
+
+
+def compress_text(text: str) -> bytes:
+    return gzip.compress(text.encode("utf-8"), mtime=0)
+
+
+def decompress_text(data: bytes) -> str:
+    return gzip.decompress(data).decode("utf-8")
+
+
+async def hash_pages(
+    pages: AsyncIterable[str],
+    hashes: list[str],
+    texts: list[bytes] | None = None,
+) -> AsyncIterator[str]:
+    """
+    Pass pages through, appending the content hash of each to `hashes` and,
+    when given, its compressed text to `texts`.
+    """
+    async for page in pages:
+        hashes.append(content_hash(page))
+        if texts is not None:
+            texts.append(compress_text(page))
+        yield page
+
+
+async def iter_text_chunks(
+    pages: AsyncIterable[str], chunker: TokenChunker | None = None
+) -> AsyncIterator[str]:
+    """
+    Incrementally split a stream of page texts into token-sized chunks.
+
+    Each chunk is yielded as soon as it is complete; a sentence that runs
+    across a page break is joined with the start of the next page.
+    """
+    chunker = chunker or TokenChunker()
+    async for page in pages:
+        for chunk in chunker.feed(page):
+            yield chunk
+    for chunk in chunker.flush():
+        yield chunk
+
+
+async def skip(items: AsyncIterable[str], count: int) -> AsyncIterator[str]:
+    """Drop the first `count` items of a stream."""
+    async for item in items:
+        if count > 0:
+            count -= 1
+            continue
+        yield item
+
+
+async def batched(items: AsyncIterable[str], size: int) -> AsyncIterator[list[str]]:
+    """Group a stream into lists of at most `size` items."""
+    batch: list[str] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _embed_batch(
+    batch: list[str], embed: EmbedFn, semaphore: asyncio.Semaphore, max_retries: int
+) -> list[list[float]]:
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(max_retries + 1),
+        wait=wait_exponential(multiplier=0.5, max=8),
+        reraise=True,
+    ):
+        with attempt:
+            if attempt.retry_state.attempt_number > 1:
+                logger.warning(
+                    f"Retrying embedding batch of {len(batch)} chunks "
+                    f"(attempt {attempt.retry_state.attempt_number})"
+                )
+            async with semaphore:
+                return await embed(batch)
+    raise AssertionError("unreachable")
+
+
+async def embed_batches(
+    batches: AsyncIterable[list[str]],
+    embed: EmbedFn,
+    concurrency: int | None = None,
+    max_retries: int | None = None,
+) -> AsyncIterator[tuple[list[str], list[list[float]]]]:
+    """
+    Embed a stream of batches with up to `concurrency` requests in flight.
+
+    Results are yielded in input order. A failing batch is retried on its own
+    with exponential backoff; only after `max_retries` does the error propagate.
+    """
+    concurrency = max(1, concurrency or settings.EMBEDDING_CONCURRENCY)
+    if max_retries is None:
+        max_retries = settings.EMBEDDING_MAX_RETRIES
+    semaphore = asyncio.Semaphore(concurrency)
+
+    pending: deque[tuple[list[str], asyncio.Task[list[list[float]]]]] = deque()
+    try:
+        async for batch in batches:
+            task = asyncio.create_task(
+                _embed_batch(batch, embed, semaphore, max_retries)
+            )
+            pending.append((batch, task))
+            if len(pending) >= concurrency:
+                done_batch, done_task = pending.popleft()
+                yield done_batch, await done_task
+        while pending:
+            done_batch, done_task = pending.popleft()
+            yield done_batch, await done_task
+    finally:
+        for _, task in pending:
+            task.cancel()
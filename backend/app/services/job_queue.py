@@ -0,0 +1,289 @@
+"""
+Durable Postgres-backed job queue for ingestion work
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, func, or_
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.models.course import Course
+from app.models.document import Document
+from app.models.jobs import IngestionJob, JobKind, JobStatus
+from app.schemas.public import DocumentStatus, IngestionQueuePublic
+from app.services.uploads import discard_upload
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 15 * 60
+
+# Advisory lock key serializing claims, so the global running cap holds
+CLAIM_LOCK_KEY = 0x1A9E57
+
+# Jobs that move their document to PROCESSING while they run
+DOCUMENT_JOB_KINDS = (JobKind.PROCESS_PDF, JobKind.RECHUNK, JobKind.REEMBED)
+
+
+class QueueFullError(Exception):
+    """The ingestion backlog is too deep to accept more work right now."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def enqueue_job(
+    session: Session,
+    kind: JobKind,
+    document_id: uuid.UUID,
+    payload: dict[str, Any] | None = None,
+) -> IngestionJob:
+    owner_id = session.exec(
+        select(Course.owner_id)
+        .join(Document, col(Document.course_id) == Course.id)
+        .where(Document.id == document_id)
+    ).first()
+    job = IngestionJob(
+        kind=kind,
+        document_id=document_id,
+        owner_id=owner_id,
+        payload=payload or {},
+        max_attempts=settings.INGESTION_JOB_MAX_ATTEMPTS,
+    )
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: base, 2x base, 4x base, ... capped at 15 minutes."""
+    seconds = settings.INGESTION_JOB_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1)
+    return timedelta(seconds=min(seconds, MAX_RETRY_DELAY_SECONDS))
+
+
+def _running(now: datetime) -> Any:
+    return and_(
+        IngestionJob.status == JobStatus.RUNNING,
+        IngestionJob.lease_expires_at >= now,  # type: ignore[operator]
+    )
+
+
+def _fail_document(session: Session, job: IngestionJob) -> None:
+    """Mark the document FAILED as its task would have on a last attempt."""
+    if job.kind not in DOCUMENT_JOB_KINDS:
+        return
+    document = session.get(Document, job.document_id)
+    if document and document.status in (
+        DocumentStatus.PENDING,
+        DocumentStatus.PROCESSING,
+    ):
+        document.status = DocumentStatus.FAILED
+        session.add(document)
+
+
+def claim_job(
+    session: Session,
+    worker_id: str,
+    lease_seconds: int | None = None,
+    max_running: int | None = None,
+) -> IngestionJob | None:
+    """
+    Claim the next runnable job with SELECT ... FOR UPDATE SKIP LOCKED.
+
+    Queued jobs whose `run_at` has passed are eligible, as are running jobs
+    whose lease expired because their worker died.
+
+    At most `max_running` (INGESTION_MAX_RUNNING_JOBS) jobs run at once
+    across all workers; claims take a transaction-level advisory lock so the
+    cap holds under concurrency. Owners with the fewest jobs in flight go
+    first, then the oldest job, so capacity rotates between users instead
+    of draining one user's backlog first.
+    """
+    lease = timedelta(seconds=lease_seconds or settings.INGESTION_JOB_LEASE_SECONDS)
+    if max_running is None:
+        max_running = settings.INGESTION_MAX_RUNNING_JOBS
+
+    while True:
+        now = datetime.now(timezone.utc)
+        session.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY)))
+        running = session.exec(
+            select(func.count()).select_from(IngestionJob).where(_running(now))
+        ).one()
+        if running >= max_running:
+            session.rollback()
+            return None
+
+        in_flight = (
+            select(IngestionJob.owner_id, func.count().label("jobs"))
+            .where(_running(now))
+            .group_by(IngestionJob.owner_id)  # type: ignore[arg-type]
+            .subquery()
+        )
+        statement = (
+            select(IngestionJob)
+            .outerjoin(in_flight, in_flight.c.owner_id == IngestionJob.owner_id)
+            .where(
+                or_(
+                    and_(
+                        IngestionJob.status == JobStatus.QUEUED,
+                        IngestionJob.run_at <= now,
+                    ),
+                    and_(
+                        IngestionJob.status == JobStatus.RUNNING,
+                        IngestionJob.lease_expires_at < now,  # type: ignore[operator]
+                    ),
+                )
+            )
+            .order_by(
+                func.coalesce(in_flight.c.jobs, 0),
+                IngestionJob.run_at,  # type: ignore[arg-type]
+            )
+            .limit(1)
+            .with_for_update(skip_locked=True, of=IngestionJob)  # type: ignore[arg-type]
+        )
+        job = session.exec(statement).first()
+        if job is None:
+            session.rollback()
+            return None
+
+        if job.attempts >= job.max_attempts:
+            # Its last attempt died without reporting back
+            job.status = JobStatus.FAILED
+            job.last_error = job.last_error or "Lease expired on final attempt"
+            job.locked_by = None
+            job.lease_expires_at = None
+            session.add(job)
+            _fail_document(session, job)
+            session.commit()
+            discard_upload(job)
+            continue
+
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.lease_expires_at = now + lease
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+
+def renew_lease(
+    session: Session,
+    job_id: uuid.UUID,
+    worker_id: str,
+    lease_seconds: int | None = None,
+) -> bool:
+    """Extend the lease of a job this worker still owns."""
+    job = session.get(IngestionJob, job_id)
+    if not job or job.locked_by != worker_id or job.status != JobStatus.RUNNING:
+        return False
+    lease = timedelta(seconds=lease_seconds or settings.INGESTION_JOB_LEASE_SECONDS)
+    job.lease_expires_at = datetime.now(timezone.utc) + lease
+    session.add(job)
+    session.commit()
+    return True
+
+
+def complete_job(session: Session, job_id: uuid.UUID) -> None:
+    job = session.get(IngestionJob, job_id)
+    if not job:
+        return
+    job.status = JobStatus.COMPLETED
+    job.locked_by = None
+    job.lease_expires_at = None
+    session.add(job)
+    session.commit()
+
+
+def fail_job(session: Session, job_id: uuid.UUID, error: str) -> IngestionJob | None:
+    """Requeue the job with backoff, or mark it failed once attempts run out."""
+    job = session.get(IngestionJob, job_id)
+    if not job:
+        return None
+
+    job.last_error = error[:2000]
+    job.locked_by = None
+    job.lease_expires_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = JobStatus.FAILED
+    else:
+        job.status = JobStatus.QUEUED
+        job.run_at = datetime.now(timezone.utc) + retry_delay(job.attempts)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def check_admission(session: Session, owner_id: uuid.UUID, new_jobs: int = 1) -> None:
+    """
+    Refuse `new_jobs` more jobs for `owner_id` when the queue is too deep.
+
+    Raises QueueFullError when the global backlog would exceed
+    INGESTION_MAX_QUEUED_JOBS or the owner's queued and running jobs would
+    exceed INGESTION_MAX_QUEUED_JOBS_PER_USER.
+    """
+    queued = session.exec(
+        select(func.count())
+        .select_from(IngestionJob)
+        .where(IngestionJob.status == JobStatus.QUEUED)
+    ).one()
+    if queued + new_jobs > settings.INGESTION_MAX_QUEUED_JOBS:
+        logger.warning(f"Ingestion queue full: {queued} jobs queued")
+        raise QueueFullError(
+            "Too many documents are waiting to be processed. Please try again later.",
+            settings.INGESTION_RETRY_AFTER_SECONDS,
+        )
+
+    pending = session.exec(
+        select(func.count())
+        .select_from(IngestionJob)
+        .where(
+            IngestionJob.owner_id == owner_id,
+            col(IngestionJob.status).in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+        )
+    ).one()
+    if pending + new_jobs > settings.INGESTION_MAX_QUEUED_JOBS_PER_USER:
+        raise QueueFullError(
+            f"You already have {pending} documents being processed. "
+            "Please wait for them to finish.",
+            settings.INGESTION_RETRY_AFTER_SECONDS,
+        )
+
+
+def queue_stats(session: Session) -> IngestionQueuePublic:
+    """Current queue depth, for monitoring the scheduler."""
+    now = datetime.now(timezone.utc)
+    queued = and_(IngestionJob.status == JobStatus.QUEUED, IngestionJob.run_at <= now)
+    by_kind = session.exec(
+        select(IngestionJob.kind, func.count())
+        .where(queued)
+        .group_by(IngestionJob.kind)  # type: ignore[arg-type]
+    ).all()
+    owners_waiting, oldest = session.exec(
+        select(
+            func.count(func.distinct(IngestionJob.owner_id)),
+            func.min(IngestionJob.run_at),
+        ).where(queued)
+    ).one()
+    return IngestionQueuePublic(
+        queued=sum(count for _, count in by_kind),
+        queued_by_kind={kind.value: count for kind, count in by_kind},
+        delayed=session.exec(
+            select(func.count())
+            .select_from(IngestionJob)
+            .where(IngestionJob.status == JobStatus.QUEUED, IngestionJob.run_at > now)
+        ).one(),
+        running=session.exec(
+            select(func.count()).select_from(IngestionJob).where(_running(now))
+        ).one(),
+        max_running=settings.INGESTION_MAX_RUNNING_JOBS,
+        owners_waiting=owners_waiting,
+        oldest_queued_seconds=(now - oldest).total_seconds() if oldest else 0.0,
+    )
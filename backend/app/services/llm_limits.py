@@ -0,0 +1,29 @@
+"""
+Process-wide limit on concurrent LLM requests
+"""
+
+import asyncio
+import weakref
+
+from app.core.config import settings
+
+_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def llm_semaphore() -> asyncio.Semaphore:
+    """
+    Semaphore bounding the chat completions in flight in this event loop.
+
+    Every job in the process shares it, so running quiz levels (and jobs)
+    concurrently cannot exceed LLM_CONCURRENCY requests against the
+    provider's rate limits. One semaphore per loop, since an asyncio
+    semaphore cannot be shared between loops.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, settings.LLM_CONCURRENCY))
+        _semaphores[loop] = semaphore
+    return semaphore
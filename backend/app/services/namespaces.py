@@ -0,0 +1,177 @@
+"""
+Per-course vector namespaces
+"""
+
+import asyncio
+import logging
+import uuid
+
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.db import engine, session_scope
+from app.models.document import Document
+from app.models.embeddings import Chunk
+from app.models.jobs import IngestionJob, JobKind, JobStatus
+from app.schemas.public import DocumentStatus
+from app.services.job_queue import enqueue_job
+from app.services.vector_upsert import upsert_vectors
+from app.vector_stores import MetadataFilter, VectorMatch, VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+def course_namespace(course_id: uuid.UUID) -> str:
+    return f"course-{course_id}"
+
+
+def ingestion_namespace(course_id: uuid.UUID) -> str | None:
+    """Namespace new vectors of the course go to; None is the shared one."""
+    if settings.VECTOR_NAMESPACE_PER_COURSE:
+        return course_namespace(course_id)
+    return None
+
+
+def course_namespaces(
+    session: Session, course_id: uuid.UUID, completed_only: bool = False
+) -> list[str | None]:
+    """
+    Namespaces holding vectors of the course's documents.
+
+    With `completed_only`, only those of COMPLETED documents: a document
+    still being ingested has no searchable vectors, and its namespace is
+    None until ingestion assigns one, which would otherwise put the shared
+    namespace in every search of the course.
+    """
+    statement = select(Document.embedding_namespace).where(
+        Document.course_id == course_id
+    )
+    if completed_only:
+        statement = statement.where(Document.status == DocumentStatus.COMPLETED)
+    return list(session.exec(statement.distinct()).all())
+
+
+def query_course(
+    store: VectorStore, course_id: uuid.UUID, vector: list[float], top_k: int
+) -> list[VectorMatch]:
+    """
+    Top matches among the course's vectors.
+
+    A course namespace is searched without a filter. The shared namespace is
+    searched, by `course_id`, only while a completed document of the course
+    has not been moved out of it.
+    """
+    with Session(engine) as session:
+        namespaces = course_namespaces(session, course_id, completed_only=True)
+    searches: list[tuple[str | None, MetadataFilter | None]] = [
+        (namespace, None) for namespace in namespaces if namespace is not None
+    ]
+    if None in namespaces:
+        searches.append((None, {"course_id": str(course_id)}))
+    matches = [
+        match
+        for namespace, filter in searches
+        for match in store.query(
+            vector=vector, top_k=top_k, filter=filter, namespace=namespace
+        )
+    ]
+    matches.sort(key=lambda m: m.score, reverse=True)
+    return matches[:top_k]
+
+
+def query_document(
+    store: VectorStore, document_id: uuid.UUID, vector: list[float], top_k: int
+) -> list[VectorMatch]:
+    """Top matches among one document's vectors, in its namespace."""
+    with Session(engine) as session:
+        document = session.get(Document, document_id)
+    if not document:
+        return []
+    return store.query(
+        vector=vector,
+        top_k=top_k,
+        filter={"document_id": str(document_id)},
+        namespace=document.embedding_namespace,
+    )
+
+
+def delete_course_vectors(
+    store: VectorStore, course_id: uuid.UUID, namespaces: list[str | None]
+) -> None:
+    """Drop the course namespace, and the course's vectors left in the shared one."""
+    for namespace in namespaces:
+        if namespace:
+            store.delete_namespace(namespace)
+        else:
+            store.delete(filter={"course_id": str(course_id)})
+
+
+async def move_document_vectors(document_id: uuid.UUID, store: VectorStore) -> int:
+    """
+    Move a document's vectors into its course namespace.
+
+    Vectors keep their ids, so chunks need no update. They are copied first,
+    then the document is pointed at the new namespace, then the old copies
+    are deleted, so retrieval finds them throughout. Returns the number of
+    vectors moved.
+    """
+    with session_scope() as session:
+        document = session.get(Document, document_id)
+        if not document:
+            return 0
+        if document.status in (DocumentStatus.PENDING, DocumentStatus.PROCESSING):
+            raise RuntimeError(f"Document {document_id} is being ingested")
+        source = document.embedding_namespace
+        target = course_namespace(document.course_id)
+        if source == target:
+            return 0
+        embedding_ids = list(
+            session.exec(
+                select(Chunk.embedding_id).where(Chunk.document_id == document_id)
+            ).all()
+        )
+
+    vectors = await asyncio.to_thread(store.fetch, embedding_ids, source)
+    if len(vectors) != len(embedding_ids):
+        logger.warning(
+            f"Document {document_id} has {len(vectors)} of "
+            f"{len(embedding_ids)} vectors in {source or 'the shared namespace'}"
+        )
+    await upsert_vectors(store, vectors, namespace=target)
+
+    with session_scope() as session:
+        document = session.get(Document, document_id)
+        if not document:
+            return 0
+        document.embedding_namespace = target
+        session.add(document)
+
+    if vectors:
+        await asyncio.to_thread(
+            store.delete, ids=[vector["id"] for vector in vectors], namespace=source
+        )
+    logger.info(f"Moved {len(vectors)} vectors of {document_id} to {target}")
+    return len(vectors)
+
+
+def enqueue_namespace_moves(session: Session) -> int:
+    """
+    Queue a MOVE_VECTORS job for every ingested document outside its course
+    namespace, unless one is already waiting. Returns the number queued.
+    """
+    pending = select(IngestionJob.document_id).where(
+        IngestionJob.kind == JobKind.MOVE_VECTORS,
+        col(IngestionJob.status).in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+    )
+    rows = session.exec(
+        select(Document.id, Document.course_id, Document.embedding_namespace).where(
+            col(Document.status).in_([DocumentStatus.COMPLETED, DocumentStatus.FAILED]),
+            col(Document.id).not_in(pending),
+        )
+    ).all()
+    queued = 0
+    for document_id, course_id, namespace in rows:
+        if namespace != course_namespace(course_id):
+            enqueue_job(session, JobKind.MOVE_VECTORS, document_id)
+            queued += 1
+    return queued
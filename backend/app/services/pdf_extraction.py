@@ -0,0 +1,99 @@
+"""
+PDF text extraction service backed by a process pool
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_extraction_executor() -> ProcessPoolExecutor:
+    """Return the shared extraction pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        # Spawn instead of fork: the parent runs an event loop and client threads
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_extraction_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def count_pages(file_path: str) -> int:
+    with open(file_path, "rb") as f:
+        return len(PdfReader(f).pages)
+
+
+def extract_page_range(file_path: str, start: int, stop: int) -> list[str]:
+    """Extract the text of pages [start, stop). Runs inside a pool worker."""
+    with open(file_path, "rb") as f:
+        reader = PdfReader(f)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def split_page_ranges(page_count: int, pages_per_task: int) -> list[tuple[int, int]]:
+    step = max(1, pages_per_task)
+    return [
+        (start, min(start + step, page_count)) for start in range(0, page_count, step)
+    ]
+
+
+async def iter_pdf_pages(file_path: str) -> AsyncIterator[str]:
+    """
+    Yield the text of every page, in order, without blocking the event loop.
+
+    Page ranges are extracted in parallel across the pool, but only
+    PDF_EXTRACTION_WORKERS ranges are in flight at once so memory stays bounded
+    by that window rather than by the document size.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_extraction_executor()
+
+    page_count = await loop.run_in_executor(executor, count_pages, file_path)
+    ranges = split_page_ranges(page_count, settings.PDF_EXTRACTION_PAGES_PER_TASK)
+    window = max(1, settings.PDF_EXTRACTION_WORKERS)
+
+    pending: deque[asyncio.Future[list[str]]] = deque()
+    try:
+        for start, stop in ranges:
+            pending.append(
+                loop.run_in_executor(
+                    executor, extract_page_range, file_path, start, stop
+                )
+            )
+            if len(pending) >= window:
+                for text in await pending.popleft():
+                    yield text
+        while pending:
+            for text in await pending.popleft():
+                yield text
+    finally:
+        for future in pending:
+            future.cancel()
+
+    logger.info(
+        f"Extracted {page_count} pages from {file_path} in {len(ranges)} range(s)"
+    )
+
+
+async def extract_pdf_pages(file_path: str) -> list[str]:
+    """Extract the text of every page; the result has one entry per page."""
+    return [text async for text in iter_pdf_pages(file_path)]
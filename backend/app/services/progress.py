@@ -0,0 +1,228 @@
+"""
+Per-stage ingestion progress shared between workers and the API
+"""
+
+import json
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+from datetime import datetime, timezone
+from typing import Any, TypeVar
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.document import Document
+from app.models.jobs import IngestionJob, IngestionProgress, JobStatus
+from app.schemas.public import (
+    DocumentProgressPublic,
+    DocumentStatus,
+    IngestionStage,
+    StageProgressPublic,
+    StageStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STAGE_UNITS = {
+    IngestionStage.SAVE: "bytes",
+    IngestionStage.EXTRACT: "pages",
+    IngestionStage.CHUNK: "chunks",
+    IngestionStage.EMBED: "chunks",
+    IngestionStage.UPSERT: "vectors",
+    IngestionStage.QUIZ_GENERATION: "prompts",
+}
+
+PIPELINE_STAGES = (
+    IngestionStage.EXTRACT,
+    IngestionStage.CHUNK,
+    IngestionStage.EMBED,
+    IngestionStage.UPSERT,
+)
+
+
+class ProgressTracker:
+    """
+    Record counters and timings of a document's ingestion stages.
+
+    Rows live in Postgres so API processes can report progress of jobs run
+    by separate workers. Each write uses its own short session, so it never
+    joins the pipeline's transaction. Counter updates are throttled to one
+    write per stage every INGESTION_PROGRESS_FLUSH_SECONDS; starting and
+    finishing a stage always write. Failed writes are logged, not raised.
+    """
+
+    def __init__(
+        self, document_id: uuid.UUID, flush_seconds: float | None = None
+    ) -> None:
+        self.document_id = document_id
+        self.flush_seconds = (
+            settings.INGESTION_PROGRESS_FLUSH_SECONDS
+            if flush_seconds is None
+            else flush_seconds
+        )
+        self._rows: dict[IngestionStage, dict[str, Any]] = {}
+        self._started: dict[IngestionStage, float] = {}
+        self._flushed_at: dict[IngestionStage, float] = {}
+
+    def reset(self, stages: Iterable[IngestionStage]) -> None:
+        """Forget earlier attempts of `stages`."""
+        stages = list(stages)
+        for stage in stages:
+            self._rows.pop(stage, None)
+        try:
+            with Session(engine) as session:
+                session.execute(
+                    delete(IngestionProgress).where(
+                        IngestionProgress.document_id == self.document_id,  # type: ignore[arg-type]
+                        IngestionProgress.stage.in_(stages),  # type: ignore[attr-defined]
+                    )
+                )
+                session.commit()
+        except Exception as e:
+            logger.warning(f"Could not reset progress of {self.document_id}: {e}")
+
+    def start(self, stage: IngestionStage, total: int | None = None) -> None:
+        now = datetime.now(timezone.utc)
+        self._started[stage] = time.perf_counter()
+        self._rows[stage] = {
+            "status": StageStatus.RUNNING,
+            "done": 0,
+            "total": total,
+            "started_at": now,
+            "finished_at": None,
+            "seconds": 0.0,
+        }
+        self._write(stage)
+
+    def update(
+        self, stage: IngestionStage, done: int, total: int | None = None
+    ) -> None:
+        if stage not in self._rows:
+            self.start(stage, total)
+        row = self._rows[stage]
+        row["done"] = done
+        if total is not None:
+            row["total"] = total
+        if time.perf_counter() - self._flushed_at.get(stage, 0.0) >= self.flush_seconds:
+            self._write(stage)
+
+    def advance(self, stage: IngestionStage, count: int = 1) -> None:
+        done = self._rows[stage]["done"] if stage in self._rows else 0
+        self.update(stage, done + count)
+
+    def finish(
+        self, stage: IngestionStage, status: StageStatus = StageStatus.COMPLETED
+    ) -> None:
+        if stage not in self._rows:
+            self.start(stage)
+        row = self._rows[stage]
+        row["status"] = status
+        row["finished_at"] = datetime.now(timezone.utc)
+        self._write(stage)
+
+    def fail_running(self) -> None:
+        for stage, row in self._rows.items():
+            if row["status"] == StageStatus.RUNNING:
+                self.finish(stage, StageStatus.FAILED)
+
+    def record(
+        self, stage: IngestionStage, done: int, seconds: float, total: int | None = None
+    ) -> None:
+        """Record a stage that already ran, such as saving the upload."""
+        finished_at = datetime.now(timezone.utc)
+        self._rows[stage] = {
+            "status": StageStatus.COMPLETED,
+            "done": done,
+            "total": total,
+            "started_at": datetime.fromtimestamp(
+                finished_at.timestamp() - seconds, timezone.utc
+            ),
+            "finished_at": finished_at,
+            "seconds": seconds,
+        }
+        self._write(stage, measured=False)
+
+    async def count(
+        self,
+        stage: IngestionStage,
+        items: AsyncIterable[T],
+        size: Callable[[T], int] = lambda _: 1,
+        total: int | None = None,
+    ) -> AsyncIterator[T]:
+        """Pass a stream through, counting it as the progress of `stage`."""
+        self.start(stage, total)
+        async for item in items:
+            self.advance(stage, size(item))
+            yield item
+        self.finish(stage)
+
+    def _write(self, stage: IngestionStage, measured: bool = True) -> None:
+        row = self._rows[stage]
+        if measured and stage in self._started:
+            row["seconds"] = time.perf_counter() - self._started[stage]
+        values = {**row, "updated_at": datetime.now(timezone.utc)}
+        statement = (
+            insert(IngestionProgress)
+            .values(document_id=self.document_id, stage=stage, **values)
+            .on_conflict_do_update(index_elements=["document_id", "stage"], set_=values)
+        )
+        try:
+            with Session(engine) as session:
+                session.execute(statement)
+                session.commit()
+        except Exception as e:
+            logger.warning(
+                f"Could not record {stage.value} progress of {self.document_id}: {e}"
+            )
+        self._flushed_at[stage] = time.perf_counter()
+
+
+def get_progress(session: Session, document: Document) -> DocumentProgressPublic:
+    """
+    Snapshot of every recorded stage of `document`.
+
+    `finished` is set once the document is COMPLETED or FAILED and no job
+    for it is queued or running, so a failed attempt that will be retried
+    does not end the stream.
+    """
+    rows = session.exec(
+        select(IngestionProgress).where(IngestionProgress.document_id == document.id)
+    ).all()
+    order = list(IngestionStage)
+    active_job = session.exec(
+        select(IngestionJob.id).where(
+            IngestionJob.document_id == document.id,
+            IngestionJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),  # type: ignore[attr-defined]
+        )
+    ).first()
+    return DocumentProgressPublic(
+        document_id=document.id,
+        status=document.status,
+        finished=active_job is None
+        and document.status in (DocumentStatus.COMPLETED, DocumentStatus.FAILED),
+        stages=[
+            StageProgressPublic(
+                stage=row.stage,
+                status=row.status,
+                done=row.done,
+                total=row.total,
+                unit=STAGE_UNITS[row.stage],
+                seconds=row.seconds,
+                started_at=row.started_at,
+                finished_at=row.finished_at,
+            )
+            for row in sorted(rows, key=lambda row: order.index(row.stage))
+        ],
+    )
+
+
+def format_event(event: str, data: Any) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,96 @@
+"""
+Token-bounded windows of a document's chunks for quiz generation
+"""
+
+import math
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from app.core.config import settings
+from app.services.chunking import Encoding, get_encoding
+
+T = TypeVar("T")
+
+
+@dataclass
+class QuizWindow:
+    """Consecutive chunks sent to the LLM in one quiz prompt."""
+
+    chunk_ids: list[uuid.UUID] = field(default_factory=list)
+    texts: list[str] = field(default_factory=list)
+    tokens: int = 0
+
+    def prompt_text(self) -> str:
+        """Chunks numbered from 1, so quizzes can name their source passage."""
+        return "\n\n".join(
+            f"[{number}] {text}" for number, text in enumerate(self.texts, start=1)
+        )
+
+    def source_chunk(self, number: object) -> uuid.UUID:
+        """Chunk id of passage `number`, or the first chunk if it is not valid."""
+        if isinstance(number, int) and 1 <= number <= len(self.chunk_ids):
+            return self.chunk_ids[number - 1]
+        return self.chunk_ids[0]
+
+
+def build_windows(
+    chunks: Sequence[tuple[uuid.UUID, str]],
+    max_tokens: int | None = None,
+    encoding: Encoding | None = None,
+) -> list[QuizWindow]:
+    """
+    Pack consecutive `(chunk id, text)` pairs into windows of at most
+    `max_tokens` tokens. A chunk larger than the budget gets a window of its
+    own, so no text is dropped.
+    """
+    max_tokens = max_tokens or settings.QUIZ_WINDOW_TOKENS
+    encoding = encoding or get_encoding()
+    windows: list[QuizWindow] = []
+    window = QuizWindow()
+    for chunk_id, text in chunks:
+        tokens = len(encoding.encode_ordinary(text))
+        if window.chunk_ids and window.tokens + tokens > max_tokens:
+            windows.append(window)
+            window = QuizWindow()
+        window.chunk_ids.append(chunk_id)
+        window.texts.append(text)
+        window.tokens += tokens
+    if window.chunk_ids:
+        windows.append(window)
+    return windows
+
+
+def quizzes_per_window(limit: int, windows: int) -> int:
+    """How many quizzes to ask each window for, so `windows` together reach `limit`."""
+    return max(1, math.ceil(limit / max(1, windows)))
+
+
+def spread(items: Sequence[T], count: int) -> list[T]:
+    """
+    At most `count` of `items` at an even stride, the middle of each of
+    `count` equal stretches, so a long sequence is sampled end to end.
+    """
+    if count >= len(items):
+        return list(items)
+    if count <= 0:
+        return []
+    return [items[(2 * i + 1) * len(items) // (2 * count)] for i in range(count)]
+
+
+def select_quizzes(per_window: list[list[T]], limit: int) -> list[T]:
+    """
+    Keep at most `limit` quizzes, taking them round-robin across windows so
+    the selection covers the whole document rather than its beginning. When
+    a round has more quizzes than are still wanted, they are spread across
+    the windows instead of taken from the first ones.
+    """
+    selected: list[T] = []
+    for rank in range(max((len(items) for items in per_window), default=0)):
+        candidates = [items[rank] for items in per_window if rank < len(items)]
+        remaining = limit - len(selected)
+        if len(candidates) >= remaining:
+            return selected + spread(candidates, remaining)
+        selected.extend(candidates)
+    return selected
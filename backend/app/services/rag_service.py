@@ -1,15 +1,17 @@
 """
 RAG (Retrieval-Augmented Generation) service for document context retrieval
 """
+import asyncio
 import uuid
 from typing import List, Optional
 
 from app.api.routes.documents import (
     async_openai_client,
     EMBEDDING_MODEL,
-    index_name,
-    pc,
 )
+from app.services.chunk_texts import match_texts
+from app.services.namespaces import query_course
+from app.vector_stores import get_vector_store
 
 
 async def get_question_embedding(question: str) -> List[float]:
@@ -38,20 +40,12 @@ async def retrieve_relevant_context(
         Concatenated context string or None if no relevant content found
     """
     try:
-        # Query Pinecone for relevant chunks
-        index = pc.Index(index_name)
-        query_result = index.query(
-            vector=question_embedding,
-            filter={"course_id": str(course_id)},
-            top_k=top_k,
-            include_metadata=True,
+        # Query the vector store for relevant chunks
+        matches = await asyncio.to_thread(
+            query_course, get_vector_store(), course_id, question_embedding, top_k
         )
         
-        contexts = [
-            match["metadata"]["text"]
-            for match in query_result["matches"]
-            if "metadata" in match and "text" in match["metadata"]
-        ]
+        contexts = await asyncio.to_thread(match_texts, matches)
 
         if not contexts:
             return None
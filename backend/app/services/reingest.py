@@ -0,0 +1,294 @@
+"""
+Incremental re-ingestion of a replaced document
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+
+from sqlalchemy import update
+from sqlmodel import Session, col, select
+
+from app import crud
+from app.core.config import settings
+from app.core.db import session_scope
+from app.models.document import Document, DocumentPage
+from app.models.embeddings import Chunk, ChunkCreate
+from app.models.jobs import IngestionJob, JobKind, JobStatus
+from app.schemas.public import DocumentStatus, IngestionStage
+from app.services.chunk_texts import vector_metadata
+from app.services.chunking import TokenChunker
+from app.services.ingestion import (
+    EmbedFn,
+    batched,
+    content_hash,
+    decompress_text,
+    embed_batches,
+    hash_pages,
+    iter_text_chunks,
+)
+from app.services.job_queue import enqueue_job
+from app.services.progress import ProgressTracker
+from app.services.vector_upsert import upsert_vectors
+from app.vector_stores import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReingestResult:
+    """What changed between the stored and the uploaded version."""
+
+    pages: int = 0
+    pages_changed: int = 0
+    chunks_kept: int = 0
+    chunks_added: int = 0
+    chunks_removed: int = 0
+    chunks_reembedded: int = 0
+
+    @property
+    def chunk_count(self) -> int:
+        return self.chunks_kept + self.chunks_added
+
+    def summary(self) -> str:
+        reembedded = (
+            f" (re-embedded {self.chunks_reembedded} kept)"
+            if self.chunks_reembedded
+            else ""
+        )
+        return (
+            f"{self.pages_changed} of {self.pages} pages changed; "
+            f"kept {self.chunks_kept} chunks{reembedded}, "
+            f"embedded {self.chunks_added}, removed {self.chunks_removed}"
+        )
+
+
+async def _iter_list(items: list[str]) -> AsyncIterator[str]:
+    for item in items:
+        yield item
+
+
+def _changed_pages(old: list[str], new: list[str]) -> int:
+    changed = sum(1 for a, b in zip(old, new, strict=False) if a != b)
+    return changed + abs(len(old) - len(new))
+
+
+async def reingest_document(
+    document: Document,
+    pages: AsyncIterable[str],
+    store: VectorStore,
+    embed: EmbedFn,
+    chunker: TokenChunker | None = None,
+    progress: ProgressTracker | None = None,
+    rebuild: bool = False,
+    reembed: bool = False,
+) -> ReingestResult:
+    """
+    Bring `document` in line with a new version of its text.
+
+    The new pages are re-chunked and each chunk's content hash is matched
+    against the stored chunks. Matching chunks keep their row, vector and
+    quizzes; only new chunks are embedded and upserted, and chunks that no
+    longer occur are deleted together with their vectors and quizzes. When
+    every page hash matches the last ingested version nothing is touched,
+    unless `rebuild` asks to re-chunk anyway (after the chunking settings
+    changed). `reembed` also re-embeds the kept chunks and overwrites their
+    vectors in place, for a new embedding model.
+
+    Kept vectors keep the `chunk_index` of the version they were embedded
+    from; new ones go to the document's current namespace. No transaction
+    is open while embedding or upserting: new vectors are stored first,
+    then every database change is written in one short transaction. If
+    that fails the new vectors are discarded.
+    """
+    progress = progress or ProgressTracker(document.id)
+    page_hashes: list[str] = []
+    page_texts: list[bytes] = []
+    chunks = iter_text_chunks(hash_pages(pages, page_hashes, page_texts), chunker)
+    texts = [chunk async for chunk in progress.count(IngestionStage.CHUNK, chunks)]
+
+    with session_scope() as session:
+        old_page_hashes = list(
+            session.exec(
+                select(DocumentPage.content_hash)
+                .where(DocumentPage.document_id == document.id)
+                .order_by(DocumentPage.page_number)  # type: ignore[arg-type]
+            ).all()
+        )
+        existing = session.exec(
+            select(Chunk).where(Chunk.document_id == document.id)
+        ).all()
+    result = ReingestResult(
+        pages=len(page_hashes),
+        pages_changed=_changed_pages(old_page_hashes, page_hashes),
+    )
+    if existing and old_page_hashes == page_hashes and not (rebuild or reembed):
+        result.chunks_kept = len(existing)
+        return result
+
+    # Multiset of stored chunks by hash, so repeated passages pair up one-to-one
+    pool: dict[str, list[Chunk]] = defaultdict(list)
+    backfill: list[dict[str, object]] = []
+    for chunk in existing:
+        if chunk.content_hash is None:
+            chunk.content_hash = content_hash(chunk.text_content)
+            backfill.append({"id": chunk.id, "content_hash": chunk.content_hash})
+        pool[chunk.content_hash].append(chunk)
+
+    added: list[tuple[int, str, str]] = []
+    kept: list[tuple[int, str, Chunk]] = []
+    for position, text in enumerate(texts):
+        text_hash = content_hash(text)
+        if pool.get(text_hash):
+            kept.append((position, text, pool[text_hash].pop()))
+        else:
+            added.append((position, text, text_hash))
+    removed = [chunk for chunks in pool.values() for chunk in chunks]
+    result.chunks_kept = len(kept)
+    result.chunks_added = len(added)
+    result.chunks_removed = len(removed)
+
+    chunk_ids = [uuid.uuid4() for _ in added]
+    embedding_ids = [str(uuid.uuid4()) for _ in added]
+    # (chunk_index, text, chunk id, vector id) of every vector to write
+    targets = [
+        (position, text, chunk_id, embedding_id)
+        for (position, text, _), chunk_id, embedding_id in zip(
+            added, chunk_ids, embedding_ids, strict=True
+        )
+    ]
+    if reembed:
+        targets.extend(
+            (position, text, chunk.id, chunk.embedding_id)
+            for position, text, chunk in kept
+        )
+        result.chunks_reembedded = len(kept)
+
+    vectors = []
+    batches = batched(
+        _iter_list([target[1] for target in targets]), settings.EMBEDDING_BATCH_SIZE
+    )
+    embedded = progress.count(
+        IngestionStage.EMBED,
+        embed_batches(batches, embed),
+        size=lambda result: len(result[0]),
+        total=len(targets),
+    )
+    async for _, embeddings in embedded:
+        offset = len(vectors)
+        vectors.extend(
+            {
+                "id": embedding_id,
+                "values": embedding,
+                "metadata": vector_metadata(
+                    document.course_id, document.id, chunk_id, text, position
+                ),
+            }
+            for (position, text, chunk_id, embedding_id), embedding in zip(
+                targets[offset : offset + len(embeddings)], embeddings, strict=True
+            )
+        )
+
+    try:
+        progress.start(IngestionStage.UPSERT, total=len(vectors))
+        await upsert_vectors(store, vectors, namespace=document.embedding_namespace)
+        progress.update(IngestionStage.UPSERT, len(vectors))
+        progress.finish(IngestionStage.UPSERT)
+
+        with session_scope() as session:
+            crud.create_chunks(
+                session=session,
+                chunks_in=[
+                    ChunkCreate(
+                        document_id=document.id,
+                        text_content=text,
+                        embedding_id=embedding_id,
+                        content_hash=text_hash,
+                    )
+                    for (_, text, text_hash), embedding_id in zip(
+                        added, embedding_ids, strict=True
+                    )
+                ],
+                commit=False,
+                ids=chunk_ids,
+            )
+            if backfill:
+                session.execute(update(Chunk), backfill)
+            for chunk in removed:
+                # Loaded again so the ORM cascades to its quizzes
+                stale = session.get(Chunk, chunk.id)
+                if stale:
+                    session.delete(stale)
+            crud.replace_document_pages(
+                session=session,
+                document_id=document.id,
+                page_hashes=page_hashes,
+                page_texts=page_texts,
+                commit=False,
+            )
+    except BaseException:
+        if embedding_ids:
+            try:
+                await asyncio.to_thread(
+                    store.delete,
+                    ids=embedding_ids,
+                    namespace=document.embedding_namespace,
+                )
+            except Exception as e:
+                logger.warning(f"Could not discard vectors for {document.id}: {e}")
+        raise
+
+    removed_embedding_ids = [chunk.embedding_id for chunk in removed]
+    if removed_embedding_ids:
+        await asyncio.to_thread(
+            store.delete,
+            ids=removed_embedding_ids,
+            namespace=document.embedding_namespace,
+        )
+    return result
+
+
+def stored_pages(session: Session, document_id: uuid.UUID) -> list[str] | None:
+    """
+    Text of a document's pages as extracted at its last ingestion, or None
+    when some page was ingested before the text was kept.
+    """
+    rows = session.exec(
+        select(DocumentPage.text_gzip)
+        .where(DocumentPage.document_id == document_id)
+        .order_by(DocumentPage.page_number)  # type: ignore[arg-type]
+    ).all()
+    if not rows or any(data is None for data in rows):
+        return None
+    return [decompress_text(data) for data in rows if data is not None]
+
+
+def enqueue_rebuilds(
+    session: Session, kind: JobKind, course_id: uuid.UUID | None = None
+) -> int:
+    """
+    Queue a RECHUNK or REEMBED job for every completed document whose page
+    text is stored, unless one is already waiting. Returns the number queued.
+    """
+    pending = select(IngestionJob.document_id).where(
+        IngestionJob.kind == kind,
+        col(IngestionJob.status).in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+    )
+    missing_text = select(DocumentPage.document_id).where(
+        col(DocumentPage.text_gzip).is_(None)
+    )
+    statement = select(Document.id).where(
+        Document.status == DocumentStatus.COMPLETED,
+        col(Document.id).in_(select(DocumentPage.document_id)),
+        col(Document.id).not_in(missing_text),
+        col(Document.id).not_in(pending),
+    )
+    if course_id:
+        statement = statement.where(Document.course_id == course_id)
+    document_ids = session.exec(statement).all()
+    for document_id in document_ids:
+        enqueue_job(session, kind, document_id)
+    return len(document_ids)
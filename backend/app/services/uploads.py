@@ -0,0 +1,95 @@
+"""
+Streaming upload writer with inline hashing and a hard size limit
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.models.jobs import IngestionJob
+
+
+class UploadTooLargeError(Exception):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class SavedUpload:
+    path: str
+    size: int
+    sha256: str
+
+
+def copy_with_hash(
+    source: BinaryIO, dest: BinaryIO, max_bytes: int, buffer_size: int
+) -> tuple[int, str]:
+    """
+    Copy `source` to `dest` in `buffer_size` reads, hashing as it goes.
+
+    Raises UploadTooLargeError as soon as more than `max_bytes` have been read,
+    without consuming the rest of the source.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := source.read(buffer_size):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        digest.update(chunk)
+        dest.write(chunk)
+    return size, digest.hexdigest()
+
+
+def _write_upload(source: BinaryIO, directory: str, max_bytes: int) -> SavedUpload:
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as dest:
+            size, sha256 = copy_with_hash(
+                source, dest, max_bytes, settings.UPLOAD_BUFFER_BYTES
+            )
+    except BaseException:
+        os.remove(path)
+        raise
+    return SavedUpload(path=path, size=size, sha256=sha256)
+
+
+async def save_upload(
+    file: UploadFile, max_bytes: int, directory: str | None = None
+) -> SavedUpload:
+    """
+    Stream an upload into `directory` (UPLOAD_DIR by default) off the event loop.
+
+    The file lands under a temporary `.part` name; callers move it into place
+    once they know its final name. Nothing is left behind on failure.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+    await file.seek(0)
+    return await asyncio.to_thread(
+        _write_upload, file.file, directory or settings.UPLOAD_DIR, max_bytes
+    )
+
+
+def job_upload_path(document_id: uuid.UUID) -> str:
+    """
+    Where a job's upload waits in UPLOAD_DIR. Unique per upload, so a new
+    version of a document never overwrites the file a pending job will read.
+    """
+    return os.path.join(settings.UPLOAD_DIR, f"{document_id}-{uuid.uuid4().hex}.pdf")
+
+
+def discard_upload(job: IngestionJob) -> None:
+    """Remove the upload a job was reading, once no attempt is left to read it."""
+    file_path = job.payload.get("file_path")
+    if file_path and os.path.exists(file_path):
+        os.remove(file_path)
@@ -0,0 +1,203 @@
+"""
+Sized, parallel vector upserts with per-batch retry
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
+
+from app.core.config import settings
+from app.vector_stores import Vector, VectorStore
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_upsert_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.VECTOR_UPSERT_CONCURRENCY,
+            thread_name_prefix="vector-upsert",
+        )
+    return _executor
+
+
+def shutdown_upsert_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+@dataclass
+class UpsertStats:
+    vectors: int = 0
+    bytes: int = 0
+    requests: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def vectors_per_second(self) -> float:
+        return self.vectors / self.seconds if self.seconds else 0.0
+
+
+def estimate_vector_bytes(vector: Vector) -> int:
+    """Approximate the JSON payload size of one vector."""
+    return len(json.dumps(vector, separators=(",", ":")))
+
+
+def split_vectors(
+    vectors: list[Vector], max_count: int, max_bytes: int
+) -> list[tuple[list[Vector], int]]:
+    """
+    Split vectors into request batches bounded by count and payload bytes.
+
+    Returns (batch, payload_bytes) pairs. A single vector larger than
+    `max_bytes` still gets its own batch so the server can reject it clearly.
+    """
+    batches: list[tuple[list[Vector], int]] = []
+    batch: list[Vector] = []
+    batch_bytes = 0
+    for vector in vectors:
+        size = estimate_vector_bytes(vector)
+        if batch and (len(batch) >= max_count or batch_bytes + size > max_bytes):
+            batches.append((batch, batch_bytes))
+            batch, batch_bytes = [], 0
+        batch.append(vector)
+        batch_bytes += size
+    if batch:
+        batches.append((batch, batch_bytes))
+    return batches
+
+
+async def _upsert_batch(
+    store: VectorStore,
+    batch: list[Vector],
+    stats: UpsertStats,
+    namespace: str | None = None,
+) -> None:
+    loop = asyncio.get_running_loop()
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(settings.VECTOR_UPSERT_MAX_RETRIES + 1),
+        wait=wait_exponential(multiplier=0.5, max=8),
+        reraise=True,
+    ):
+        with attempt:
+            if attempt.retry_state.attempt_number > 1:
+                stats.retries += 1
+                logger.warning(
+                    f"Retrying upsert of {len(batch)} vectors "
+                    f"(attempt {attempt.retry_state.attempt_number})"
+                )
+            await loop.run_in_executor(
+                get_upsert_executor(),
+                partial(store.upsert, vectors=batch, namespace=namespace),
+            )
+
+
+async def upsert_vectors(
+    store: VectorStore,
+    vectors: list[Vector],
+    stats: UpsertStats | None = None,
+    namespace: str | None = None,
+) -> None:
+    """Upsert vectors as sized batches sent concurrently from the thread pool."""
+    stats = stats if stats is not None else UpsertStats()
+    batches = split_vectors(
+        vectors,
+        settings.VECTOR_UPSERT_BATCH_SIZE,
+        settings.VECTOR_UPSERT_MAX_BYTES,
+    )
+
+    await asyncio.gather(
+        *(_upsert_batch(store, batch, stats, namespace) for batch, _ in batches)
+    )
+    stats.vectors += len(vectors)
+    stats.bytes += sum(size for _, size in batches)
+    stats.requests += len(batches)
+
+
+class UpsertStage:
+    """
+    Pipeline stage that keeps up to VECTOR_UPSERT_CONCURRENCY upserts in
+    flight while upstream stages keep producing vectors.
+
+    `stats.seconds` is the wall time from the first submit until drain, and
+    `first_completed_at` marks when the first vectors became searchable.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        concurrency: int | None = None,
+        namespace: str | None = None,
+    ) -> None:
+        self.store = store
+        self.namespace = namespace
+        self.concurrency = max(1, concurrency or settings.VECTOR_UPSERT_CONCURRENCY)
+        self.stats = UpsertStats()
+        self.first_completed_at: float | None = None
+        self._started_at: float | None = None
+        self._pending: set[asyncio.Task[None]] = set()
+
+    async def __aenter__(self) -> "UpsertStage":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            await self.drain()
+        else:
+            self.cancel()
+
+    async def submit(
+        self, vectors: list[Vector], on_stored: Callable[[], None] | None = None
+    ) -> None:
+        """Start upserting `vectors`; `on_stored` runs once they all are stored."""
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+        task = asyncio.create_task(
+            upsert_vectors(self.store, vectors, self.stats, self.namespace)
+        )
+        task.add_done_callback(self._mark_first_completed)
+        if on_stored is not None:
+
+            def _stored(task: asyncio.Task[None]) -> None:
+                if not task.cancelled() and task.exception() is None:
+                    on_stored()
+
+            task.add_done_callback(_stored)
+        self._pending.add(task)
+        if len(self._pending) >= self.concurrency:
+            await self._wait(asyncio.FIRST_COMPLETED)
+
+    async def drain(self) -> None:
+        if self._pending:
+            await self._wait(asyncio.ALL_COMPLETED)
+        if self._started_at is not None:
+            self.stats.seconds = time.perf_counter() - self._started_at
+
+    def _mark_first_completed(self, task: asyncio.Task[None]) -> None:
+        if self.first_completed_at is None and not task.cancelled():
+            if task.exception() is None:
+                self.first_completed_at = time.perf_counter()
+
+    def cancel(self) -> None:
+        for task in self._pending:
+            task.cancel()
+        self._pending.clear()
+
+    async def _wait(self, return_when: str) -> None:
+        done, self._pending = await asyncio.wait(self._pending, return_when=return_when)
+        for task in done:
+            task.result()
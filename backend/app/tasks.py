@@ -1,27 +1,47 @@
+import asyncio
 import json
 import logging
 import random
+import time
 import uuid
+from dataclasses import dataclass
+from typing import Any
 
 from fastapi import HTTPException
+from openai.types.chat import ChatCompletion
 from sqlalchemy import and_
 from sqlalchemy.orm import load_only, selectinload
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import CurrentUser
+from app.core.config import settings
+from app.core.db import session_scope
 from app.models.course import Course
 from app.models.document import Document
 from app.models.embeddings import Chunk
+from app.models.flashcards import FlashcardDeck
 from app.models.quizzes import Quiz, QuizAttempt, QuizSession
-from app.prompts.quizzes import get_quiz_prompt
+from app.prompts.quizzes import QUIZ_LEVELS, get_quiz_prompt
 from app.schemas.public import (
     DifficultyLevel,
+    DocumentStatus,
+    IngestionStage,
     QuizChoice,
     QuizPublic,
     QuizScoreSummary,
     QuizSubmissionBatch,
     QuizzesPublic,
     SingleQuizScore,
+    StageStatus,
+)
+from app.services.flashcards import build_deck, content_version, store_deck
+from app.services.progress import ProgressTracker
+from app.services.quiz_windows import (
+    QuizWindow,
+    build_windows,
+    quizzes_per_window,
+    select_quizzes,
+    spread,
 )
 from app.utils import clean_string
 
@@ -29,79 +49,114 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def generate_quizzes_task(document_id: uuid.UUID, session: SessionDep):
-    """
-    Background task to generate a bank of quiz questions from a document.
-    """
-    try:
-        statement = select(Chunk).where(Chunk.document_id == document_id)
-        chunks = session.exec(statement).all()
+DIFFICULTY_LEVELS = [DifficultyLevel(level) for level in QUIZ_LEVELS]
 
-        if not chunks:
-            logger.warning(f"No chunks found for document {document_id}")
-            return
 
-        concatenated_text = " ".join([chunk.text_content for chunk in chunks])
-
-        for difficulty_level in [
-            DifficultyLevel.EASY,
-            DifficultyLevel.MEDIUM,
-            DifficultyLevel.HARD,
-        ]:
-            prompt = f"""
-            1. Task context: You are an expert quiz question generator for educational content. Your goal is to create multiple-choice questions that thoroughly test a user's understanding of the provided text.
-            2. Tone context: The response must be professional, strictly formatted, and follow all JSON schema rules exactly.
-            3. Background data: The text provided below contains the source material for the quiz questions.
-            4. Detailed task description & rules:
-              - Generate between 5 and 10 multiple-choice quizzes for the provided text.
-              - Each quiz must be strictly at the '{difficulty_level}' difficulty level.
-              - **Each quiz must have exactly 4 choices** (one correct answer and three distractors).
-              - Ensure the **distraction choices are highly plausible**, requiring genuine understanding to be answered correctly. They should be related to the topic but demonstrably incorrect based on the text.
-              - All choices (correct and incorrect) should be **full, descriptive sentences or phrases**, not just single words.
-              - The primary output must be a single JSON object containing a property called 'quizzes'.
-
-            5. Output Structure (JSON Schema Rules):
-            Each object in the 'quizzes' array must include the following fields:
-
-            - **quiz**: string (The multiple-choice question itself.)
-            - **correct_answer**: string (The text of the correct choice.)
-            - **distraction_1**: string (A plausible, incorrect choice.)
-            - **distraction_2**: string (A plausible, incorrect choice.)
-            - **distraction_3**: string (A plausible, incorrect choice.)
-            - **topic**: string (A short, 2-3 word category/topic for the quiz.)
-            - **feedback**: string (Specific, helpful explanation **for a user who selects an incorrect answer**. This should clarify why the correct answer is right based on the text.)
-
-            6. Output formatting:
-            Return only a single JSON object.
-
-            Text:
-            {concatenated_text}
-            """
-
-            response = await get_quiz_prompt(prompt)
-
-            try:
-                raw_content = response.choices[0].message.content
-                parsed = json.loads(raw_content)
-                quiz_list = parsed.get("quizzes", [])
-                if not isinstance(quiz_list, list):
-                    logger.error(
-                        f"LLM did not return 'quizzes' as a list for document {document_id}. Got: {type(quiz_list)}"
-                    )
-                    continue
-            except json.JSONDecodeError as e:
-                logger.error(
-                    f"Failed to parse LLM response for document {document_id}: {e}. Raw content: {raw_content[:200]}..."
-                )
-                continue
+@dataclass
+class QuizGenerationStats:
+    """Prompts sent for a document's quiz bank and the tokens they used."""
+
+    windows: int = 0
+    prompts: int = 0
+    failed: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    seconds: float = 0.0
+
+    def add_usage(self, response: ChatCompletion) -> None:
+        if response.usage:
+            self.prompt_tokens += response.usage.prompt_tokens
+            self.completion_tokens += response.usage.completion_tokens
+
+    def summary(self) -> str:
+        return (
+            f"{self.prompts} prompts over {self.windows} windows "
+            f"({self.failed} failed), {self.prompt_tokens} prompt + "
+            f"{self.completion_tokens} completion tokens in {self.seconds:.2f}s"
+        )
+
+
+def _quiz_prompt(
+    difficulty_level: DifficultyLevel | None, text: str, count: int
+) -> str:
+    """Prompt for one difficulty level, or for every level at once when None."""
+    if difficulty_level is None:
+        levels = ", ".join(f"'{level}'" for level in DIFFICULTY_LEVELS)
+        amount = f"for each of the {levels} difficulty levels"
+        level_rule = (
+            "Each quiz must be strictly at the difficulty level of the list it is in."
+        )
+        output = f"the properties {levels}, one list of quizzes per difficulty level"
+        arrays = "these lists"
+    else:
+        amount = "for the provided text"
+        level_rule = (
+            f"Each quiz must be strictly at the '{difficulty_level}' difficulty level."
+        )
+        output = "a property called 'quizzes'"
+        arrays = "the 'quizzes' array"
+    return f"""
+    1. Task context: You are an expert quiz question generator for educational content. Your goal is to create multiple-choice questions that thoroughly test a user's understanding of the provided text.
+    2. Tone context: The response must be professional, strictly formatted, and follow all JSON schema rules exactly.
+    3. Background data: The text provided below contains the source material for the quiz questions, split into passages numbered [1], [2], ...
+    4. Detailed task description & rules:
+      - Generate between {max(1, count // 2)} and {count} multiple-choice quizzes {amount}.
+      - {level_rule}
+      - **Each quiz must have exactly 4 choices** (one correct answer and three distractors).
+      - Ensure the **distraction choices are highly plausible**, requiring genuine understanding to be answered correctly. They should be related to the topic but demonstrably incorrect based on the text.
+      - All choices (correct and incorrect) should be **full, descriptive sentences or phrases**, not just single words.
+      - The primary output must be a single JSON object containing {output}.
+
+    5. Output Structure (JSON Schema Rules):
+    Each object in {arrays} must include the following fields:
+
+    - **quiz**: string (The multiple-choice question itself.)
+    - **correct_answer**: string (The text of the correct choice.)
+    - **distraction_1**: string (A plausible, incorrect choice.)
+    - **distraction_2**: string (A plausible, incorrect choice.)
+    - **distraction_3**: string (A plausible, incorrect choice.)
+    - **topic**: string (A short, 2-3 word category/topic for the quiz.)
+    - **source**: integer (The number of the passage the quiz is based on.)
+    - **feedback**: string (Specific, helpful explanation **for a user who selects an incorrect answer**. This should clarify why the correct answer is right based on the text.)
+
+    6. Output formatting:
+    Return only a single JSON object.
+
+    Text:
+    {text}
+    """
 
-            for q_data in quiz_list:
-                if not isinstance(q_data, dict):
-                    logger.warning(f"Skipping malformed item in quiz list: {q_data}")
-                    continue
 
-                new_quiz = Quiz(
-                    chunk_id=chunks[0].id,
+def _response_json(response: ChatCompletion) -> dict[str, Any]:
+    raw_content = response.choices[0].message.content or ""
+    try:
+        parsed = json.loads(raw_content)
+    except json.JSONDecodeError as e:
+        raise ValueError(
+            f"Failed to parse LLM response: {e}. Raw content: {raw_content[:200]}..."
+        ) from e
+    if not isinstance(parsed, dict):
+        raise ValueError(f"LLM did not return a JSON object. Got: {type(parsed)}")
+    return parsed
+
+
+def _parse_quizzes(
+    document_id: uuid.UUID,
+    window: QuizWindow,
+    difficulty_level: DifficultyLevel,
+    quiz_list: object,
+) -> list[Quiz]:
+    if not isinstance(quiz_list, list):
+        raise ValueError(
+            f"LLM did not return {difficulty_level.value} quizzes as a list. "
+            f"Got: {type(quiz_list)}"
+        )
+    quizzes = []
+    for q_data in quiz_list:
+        try:
+            quizzes.append(
+                Quiz(
+                    chunk_id=window.source_chunk(q_data.get("source")),
                     difficulty_level=difficulty_level,
                     quiz_text=q_data["quiz"],
                     correct_answer=clean_string(q_data["correct_answer"]),
@@ -110,12 +165,208 @@ async def generate_quizzes_task(document_id: uuid.UUID, session: SessionDep):
                     distraction_3=clean_string(q_data["distraction_3"]),
                     topic=clean_string(q_data["topic"]),
                 )
-                session.add(new_quiz)
+            )
+        except (AttributeError, KeyError, TypeError):
+            logger.warning(
+                f"Skipping malformed item in quiz list of {document_id}: {q_data}"
+            )
+    return quizzes
+
+
+async def _generate_window(
+    document_id: uuid.UUID,
+    window: QuizWindow,
+    levels: list[DifficultyLevel],
+    count: int,
+    stats: QuizGenerationStats,
+) -> dict[DifficultyLevel, list[Quiz]]:
+    """
+    Ask the LLM for one window's quizzes of `levels` (one level, or all of
+    them in a single combined prompt); raises if the answer is unusable.
+    """
+    combined = len(levels) > 1
+    response = await get_quiz_prompt(
+        _quiz_prompt(None if combined else levels[0], window.prompt_text(), count),
+        combined=combined,
+    )
+    stats.add_usage(response)
+    parsed = _response_json(response)
+    return {
+        level: _parse_quizzes(
+            document_id,
+            window,
+            level,
+            parsed.get(level.value, []) if combined else parsed.get("quizzes", []),
+        )
+        for level in levels
+    }
+
+
+async def generate_quiz_bank(
+    document_id: uuid.UUID,
+    chunks: list[tuple[uuid.UUID, str]],
+    combined: bool | None = None,
+    progress: ProgressTracker | None = None,
+) -> tuple[list[Quiz], QuizGenerationStats]:
+    """
+    Generate, without saving them, the quizzes of a document's
+    `(chunk id, text)` pairs.
+
+    The chunks are packed into windows of QUIZ_WINDOW_TOKENS tokens and all
+    prompts run concurrently, bounded by the process-wide LLM_CONCURRENCY
+    limit shared with other jobs, so cost and latency grow linearly with
+    the document instead of overflowing the model's context. By default
+    each window gets one prompt per difficulty level; `combined` (default
+    QUIZ_GENERATION_MODE == "combined") asks for every level in one prompt,
+    sending each window's text once instead of three times. Each quiz is
+    attached to the chunk it was written from, and at most
+    QUIZ_MAX_PER_DIFFICULTY quizzes per level are kept, picked across
+    windows. A document with more windows than that only has that many,
+    evenly spaced, windows prompted, since the others' quizzes could not
+    be kept. A failed prompt is logged and skipped.
+    """
+    if combined is None:
+        combined = settings.QUIZ_GENERATION_MODE == "combined"
+    started = time.perf_counter()
+    limit = settings.QUIZ_MAX_PER_DIFFICULTY
+    windows = spread(await asyncio.to_thread(build_windows, chunks), limit)
+    count = min(limit, quizzes_per_window(limit, len(windows)))
+
+    level_groups = (
+        [DIFFICULTY_LEVELS] if combined else [[level] for level in DIFFICULTY_LEVELS]
+    )
+    prompts = [(levels, window) for levels in level_groups for window in windows]
+    stats = QuizGenerationStats(windows=len(windows), prompts=len(prompts))
+    if progress:
+        progress.start(IngestionStage.QUIZ_GENERATION, total=len(prompts))
+
+    async def generate(
+        levels: list[DifficultyLevel], window: QuizWindow
+    ) -> dict[DifficultyLevel, list[Quiz]]:
+        try:
+            return await _generate_window(document_id, window, levels, count, stats)
+        finally:
+            if progress:
+                progress.advance(IngestionStage.QUIZ_GENERATION)
+
+    results = await asyncio.gather(
+        *(generate(levels, window) for levels, window in prompts),
+        return_exceptions=True,
+    )
+    per_window: dict[DifficultyLevel, list[list[Quiz]]] = {
+        level: [] for level in DIFFICULTY_LEVELS
+    }
+    for (levels, _), result in zip(prompts, results, strict=True):
+        if isinstance(result, BaseException):
+            stats.failed += 1
+            logger.error(
+                f"Failed to generate {'/'.join(levels)} quizzes for "
+                f"document {document_id}: {result}"
+            )
+        else:
+            for level, quizzes in result.items():
+                per_window[level].append(quizzes)
+    stats.seconds = time.perf_counter() - started
+
+    selected = [
+        quiz
+        for level in DIFFICULTY_LEVELS
+        for quiz in select_quizzes(per_window[level], limit)
+    ]
+    return selected, stats
+
+
+def _chunks_with_quizzes(session: Session, document_id: uuid.UUID) -> set[uuid.UUID]:
+    document_chunks = select(Chunk.id).where(Chunk.document_id == document_id)
+    return set(
+        session.exec(
+            select(Quiz.chunk_id)
+            .where(col(Quiz.chunk_id).in_(document_chunks))
+            .distinct()
+        ).all()
+    )
+
+
+async def generate_quizzes_task(document_id: uuid.UUID):
+    """
+    Background task to generate a bank of quiz questions from a document.
+
+    Quizzes come from `generate_quiz_bank` and are written in one
+    transaction once every prompt has returned. A document that already has
+    a quiz bank is left alone, so a re-run or retry neither pays for a new
+    bank nor touches quizzes students have attempted; quizzes are only
+    added for chunks that have none. No connection is held while the LLM
+    answers. Errors, including every prompt failing, are re-raised so the
+    job queue can retry.
+    """
+    progress = ProgressTracker(document_id)
+    try:
+        with session_scope() as session:
+            statement = select(Chunk).where(Chunk.document_id == document_id)
+            chunks = session.exec(statement).all()
+            banked = _chunks_with_quizzes(session, document_id)
+
+        if not chunks:
+            logger.warning(f"No chunks found for document {document_id}")
+            return
+        if banked:
+            logger.info(f"Document {document_id} already has a quiz bank")
+            return
+
+        quizzes, stats = await generate_quiz_bank(
+            document_id,
+            [(chunk.id, chunk.text_content) for chunk in chunks],
+            progress=progress,
+        )
+        if stats.failed == stats.prompts:
+            raise RuntimeError(f"Every quiz prompt failed: {stats.summary()}")
+        with session_scope() as session:
+            # Another run may have written the bank while the LLM answered
+            banked = _chunks_with_quizzes(session, document_id)
+            quizzes = [quiz for quiz in quizzes if quiz.chunk_id not in banked]
+            session.add_all(quizzes)
+        logger.info(
+            f"Generated {len(quizzes)} quizzes for document {document_id}: "
+            f"{stats.summary()}"
+        )
 
-            session.commit()
+        progress.finish(IngestionStage.QUIZ_GENERATION, StageStatus.COMPLETED)
 
     except Exception as e:
         logger.error(f"Error generating quizzes for document {document_id}: {e}")
+        progress.fail_running()
+        raise
+
+
+async def generate_flashcards_task(document_id: uuid.UUID, force: bool = False):
+    """
+    Job to precompute the flashcard deck of a COMPLETED document.
+
+    Nothing is generated when the document's current content version
+    already has a deck, unless `force` asks for a new one. The deck is only
+    saved if the content did not change while the LLM answered; the newer
+    version's own job takes over otherwise. Errors are re-raised so the job
+    queue can retry.
+    """
+    with session_scope() as session:
+        document = session.get(Document, document_id)
+        if not document or document.status != DocumentStatus.COMPLETED:
+            return
+        version = content_version(session, document_id)
+        if version is None:
+            logger.warning(f"Document {document_id} has no content; no deck")
+            return
+        if not force and session.get(FlashcardDeck, (document_id, version)):
+            return
+
+    cards = await build_deck(document_id, refresh=force)
+
+    with session_scope() as session:
+        if content_version(session, document_id) != version:
+            logger.info(f"Document {document_id} changed; discarding its old deck")
+            return
+        store_deck(session, document_id, version, cards)
+    logger.info(f"Stored {len(cards)} flashcards for document {document_id}")
 
 
 def score_quiz_batch(
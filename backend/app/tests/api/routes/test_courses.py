@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.config import settings
+from app.models.course import Course, QAItem
+from app.models.document import Document
+from app.models.jobs import IngestionJob, JobKind
+from app.models.user import User
+from app.schemas.public import DocumentStatus
+from app.services.flashcards import content_version, enqueue_missing_decks, store_deck
+
+
+def test_flashcards_are_served_from_the_stored_deck(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    owner = db.exec(select(User).where(User.email == settings.FIRST_SUPERUSER)).one()
+    course = Course(name="Flashcards", owner_id=owner.id)
+    db.add(course)
+    db.commit()
+    document = Document(
+        title="notes",
+        filename="notes.pdf",
+        course_id=course.id,
+        status=DocumentStatus.COMPLETED,
+    )
+    db.add(document)
+    db.commit()
+    crud.replace_document_pages(
+        session=db, document_id=document.id, page_hashes=["a", "b"]
+    )
+    url = f"{settings.API_V1_STR}/courses/{course.id}/flashcards"
+
+    # No deck and no job: nothing is generated or queued by the GET
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 404
+    assert enqueue_missing_decks(db, course.id) == 1
+    for _ in range(2):
+        response = client.get(url, headers=superuser_token_headers)
+        assert response.status_code == 202
+    jobs = db.exec(
+        select(IngestionJob).where(
+            IngestionJob.document_id == document.id,
+            IngestionJob.kind == JobKind.GENERATE_FLASHCARDS,
+        )
+    ).all()
+    assert len(jobs) == 1
+
+    version = content_version(db, document.id)
+    assert version
+    store_deck(db, document.id, version, [QAItem(question="Q?", answer="A")])
+    db.commit()
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json() == [{"question": "Q?", "answer": "A"}]
+
+    for job in jobs:
+        db.delete(job)
+    db.delete(course)
+    db.commit()
@@ -0,0 +1,138 @@
+import hashlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.course import Course
+from app.models.document import Document, DocumentFingerprint
+from app.models.jobs import IngestionJob, JobKind
+from app.models.user import User
+from app.schemas.public import DocumentStatus, IngestionStage
+from app.services.job_queue import enqueue_job
+from app.services.progress import ProgressTracker
+from app.tests.utils.course import create_random_course
+
+
+def test_document_events_stream_progress_until_finished(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    owner = db.exec(select(User).where(User.email == settings.FIRST_SUPERUSER)).one()
+    course = Course(name="Events", owner_id=owner.id)
+    db.add(course)
+    db.commit()
+    document = Document(
+        title="notes",
+        filename="notes.pdf",
+        course_id=course.id,
+        status=DocumentStatus.COMPLETED,
+    )
+    db.add(document)
+    db.commit()
+    ProgressTracker(document.id).record(IngestionStage.SAVE, 100, 0.01, total=100)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/documents/{document.id}/events",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n")[0] for block in response.text.split("\n\n") if block]
+    assert events == ["event: progress", "event: end"]
+    assert '"stage": "save"' in response.text
+
+    db.delete(course)
+    db.commit()
+
+
+def test_document_events_require_ownership(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    owner = db.exec(select(User).where(User.email == settings.FIRST_SUPERUSER)).one()
+    course = Course(name="Private", owner_id=owner.id)
+    db.add(course)
+    db.commit()
+    document = Document(title="notes", filename="notes.pdf", course_id=course.id)
+    db.add(document)
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/documents/{document.id}/events",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 404
+
+    db.delete(course)
+    db.commit()
+
+
+def test_upload_is_rejected_with_retry_after_when_queue_is_full(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "INGESTION_MAX_QUEUED_JOBS", 0)
+    course = create_random_course(db)
+
+    response = client.post(
+        f"{settings.API_V1_STR}/documents/process",
+        data={"course_id": str(course.id)},
+        files=[("files", ("notes.pdf", b"%PDF-1.4", "application/pdf"))],
+    )
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(
+        settings.INGESTION_RETRY_AFTER_SECONDS
+    )
+    assert not db.exec(select(Document).where(Document.course_id == course.id)).all()
+
+    db.delete(course)
+    db.commit()
+
+
+def test_replace_waits_for_pending_jobs_and_retries_failed_versions(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    owner = db.exec(select(User).where(User.email == settings.FIRST_SUPERUSER)).one()
+    course = Course(name="Replace", owner_id=owner.id)
+    db.add(course)
+    db.commit()
+    document = Document(
+        title="notes",
+        filename="notes.pdf",
+        course_id=course.id,
+        status=DocumentStatus.FAILED,
+    )
+    db.add(document)
+    content = b"%PDF-1.4 new version"
+    db.add(
+        DocumentFingerprint(
+            document_id=document.id,
+            sha256=hashlib.sha256(content).hexdigest(),
+            size=len(content),
+        )
+    )
+    db.commit()
+    retry = enqueue_job(db, JobKind.PROCESS_PDF, document.id, {"file_path": "x"})
+    url = f"{settings.API_V1_STR}/documents/{document.id}/replace"
+    files = [("file", ("notes.pdf", content, "application/pdf"))]
+
+    # The failed attempt's retry is still queued and will read the old upload
+    response = client.post(url, headers=superuser_token_headers, files=files)
+    assert response.status_code == 409
+
+    # Once it is gone, the same bytes are processed again despite the
+    # fingerprint: the document never completed with them
+    db.delete(retry)
+    db.commit()
+    response = client.post(url, headers=superuser_token_headers, files=files)
+    assert response.status_code == 200
+    assert response.json()["changed"] is True
+    job = db.exec(
+        select(IngestionJob).where(IngestionJob.document_id == document.id)
+    ).one()
+    assert os.path.basename(job.payload["file_path"]) != f"{document.id}.pdf"
+    os.remove(job.payload["file_path"])
+
+    db.delete(job)
+    db.delete(course)
+    db.commit()
@@ -13,6 +13,9 @@ from app.models.user import User
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
 
+# Tests run jobs themselves; the app must not poll the queue in the background
+settings.INGESTION_EMBEDDED_WORKER = False
+
 
 @pytest.fixture(scope="session", autouse=True)
 def db() -> Generator[Session, None, None]:
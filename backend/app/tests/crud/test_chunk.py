@@ -0,0 +1,38 @@
+import uuid
+
+from sqlmodel import Session, select
+
+from app import crud
+from app.models.embeddings import Chunk, ChunkCreate
+from app.tests.utils.document import create_random_document
+
+
+def test_create_chunks_in_bulk(db: Session) -> None:
+    document = create_random_document(db)
+    chunks_in = [
+        ChunkCreate(
+            document_id=document.id,
+            text_content=f"chunk {i}",
+            embedding_id=uuid.uuid4().hex,
+        )
+        for i in range(250)
+    ]
+
+    chunk_ids = crud.create_chunks(session=db, chunks_in=chunks_in)
+
+    assert len(chunk_ids) == 250
+    stored = {
+        chunk.id: chunk
+        for chunk in db.exec(select(Chunk).where(Chunk.document_id == document.id))
+    }
+    assert [stored[chunk_id].text_content for chunk_id in chunk_ids] == [
+        f"chunk {i}" for i in range(250)
+    ]
+    assert stored[chunk_ids[0]].embedding_id == chunks_in[0].embedding_id
+
+    db.delete(document)
+    db.commit()
+
+
+def test_create_chunks_empty(db: Session) -> None:
+    assert crud.create_chunks(session=db, chunks_in=[]) == []
@@ -0,0 +1,164 @@
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, select
+
+from app.api.routes import documents
+from app.core.config import settings
+from app.models.document import Document
+from app.models.embeddings import Chunk
+from app.models.jobs import IngestionCheckpoint
+from app.models.quizzes import Quiz
+from app.schemas.public import DocumentStatus
+from app.services import chunking
+from app.services.checkpoints import CheckpointTracker, resume_point
+from app.services.ingestion import chunk_uuid
+from app.tests.utils.chunking import WordEncoding
+from app.tests.utils.document import create_random_document
+from app.vector_stores.local_store import LocalVectorStore
+
+DIMENSION = 4
+
+
+def test_checkpoint_only_advances_over_stored_prefix(db: Session) -> None:
+    document = create_random_document(db)
+    tracker = CheckpointTracker(document.id, "key")
+    tracker.start()
+    tracker.stored(2, 4)
+    assert resume_point(db, document.id, "key") == 0
+    tracker.stored(0, 2)
+    assert tracker.done == 4
+    db.expire_all()
+    assert resume_point(db, document.id, "key") == 4
+    # A different file or chunking setup cannot reuse it
+    assert resume_point(db, document.id, "other") == 0
+
+    db.delete(document)
+    db.commit()
+
+
+def test_retried_job_resumes_after_last_stored_batch(
+    db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pages = [
+        f"Page{i} one two three four. Page{i} five six seven eight." for i in range(6)
+    ]
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    monkeypatch.setattr(chunking, "get_encoding", lambda name=None: WordEncoding())
+    monkeypatch.setattr(settings, "CHUNK_SIZE_TOKENS", 10)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP_TOKENS", 0)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_RETRIES", 0)
+    monkeypatch.setattr(documents, "get_vector_store", lambda: store)
+
+    async def iter_pages(_: str) -> AsyncIterator[str]:
+        for page in pages:
+            yield page
+
+    monkeypatch.setattr(documents, "iter_pdf_pages", iter_pages)
+
+    embedded: list[str] = []
+
+    async def embed(batch: list[str]) -> list[list[float]]:
+        if fail_on and batch[0].startswith(fail_on):
+            # Let the batches before this one finish storing first
+            await asyncio.sleep(0.2)
+            raise RuntimeError("embedding service down")
+        embedded.extend(batch)
+        return [[1.0, float(len(text)), 0.0, 0.0] for text in batch]
+
+    monkeypatch.setattr(documents, "embed_chunks", embed)
+    document = create_random_document(db)
+    sha256 = uuid.uuid4().hex * 2
+
+    def run() -> None:
+        asyncio.run(
+            documents.process_pdf_task(
+                "unused.pdf", document.id, document.course_id, content_sha256=sha256
+            )
+        )
+
+    fail_on = "Page4"
+    with pytest.raises(RuntimeError):
+        run()
+    checkpoint = db.get(IngestionCheckpoint, document.id)
+    assert checkpoint and checkpoint.chunks_done == 4
+
+    fail_on = ""
+    embedded.clear()
+    run()
+    assert [text.split()[0] for text in embedded] == ["Page4", "Page5"]
+
+    db.expire_all()
+    stored = db.get(Document, document.id)
+    assert stored and stored.status == DocumentStatus.COMPLETED
+    assert stored.chunk_count == 6
+    assert db.get(IngestionCheckpoint, document.id) is None
+    chunks = db.exec(select(Chunk).where(Chunk.document_id == document.id)).all()
+    ids = {chunk_uuid(document.id, ordinal) for ordinal in range(6)}
+    assert {chunk.id for chunk in chunks} == ids
+    vectors = store.fetch([str(i) for i in ids], stored.embedding_namespace)
+    assert len(vectors) == 6
+
+    db.delete(document)
+    db.commit()
+
+
+def test_restarted_job_discards_quizzes_of_the_old_chunks(
+    db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    monkeypatch.setattr(chunking, "get_encoding", lambda name=None: WordEncoding())
+    monkeypatch.setattr(settings, "CHUNK_SIZE_TOKENS", 10)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP_TOKENS", 0)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+    monkeypatch.setattr(documents, "get_vector_store", lambda: store)
+
+    async def iter_pages(_: str) -> AsyncIterator[str]:
+        yield "Alpha one two three four. Alpha five six seven eight."
+
+    async def embed(batch: list[str]) -> list[list[float]]:
+        return [[1.0, float(len(text)), 0.0, 0.0] for text in batch]
+
+    monkeypatch.setattr(documents, "iter_pdf_pages", iter_pages)
+    monkeypatch.setattr(documents, "embed_chunks", embed)
+    document = create_random_document(db)
+
+    def run() -> None:
+        # A new sha256 each time: no checkpoint applies, so chunks restart
+        asyncio.run(
+            documents.process_pdf_task(
+                "unused.pdf",
+                document.id,
+                document.course_id,
+                content_sha256=uuid.uuid4().hex * 2,
+            )
+        )
+
+    run()
+    chunk = db.exec(select(Chunk).where(Chunk.document_id == document.id)).one()
+    quiz = Quiz(
+        chunk_id=chunk.id,
+        quiz_text="About Alpha?",
+        correct_answer="Right",
+        distraction_1="Wrong one",
+        distraction_2="Wrong two",
+        distraction_3="Wrong three",
+        topic="Testing",
+    )
+    db.add(quiz)
+    db.commit()
+    quiz_id = quiz.id
+
+    run()
+    db.expire_all()
+    stored = db.get(Document, document.id)
+    assert stored and stored.status == DocumentStatus.COMPLETED
+    assert db.get(Quiz, quiz_id) is None
+
+    db.delete(document)
+    db.commit()
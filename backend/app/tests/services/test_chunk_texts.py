@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.models.embeddings import Chunk, ChunkCreate
+from app.services.chunk_texts import (
+    chunk_text_cache,
+    get_chunk_texts,
+    match_texts,
+    vector_metadata,
+)
+from app.tests.utils.document import create_random_document
+from app.vector_stores.base import VectorMatch
+
+
+def test_vector_metadata_can_leave_out_text(monkeypatch: pytest.MonkeyPatch) -> None:
+    ids = (uuid.uuid4(), uuid.uuid4(), uuid.uuid4())
+    assert vector_metadata(*ids, "some text", 3)["text"] == "some text"
+
+    monkeypatch.setattr(settings, "VECTOR_METADATA_TEXT", False)
+    metadata = vector_metadata(*ids, "some text", 3)
+    assert "text" not in metadata
+    assert metadata["chunk_id"] == str(ids[2])
+    assert metadata["chunk_index"] == 3
+
+
+def test_matches_are_hydrated_in_order_and_cached(db: Session) -> None:
+    chunk_text_cache.clear()
+    document = create_random_document(db)
+    texts = ["first passage", "second passage", "third passage"]
+    chunk_ids = crud.create_chunks(
+        session=db,
+        chunks_in=[
+            ChunkCreate(document_id=document.id, text_content=t, embedding_id=f"e{i}")
+            for i, t in enumerate(texts)
+        ],
+    )
+    matches = [
+        VectorMatch(id="e2", score=0.9, metadata={"chunk_id": str(chunk_ids[2])}),
+        VectorMatch(id="legacy", score=0.8, metadata={"text": "stored inline"}),
+        VectorMatch(id="e0", score=0.7, metadata={"chunk_id": str(chunk_ids[0])}),
+        VectorMatch(id="gone", score=0.6, metadata={"chunk_id": str(uuid.uuid4())}),
+    ]
+
+    assert match_texts(matches) == ["third passage", "stored inline", "first passage"]
+    assert chunk_text_cache.misses == 3
+
+    # Hot chunks are served without touching Postgres
+    db.delete(db.get(Chunk, chunk_ids[0]))
+    db.commit()
+    assert get_chunk_texts(db, [chunk_ids[0], chunk_ids[2]]) == {
+        chunk_ids[0]: "first passage",
+        chunk_ids[2]: "third passage",
+    }
+    assert chunk_text_cache.hits == 2
+
+    db.delete(document)
+    db.commit()
+    chunk_text_cache.clear()
@@ -0,0 +1,85 @@
+import pytest
+
+from app.services.chunking import TokenChunker, chunk_text
+from app.tests.utils.chunking import WordEncoding
+
+
+def _chunker(chunk_tokens: int, overlap_tokens: int) -> TokenChunker:
+    return TokenChunker(chunk_tokens, overlap_tokens, encoding=WordEncoding())
+
+
+def _sentences(n: int, words: int = 5) -> list[str]:
+    return [
+        " ".join(f"s{i}w{j}" for j in range(words - 1)) + f" s{i}end." for i in range(n)
+    ]
+
+
+def test_chunks_respect_token_limit_sentences_and_overlap() -> None:
+    sentences = _sentences(20)
+    chunks = chunk_text(" ".join(sentences), _chunker(12, 5))
+
+    encoding = WordEncoding()
+    assert all(len(encoding.encode_ordinary(c)) <= 12 for c in chunks)
+    for chunk in chunks:
+        assert chunk.endswith("end.")
+        assert chunk.split(". ")[0].split()[0].endswith("w0")
+    # Two five-word sentences per chunk, the second carried into the next
+    assert chunks[0] == f"{sentences[0]} {sentences[1]}"
+    assert chunks[1] == f"{sentences[1]} {sentences[2]}"
+    assert chunks[-1].endswith(sentences[-1])
+
+
+def test_overlong_sentence_is_cut_on_token_boundaries() -> None:
+    long_sentence = " ".join(f"w{i}" for i in range(25)) + "."
+    chunks = chunk_text(f"Short one. {long_sentence} Tail.", _chunker(10, 0))
+
+    assert chunks[0] == "Short one."
+    assert [len(c.split()) for c in chunks[1:-1]] == [10, 10]
+    assert chunks[-1] == "w20 w21 w22 w23 w24. Tail."
+
+
+def test_streamed_pages_match_whole_text() -> None:
+    words = " ".join(_sentences(40)).split()
+    # Page breaks land mid-sentence
+    pages = [" ".join(words[i : i + 13]) for i in range(0, len(words), 13)]
+
+    chunker = _chunker(30, 8)
+    streamed = [chunk for page in pages for chunk in chunker.feed(page)]
+    streamed += chunker.flush()
+
+    whole = chunk_text(" ".join(words), _chunker(30, 8))
+    assert [" ".join(c.split()) for c in streamed] == whole
+
+
+class CountingEncoding(WordEncoding):
+    """Counts the words encoded and decoded, a stand-in for chunking time."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.work = 0
+
+    def encode_ordinary(self, text: str) -> list[int]:
+        tokens = super().encode_ordinary(text)
+        self.work += len(tokens)
+        return tokens
+
+    def decode(self, tokens: list[int]) -> str:
+        self.work += len(tokens)
+        return super().decode(tokens)
+
+
+def test_chunking_work_is_linear() -> None:
+    def run(n: int) -> int:
+        encoding = CountingEncoding()
+        chunk_text(" ".join(_sentences(n, words=12)), TokenChunker(200, 40, encoding))
+        return encoding.work
+
+    small, large = run(2_000), run(16_000)
+    # Eight times the text costs eight times the tokenizer work, give or take
+    # the last chunk; a rescan per chunk would make it sixty-four times
+    assert small * 8 * 0.95 <= large <= small * 8 * 1.05
+
+
+def test_overlap_must_be_smaller_than_chunk() -> None:
+    with pytest.raises(ValueError):
+        _chunker(10, 10)
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from openai.types.chat import ChatCompletion
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.completions import CompletionCache
+from app.services.completion_cache import (
+    CompletionCacheClient,
+    completion_cache_key,
+    is_json_completion,
+)
+from app.tests.utils.utils import random_lower_string
+
+
+def _completion(content: str, finish_reason: str = "stop") -> ChatCompletion:
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "test-model",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": finish_reason,
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+        }
+    )
+
+
+def _request(prompt: str, temperature: float | None = None) -> dict[str, Any]:
+    request: dict[str, Any] = {
+        "model": "test-model",
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if temperature is not None:
+        request["temperature"] = temperature
+    return request
+
+
+class Creator:
+    def __init__(self, content: str = '{"ok": true}', finish_reason: str = "stop"):
+        self.content = content
+        self.finish_reason = finish_reason
+        self.calls = 0
+
+    async def __call__(self, request: dict[str, Any]) -> ChatCompletion:
+        self.calls += 1
+        return _completion(self.content, self.finish_reason)
+
+
+def test_cache_key_covers_model_messages_format_and_temperature() -> None:
+    key = completion_cache_key(_request("hi"))
+    assert key == completion_cache_key({**_request("hi"), "max_tokens": 5})
+    assert key != completion_cache_key(_request("hi", temperature=0.7))
+    assert key != completion_cache_key({**_request("hi"), "model": "other"})
+    assert key != completion_cache_key(
+        {**_request("hi"), "response_format": {"type": "json_object"}}
+    )
+
+
+def test_identical_requests_are_served_from_the_cache(db: Session) -> None:
+    cache = CompletionCacheClient()
+    create = Creator()
+    request = _request(random_lower_string())
+
+    first = asyncio.run(cache.complete(request, create))
+    second = asyncio.run(cache.complete(request, create))
+    assert create.calls == 1
+    assert second.choices[0].message.content == first.choices[0].message.content
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    asyncio.run(cache.complete(_request(random_lower_string()), create))
+    assert create.calls == 2
+
+    db.delete(db.get(CompletionCache, completion_cache_key(request)))
+    db.commit()
+
+
+def test_unusable_completions_are_not_cached(db: Session) -> None:
+    cache = CompletionCacheClient()
+    truncated = Creator(finish_reason="length")
+    request = _request(random_lower_string())
+    asyncio.run(cache.complete(request, truncated))
+    asyncio.run(cache.complete(request, truncated))
+    assert truncated.calls == 2
+
+    invalid = Creator(content="```json\n[]\n```")
+    asyncio.run(cache.complete(request, invalid, validate=is_json_completion))
+    asyncio.run(cache.complete(request, invalid, validate=is_json_completion))
+    assert invalid.calls == 2
+    assert db.get(CompletionCache, completion_cache_key(request)) is None
+
+
+def test_expired_and_overflowing_entries_are_evicted(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = CompletionCacheClient()
+    create = Creator()
+    stale = _request(random_lower_string())
+    asyncio.run(cache.complete(stale, create))
+    entry = db.get(CompletionCache, completion_cache_key(stale))
+    assert entry
+    entry.created_at = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.LLM_CACHE_TTL_SECONDS + 60
+    )
+    db.add(entry)
+    db.commit()
+
+    # An expired entry is a miss
+    asyncio.run(cache.complete(stale, create))
+    assert create.calls == 2
+
+    monkeypatch.setattr(settings, "LLM_CACHE_MAX_ENTRIES", 2)
+    requests = [_request(random_lower_string()) for _ in range(3)]
+    for request in requests:
+        asyncio.run(cache.complete(request, create))
+    db.expire_all()
+    kept = set(db.exec(select(CompletionCache.request_hash)).all())
+    assert kept == {completion_cache_key(request) for request in requests[1:]}
+
+    for key in kept:
+        db.delete(db.get(CompletionCache, key))
+    db.commit()
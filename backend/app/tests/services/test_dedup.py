@@ -0,0 +1,136 @@
+import asyncio
+import uuid
+from pathlib import Path
+
+from sqlmodel import Session, select
+
+from app import crud
+from app.models.document import Document, DocumentFingerprint
+from app.models.embeddings import Chunk, ChunkCreate
+from app.models.quizzes import Quiz
+from app.schemas.public import DifficultyLevel, DocumentStatus
+from app.services.dedup import clone_document, find_duplicate_source
+from app.services.ingestion import chunk_uuid
+from app.tests.utils.document import create_random_document
+from app.vector_stores.local_store import LocalVectorStore
+
+DIMENSION = 4
+SHA256 = "ab" * 32
+
+
+def _fingerprint(db: Session, document: Document) -> None:
+    db.add(DocumentFingerprint(document_id=document.id, sha256=SHA256, size=10))
+    db.commit()
+
+
+def test_duplicate_upload_copies_chunks_vectors_and_quizzes(
+    db: Session, tmp_path: Path
+) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+
+    source = create_random_document(db)
+    _fingerprint(db, source)
+    texts = ["alpha facts", "beta facts", "gamma facts"]
+    embedding_ids = [str(uuid.uuid4()) for _ in texts]
+    chunk_ids = crud.create_chunks(
+        session=db,
+        chunks_in=[
+            ChunkCreate(document_id=source.id, text_content=t, embedding_id=e)
+            for t, e in zip(texts, embedding_ids, strict=True)
+        ],
+    )
+    store.upsert(
+        [
+            {
+                "id": embedding_id,
+                "values": [float(i == j) for j in range(DIMENSION)],
+                "metadata": {
+                    "course_id": str(source.course_id),
+                    "document_id": str(source.id),
+                    "chunk_id": str(chunk_id),
+                    "text": text,
+                    "chunk_index": i,
+                },
+            }
+            for i, (text, embedding_id, chunk_id) in enumerate(
+                zip(texts, embedding_ids, chunk_ids, strict=True)
+            )
+        ]
+    )
+    db.add(
+        Quiz(
+            chunk_id=chunk_ids[1],
+            difficulty_level=DifficultyLevel.EASY,
+            quiz_text="What is beta?",
+            correct_answer="Facts",
+            distraction_1="a",
+            distraction_2="b",
+            distraction_3="c",
+            topic="Greek",
+        )
+    )
+
+    target = create_random_document(db)
+    _fingerprint(db, target)
+
+    # Only completed documents can be reused
+    assert find_duplicate_source(db, SHA256, target.id) is None
+    source.status = DocumentStatus.COMPLETED
+    db.add(source)
+    db.commit()
+    found = find_duplicate_source(db, SHA256, target.id)
+    assert found and found.id == source.id
+    assert find_duplicate_source(db, "cd" * 32, target.id) is None
+
+    copied = asyncio.run(clone_document(source, target, store))
+    assert copied == (3, 1)
+
+    target_chunks = db.exec(select(Chunk).where(Chunk.document_id == target.id)).all()
+    assert sorted(c.text_content for c in target_chunks) == texts
+    assert not {c.embedding_id for c in target_chunks} & set(embedding_ids)
+    # Copies get the ids ingestion would give the target's chunks
+    expected_ids = {chunk_uuid(target.id, ordinal) for ordinal in range(3)}
+    assert {c.id for c in target_chunks} == expected_ids
+    assert {c.embedding_id for c in target_chunks} == {str(i) for i in expected_ids}
+
+    matches = store.query(
+        [0.0, 1.0, 0.0, 0.0], top_k=5, filter={"course_id": str(target.course_id)}
+    )
+    assert [m.metadata["text"] for m in matches][0] == "beta facts"
+    assert {m.metadata["document_id"] for m in matches} == {str(target.id)}
+    assert {m.metadata["chunk_id"] for m in matches} == {
+        str(c.id) for c in target_chunks
+    }
+
+    target_quiz = db.exec(
+        select(Quiz).where(Quiz.chunk_id.in_([c.id for c in target_chunks]))  # type: ignore[attr-defined]
+    ).one()
+    assert target_quiz.quiz_text == "What is beta?"
+    assert target_quiz.difficulty_level == DifficultyLevel.EASY
+
+    for document in (source, target):
+        db.delete(document)
+    db.commit()
+
+
+def test_clone_falls_back_when_source_vectors_are_missing(
+    db: Session, tmp_path: Path
+) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    source = create_random_document(db)
+    crud.create_chunks(
+        session=db,
+        chunks_in=[
+            ChunkCreate(document_id=source.id, text_content="x", embedding_id="gone")
+        ],
+    )
+    target = create_random_document(db)
+
+    assert asyncio.run(clone_document(source, target, store)) is None
+    assert not db.exec(select(Chunk).where(Chunk.document_id == target.id)).all()
+
+    for document in (source, target):
+        db.delete(document)
+    db.commit()
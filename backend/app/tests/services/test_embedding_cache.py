@@ -0,0 +1,41 @@
+import asyncio
+
+from app.services.embedding_cache import (
+    CachedEmbedder,
+    embedding_cache_key,
+    pack_vector,
+    unpack_vector,
+)
+from app.tests.utils.utils import random_lower_string
+
+
+def test_cache_key_ignores_whitespace_but_not_model() -> None:
+    key = embedding_cache_key("Hello  world\n", "model-a", 3)
+    assert key == embedding_cache_key(" Hello world", "model-a", 3)
+    assert key != embedding_cache_key("Hello world", "model-b", 3)
+    assert key != embedding_cache_key("Hello world", "model-a", 4)
+
+
+def test_pack_vector_round_trip() -> None:
+    vector = [0.25, -1.5, 3.0]
+    assert len(pack_vector(vector)) == 12
+    assert unpack_vector(pack_vector(vector)) == vector
+
+
+def test_cached_embedder_only_embeds_misses() -> None:
+    calls: list[list[str]] = []
+
+    async def embed(batch: list[str]) -> list[list[float]]:
+        calls.append(batch)
+        return [[float(len(text)), 0.5] for text in batch]
+
+    seen = random_lower_string()
+    asyncio.run(CachedEmbedder(embed, "test-model", 2)([seen]))
+
+    embedder = CachedEmbedder(embed, "test-model", 2)
+    new = random_lower_string() + "!"
+    vectors = asyncio.run(embedder([seen, new, seen]))
+
+    assert calls[-1] == [new]
+    assert vectors == [[32.0, 0.5], [33.0, 0.5], [32.0, 0.5]]
+    assert (embedder.hits, embedder.misses) == (2, 1)
@@ -0,0 +1,200 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlmodel import Session, delete, select
+
+from app import crud, tasks
+from app.models.course import QAItem
+from app.models.document import Document
+from app.models.embeddings import ChunkCreate
+from app.models.flashcards import FlashcardDeck
+from app.models.jobs import IngestionJob, JobKind, JobStatus
+from app.schemas.public import DocumentStatus
+from app.services import flashcards
+from app.services.flashcards import (
+    EmptyDeckError,
+    build_deck,
+    content_version,
+    enqueue_flashcards,
+    get_deck,
+    store_deck,
+)
+from app.tests.utils.document import create_random_document
+
+
+def _completed_document(db: Session, page_hashes: list[str]) -> Document:
+    document = create_random_document(db)
+    crud.replace_document_pages(
+        session=db, document_id=document.id, page_hashes=page_hashes
+    )
+    document.status = DocumentStatus.COMPLETED
+    db.add(document)
+    db.commit()
+    return document
+
+
+def _cards(*questions: str) -> list[QAItem]:
+    return [QAItem(question=question, answer="Answer") for question in questions]
+
+
+def test_content_version_follows_the_pages(db: Session) -> None:
+    document = create_random_document(db)
+    assert content_version(db, document.id) is None
+
+    crud.replace_document_pages(
+        session=db, document_id=document.id, page_hashes=["a", "b"]
+    )
+    version = content_version(db, document.id)
+    assert version
+    assert content_version(db, document.id) == version
+
+    crud.replace_document_pages(
+        session=db, document_id=document.id, page_hashes=["a", "c"]
+    )
+    assert content_version(db, document.id) != version
+
+    db.delete(document)
+    db.commit()
+
+
+def test_documents_without_pages_are_versioned_by_chunks(db: Session) -> None:
+    document = create_random_document(db)
+    crud.create_chunks(
+        session=db,
+        chunks_in=[
+            ChunkCreate(
+                document_id=document.id,
+                text_content="Some text.",
+                embedding_id=str(uuid.uuid4()),
+            )
+        ],
+    )
+    version = content_version(db, document.id)
+    assert version
+    assert content_version(db, document.id) == version
+
+    db.delete(document)
+    db.commit()
+
+
+def test_build_deck_raises_instead_of_returning_an_empty_deck(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def no_texts(**_: object) -> list[str]:
+        return []
+
+    monkeypatch.setattr(flashcards, "get_retrieved_docs", no_texts)
+    with pytest.raises(EmptyDeckError):
+        asyncio.run(build_deck(uuid.uuid4()))
+
+
+def test_store_deck_replaces_older_versions(db: Session) -> None:
+    document = create_random_document(db)
+    store_deck(db, document.id, "v1", _cards("First?"))
+    db.commit()
+    store_deck(db, document.id, "v2", _cards("Second?"))
+    db.commit()
+    store_deck(db, document.id, "v2", _cards("Third?", "Fourth?"))
+    db.commit()
+
+    assert get_deck(db, document.id, "v1") is None
+    assert get_deck(db, document.id, "v2") == _cards("Third?", "Fourth?")
+
+    db.delete(document)
+    db.commit()
+
+
+def test_generate_flashcards_task_reuses_the_current_deck(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    document = _completed_document(db, ["a", "b"])
+    calls: list[bool] = []
+
+    async def fake_build_deck(
+        document_id: uuid.UUID, refresh: bool = False
+    ) -> list[QAItem]:
+        assert document_id == document.id
+        calls.append(refresh)
+        return _cards(f"Question {len(calls)}?")
+
+    monkeypatch.setattr(tasks, "build_deck", fake_build_deck)
+    version = content_version(db, document.id)
+    assert version
+
+    asyncio.run(tasks.generate_flashcards_task(document.id))
+    asyncio.run(tasks.generate_flashcards_task(document.id))
+    assert calls == [False]
+    db.expire_all()
+    assert get_deck(db, document.id, version) == _cards("Question 1?")
+
+    asyncio.run(tasks.generate_flashcards_task(document.id, force=True))
+    assert calls == [False, True]
+    db.expire_all()
+    assert get_deck(db, document.id, version) == _cards("Question 2?")
+
+    # New content gets its own deck and the old one is dropped
+    crud.replace_document_pages(
+        session=db, document_id=document.id, page_hashes=["a", "c"]
+    )
+    asyncio.run(tasks.generate_flashcards_task(document.id))
+    assert len(calls) == 3
+    db.expire_all()
+    decks = db.exec(
+        select(FlashcardDeck).where(FlashcardDeck.document_id == document.id)
+    ).all()
+    assert [deck.content_version for deck in decks] == [
+        content_version(db, document.id)
+    ]
+
+    db.delete(document)
+    db.commit()
+
+
+def test_enqueue_flashcards_skips_existing_decks_and_pending_jobs(
+    db: Session,
+) -> None:
+    document = _completed_document(db, ["a"])
+
+    def jobs() -> list[IngestionJob]:
+        return list(
+            db.exec(
+                select(IngestionJob).where(
+                    IngestionJob.document_id == document.id,
+                    IngestionJob.kind == JobKind.GENERATE_FLASHCARDS,
+                )
+            ).all()
+        )
+
+    assert enqueue_flashcards(db, document.id)
+    assert enqueue_flashcards(db, document.id) is None
+    assert len(jobs()) == 1
+
+    # A regeneration is not covered by the pending unforced job, only once
+    assert enqueue_flashcards(db, document.id, force=True)
+    assert enqueue_flashcards(db, document.id, force=True) is None
+    assert len(jobs()) == 2
+
+    for job in jobs():
+        db.delete(job)
+    version = content_version(db, document.id)
+    assert version
+    store_deck(db, document.id, version, _cards("Done?"))
+    db.commit()
+    assert enqueue_flashcards(db, document.id) is None
+    assert enqueue_flashcards(db, document.id, force=True)
+
+    # A deck job that failed for good is not queued again for that content
+    db.exec(delete(FlashcardDeck).where(FlashcardDeck.document_id == document.id))
+    for job in jobs():
+        job.status = JobStatus.FAILED
+        db.add(job)
+    db.commit()
+    assert enqueue_flashcards(db, document.id) is None
+    crud.replace_document_pages(session=db, document_id=document.id, page_hashes=["b"])
+    assert enqueue_flashcards(db, document.id)
+
+    for job in jobs():
+        db.delete(job)
+    db.delete(document)
+    db.commit()
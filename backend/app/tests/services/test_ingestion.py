@@ -0,0 +1,89 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+import pytest
+
+from app.services.chunking import TokenChunker
+from app.services.ingestion import batched, embed_batches, iter_text_chunks
+from app.tests.utils.chunking import WordEncoding
+
+
+async def _aiter(items: list[str]) -> AsyncIterator[str]:
+    for item in items:
+        yield item
+
+
+async def _collect_batches(
+    texts: list[str], size: int, **kwargs
+) -> list[tuple[list[str], list[list[float]]]]:
+    return [
+        result async for result in embed_batches(batched(_aiter(texts), size), **kwargs)
+    ]
+
+
+def test_iter_text_chunks_covers_every_page() -> None:
+    pages = [f"Page {i} sentence. " * 200 for i in range(5)]
+    chunker = TokenChunker(100, 10, encoding=WordEncoding())
+
+    async def run() -> list[str]:
+        return [c async for c in iter_text_chunks(_aiter(pages), chunker)]
+
+    chunks = asyncio.run(run())
+    assert all(len(chunk.split()) <= 100 for chunk in chunks)
+    for i in range(5):
+        assert any(f"Page {i}" in chunk for chunk in chunks)
+
+
+def test_embed_batches_keeps_order_and_runs_concurrently() -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def embed(batch: list[str]) -> list[list[float]]:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Later batches finish first to make sure order is restored
+        await asyncio.sleep(0.05 / (int(batch[0]) + 1))
+        in_flight -= 1
+        return [[float(text)] for text in batch]
+
+    texts = [str(i) for i in range(40)]
+    started = time.perf_counter()
+    results = asyncio.run(
+        _collect_batches(texts, 5, embed=embed, concurrency=4, max_retries=0)
+    )
+    elapsed = time.perf_counter() - started
+
+    assert [text for batch, _ in results for text in batch] == texts
+    assert [v[0] for _, vectors in results for v in vectors] == [
+        float(t) for t in texts
+    ]
+    assert max_in_flight == 4
+    assert elapsed < 0.05 * 8
+
+
+def test_embed_batches_retries_only_the_failed_batch() -> None:
+    calls: dict[str, int] = {}
+
+    async def flaky_embed(batch: list[str]) -> list[list[float]]:
+        calls[batch[0]] = calls.get(batch[0], 0) + 1
+        if batch[0] == "2" and calls[batch[0]] == 1:
+            raise RuntimeError("rate limited")
+        return [[0.0] for _ in batch]
+
+    texts = [str(i) for i in range(6)]
+    results = asyncio.run(
+        _collect_batches(texts, 2, embed=flaky_embed, concurrency=2, max_retries=2)
+    )
+
+    assert len(results) == 3
+    assert calls == {"0": 1, "2": 2, "4": 1}
+
+
+def test_embed_batches_gives_up_after_max_retries() -> None:
+    async def failing_embed(_batch: list[str]) -> list[list[float]]:
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_collect_batches(["a"], 1, embed=failing_embed, max_retries=1))
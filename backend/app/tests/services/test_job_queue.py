@@ -0,0 +1,170 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, delete
+
+from app.core.config import settings
+from app.models.document import Document
+from app.models.jobs import IngestionJob, JobKind, JobStatus
+from app.schemas.public import DocumentStatus
+from app.services.job_queue import (
+    QueueFullError,
+    check_admission,
+    claim_job,
+    complete_job,
+    enqueue_job,
+    fail_job,
+    queue_stats,
+    renew_lease,
+)
+from app.tests.utils.document import create_random_document
+
+
+@pytest.fixture()
+def document(db: Session) -> Generator[Document, None, None]:
+    # Drain jobs left over by other tests so claims below are deterministic
+    db.execute(delete(IngestionJob))
+    db.commit()
+
+    document = create_random_document(db)
+    yield document
+    db.delete(document)
+    db.commit()
+
+
+def test_claim_hands_each_job_to_one_worker(db: Session, document: Document) -> None:
+    first = enqueue_job(db, JobKind.PROCESS_PDF, document.id, {"file_path": "a"})
+    second = enqueue_job(db, JobKind.PROCESS_PDF, document.id, {"file_path": "b"})
+
+    claimed_a = claim_job(db, "worker-a")
+    claimed_b = claim_job(db, "worker-b")
+
+    assert claimed_a and claimed_b
+    assert {claimed_a.id, claimed_b.id} == {first.id, second.id}
+    assert claimed_a.status == JobStatus.RUNNING
+    assert claimed_a.attempts == 1
+    assert claim_job(db, "worker-c") is None
+
+    assert renew_lease(db, claimed_a.id, "worker-a")
+    assert not renew_lease(db, claimed_a.id, "worker-b")
+
+    complete_job(db, claimed_a.id)
+    db.refresh(claimed_a)
+    assert claimed_a.status == JobStatus.COMPLETED
+
+
+def test_failed_job_is_retried_with_backoff(db: Session, document: Document) -> None:
+    job = enqueue_job(db, JobKind.GENERATE_QUIZZES, document.id)
+    job.max_attempts = 2
+    db.add(job)
+    db.commit()
+
+    claimed = claim_job(db, "worker-a")
+    assert claimed
+    retried = fail_job(db, claimed.id, "boom")
+    assert retried and retried.status == JobStatus.QUEUED
+    assert retried.run_at > datetime.now(timezone.utc)
+    assert claim_job(db, "worker-a") is None
+
+    retried.run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.add(retried)
+    db.commit()
+    claimed = claim_job(db, "worker-a")
+    assert claimed and claimed.attempts == 2
+
+    failed = fail_job(db, claimed.id, "boom again")
+    assert failed and failed.status == JobStatus.FAILED
+    assert failed.last_error == "boom again"
+
+
+def test_expired_lease_is_reclaimed(db: Session, document: Document) -> None:
+    enqueue_job(db, JobKind.PROCESS_PDF, document.id)
+    claimed = claim_job(db, "crashed-worker")
+    assert claimed
+
+    claimed.lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.add(claimed)
+    db.commit()
+
+    reclaimed = claim_job(db, "worker-b")
+    assert reclaimed and reclaimed.id == claimed.id
+    assert reclaimed.locked_by == "worker-b"
+    assert reclaimed.attempts == 2
+
+
+def test_expired_final_attempt_fails_the_document(
+    db: Session, document: Document, tmp_path: Path
+) -> None:
+    upload = tmp_path / "upload.pdf"
+    upload.write_bytes(b"%PDF")
+    job = enqueue_job(db, JobKind.PROCESS_PDF, document.id, {"file_path": str(upload)})
+    job.max_attempts = 1
+    db.add(job)
+    db.commit()
+
+    claimed = claim_job(db, "crashed-worker")
+    assert claimed
+    document.status = DocumentStatus.PROCESSING
+    claimed.lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.add(document)
+    db.add(claimed)
+    db.commit()
+
+    assert claim_job(db, "worker-b") is None
+    db.refresh(claimed)
+    db.refresh(document)
+    assert claimed.status == JobStatus.FAILED
+    assert claimed.last_error == "Lease expired on final attempt"
+    assert document.status == DocumentStatus.FAILED
+    assert not upload.exists()
+
+
+def test_claims_rotate_between_owners_under_a_global_cap(
+    db: Session, document: Document
+) -> None:
+    heavy = [enqueue_job(db, JobKind.PROCESS_PDF, document.id) for _ in range(3)]
+    other_document = create_random_document(db)
+    light = enqueue_job(db, JobKind.PROCESS_PDF, other_document.id)
+    assert heavy[0].owner_id and light.owner_id
+    assert heavy[0].owner_id != light.owner_id
+
+    stats = queue_stats(db)
+    assert (stats.queued, stats.running, stats.owners_waiting) == (4, 0, 2)
+
+    first = claim_job(db, "worker-a", max_running=2)
+    second = claim_job(db, "worker-b", max_running=2)
+    assert first and first.id == heavy[0].id
+    # The light user's job jumps the heavy user's older backlog
+    assert second and second.id == light.id
+    assert claim_job(db, "worker-c", max_running=2) is None
+
+    complete_job(db, second.id)
+    third = claim_job(db, "worker-b", max_running=2)
+    assert third and third.id == heavy[1].id
+    assert queue_stats(db).running == 2
+
+    db.delete(other_document)
+    db.commit()
+
+
+def test_admission_rejects_deep_backlogs(
+    db: Session, document: Document, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "INGESTION_MAX_QUEUED_JOBS_PER_USER", 2)
+    owner_id = enqueue_job(db, JobKind.PROCESS_PDF, document.id).owner_id
+    assert owner_id
+
+    check_admission(db, owner_id)
+    with pytest.raises(QueueFullError) as error:
+        check_admission(db, owner_id, new_jobs=2)
+    assert error.value.retry_after == settings.INGESTION_RETRY_AFTER_SECONDS
+
+    monkeypatch.setattr(settings, "INGESTION_MAX_QUEUED_JOBS", 1)
+    other_document = create_random_document(db)
+    with pytest.raises(QueueFullError):
+        check_admission(db, other_document.course.owner_id)
+
+    db.delete(other_document)
+    db.commit()
@@ -0,0 +1,133 @@
+import asyncio
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, select
+
+from app import crud
+from app.models.document import Document
+from app.models.embeddings import ChunkCreate
+from app.models.jobs import IngestionJob, JobKind
+from app.schemas.public import DocumentStatus
+from app.services.namespaces import (
+    course_namespace,
+    enqueue_namespace_moves,
+    move_document_vectors,
+    query_course,
+)
+from app.tests.utils.document import create_random_document
+from app.vector_stores.local_store import LocalVectorStore
+
+DIMENSION = 4
+
+
+def test_move_document_vectors_into_course_namespace(
+    db: Session, tmp_path: Path
+) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    document = create_random_document(db)
+    document.status = DocumentStatus.COMPLETED
+    db.add(document)
+    db.commit()
+    embedding_ids = [str(uuid.uuid4()) for _ in range(3)]
+    crud.create_chunks(
+        session=db,
+        chunks_in=[
+            ChunkCreate(document_id=document.id, text_content=f"t{i}", embedding_id=e)
+            for i, e in enumerate(embedding_ids)
+        ],
+    )
+    store.upsert(
+        [
+            {
+                "id": e,
+                "values": [float(i == j) for j in range(DIMENSION)],
+                "metadata": {
+                    "course_id": str(document.course_id),
+                    "document_id": str(document.id),
+                },
+            }
+            for i, e in enumerate(embedding_ids)
+        ]
+    )
+
+    assert enqueue_namespace_moves(db) >= 1
+    # A second scan does not queue the same document twice
+    enqueue_namespace_moves(db)
+    jobs = db.exec(
+        select(IngestionJob).where(
+            IngestionJob.document_id == document.id,
+            IngestionJob.kind == JobKind.MOVE_VECTORS,
+        )
+    ).all()
+    assert len(jobs) == 1
+
+    # Found in the shared namespace by course filter before the move...
+    before = query_course(store, document.course_id, [1.0, 0.0, 0.0, 0.0], 2)
+    assert before[0].id == embedding_ids[0]
+
+    assert asyncio.run(move_document_vectors(document.id, store)) == 3
+    db.refresh(document)
+    namespace = course_namespace(document.course_id)
+    assert document.embedding_namespace == namespace
+    assert store.fetch(embedding_ids) == []
+    assert len(store.fetch(embedding_ids, namespace)) == 3
+
+    # ...and in the course namespace after it; moving again is a no-op
+    after = query_course(store, document.course_id, [0.0, 1.0, 0.0, 0.0], 2)
+    assert after[0].id == embedding_ids[1]
+    assert asyncio.run(move_document_vectors(document.id, store)) == 0
+
+    for job in jobs:
+        db.delete(job)
+    db.delete(document)
+    db.commit()
+
+
+def test_query_course_skips_documents_being_ingested(
+    db: Session, tmp_path: Path
+) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    document = create_random_document(db)
+    document.status = DocumentStatus.COMPLETED
+    document.embedding_namespace = course_namespace(document.course_id)
+    pending = Document(
+        title="pending", filename="pending.pdf", course_id=document.course_id
+    )
+    db.add(document)
+    db.add(pending)
+    db.commit()
+    metadata = {"course_id": str(document.course_id)}
+    store.upsert(
+        [{"id": "ready", "values": [1.0, 0.0, 0.0, 0.0], "metadata": metadata}],
+        namespace=document.embedding_namespace,
+    )
+    # Left in the shared namespace by an attempt that never completed
+    store.upsert(
+        [{"id": "partial", "values": [0.0, 1.0, 0.0, 0.0], "metadata": metadata}]
+    )
+
+    matches = query_course(store, document.course_id, [0.0, 1.0, 0.0, 0.0], 2)
+    assert [match.id for match in matches] == ["ready"]
+
+    pending.status = DocumentStatus.COMPLETED
+    db.add(pending)
+    db.commit()
+    matches = query_course(store, document.course_id, [0.0, 1.0, 0.0, 0.0], 2)
+    assert [match.id for match in matches] == ["partial", "ready"]
+
+    db.delete(pending)
+    db.delete(document)
+    db.commit()
+
+
+def test_documents_being_ingested_are_not_moved(db: Session, tmp_path: Path) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    document = create_random_document(db)
+    with pytest.raises(RuntimeError):
+        asyncio.run(move_document_vectors(document.id, store))
+    db.delete(document)
+    db.commit()
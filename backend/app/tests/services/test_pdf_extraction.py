@@ -0,0 +1,88 @@
+import asyncio
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PyPdfError
+
+from app.core.config import settings
+from app.services.pdf_extraction import (
+    extract_pdf_pages,
+    shutdown_extraction_executor,
+)
+
+
+def _pdf(texts: list[str]) -> bytes:
+    """A minimal PDF with one line of Helvetica text per page."""
+    count = len(texts)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {count} >>".encode(),
+    ]
+    for i, text in enumerate(texts):
+        stream = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {4 + 2 * i} 0 R /Resources << /Font << /F1 "
+            f"{3 + 2 * count} 0 R >> >> >>".encode()
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    out += b"startxref\n%d\n%%%%EOF\n" % xref
+    return bytes(out)
+
+
+def _write(tmp_path: Path, name: str) -> Path:
+    path = tmp_path / name
+    path.write_bytes(_pdf(["Still readable"]))
+    return path
+
+
+@pytest.fixture
+def one_page_per_task(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_PAGES_PER_TASK", 1)
+    yield
+    shutdown_extraction_executor()
+
+
+@pytest.mark.usefixtures("one_page_per_task")
+def test_pages_are_extracted_in_order(tmp_path: Path) -> None:
+    path = tmp_path / "two-pages.pdf"
+    path.write_bytes(_pdf(["First page", "Second page"]))
+
+    pages = asyncio.run(extract_pdf_pages(str(path)))
+    assert [page.strip() for page in pages] == ["First page", "Second page"]
+
+
+@pytest.mark.usefixtures("one_page_per_task")
+def test_unreadable_files_fail_without_breaking_the_pool(tmp_path: Path) -> None:
+    corrupt = tmp_path / "corrupt.pdf"
+    corrupt.write_bytes(b"%PDF-1.4\nthis is not a pdf")
+    with pytest.raises(PyPdfError):
+        asyncio.run(extract_pdf_pages(str(corrupt)))
+
+    writer = PdfWriter(clone_from=PdfReader(_write(tmp_path, "plain.pdf")))
+    writer.encrypt(user_password="secret", algorithm="RC4-40")
+    encrypted = tmp_path / "encrypted.pdf"
+    with open(encrypted, "wb") as f:
+        writer.write(f)
+    with pytest.raises(PyPdfError):
+        asyncio.run(extract_pdf_pages(str(encrypted)))
+
+    # The same pool still serves readable files
+    pages = asyncio.run(extract_pdf_pages(str(_write(tmp_path, "after.pdf"))))
+    assert [page.strip() for page in pages] == ["Still readable"]
@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from sqlmodel import Session, select
+
+from app.models.jobs import IngestionProgress, JobKind
+from app.schemas.public import DocumentStatus, IngestionStage, StageStatus
+from app.services.job_queue import enqueue_job
+from app.services.progress import ProgressTracker, format_event, get_progress
+from app.tests.utils.document import create_random_document
+
+
+async def _aiter(items: list[str]) -> AsyncIterator[str]:
+    for item in items:
+        yield item
+
+
+def _rows(db: Session, document_id) -> dict[IngestionStage, IngestionProgress]:
+    db.expire_all()
+    rows = db.exec(
+        select(IngestionProgress).where(IngestionProgress.document_id == document_id)
+    ).all()
+    return {row.stage: row for row in rows}
+
+
+def test_tracker_records_counters_and_timings(db: Session) -> None:
+    document = create_random_document(db)
+    progress = ProgressTracker(document.id, flush_seconds=60)
+
+    progress.record(IngestionStage.SAVE, 2048, 0.25, total=2048)
+
+    async def consume() -> list[str]:
+        pages = progress.count(IngestionStage.EXTRACT, _aiter(["a", "b", "c"]))
+        return [page async for page in pages]
+
+    assert asyncio.run(consume()) == ["a", "b", "c"]
+
+    progress.start(IngestionStage.EMBED, total=10)
+    progress.advance(IngestionStage.EMBED, 4)
+    # Throttled: the counter is not written until the stage finishes
+    assert _rows(db, document.id)[IngestionStage.EMBED].done == 0
+
+    rows = _rows(db, document.id)
+    assert rows[IngestionStage.SAVE].status == StageStatus.COMPLETED
+    assert rows[IngestionStage.SAVE].seconds == 0.25
+    assert rows[IngestionStage.EXTRACT].done == 3
+    assert rows[IngestionStage.EXTRACT].status == StageStatus.COMPLETED
+    assert rows[IngestionStage.EXTRACT].finished_at is not None
+
+    progress.fail_running()
+    embed = _rows(db, document.id)[IngestionStage.EMBED]
+    assert (embed.status, embed.done, embed.total) == (StageStatus.FAILED, 4, 10)
+
+    progress.reset([IngestionStage.EXTRACT, IngestionStage.EMBED])
+    assert set(_rows(db, document.id)) == {IngestionStage.SAVE}
+
+    db.delete(document)
+    db.commit()
+
+
+def test_progress_snapshot_finishes_when_no_job_is_left(db: Session) -> None:
+    document = create_random_document(db)
+    progress = ProgressTracker(document.id)
+    progress.start(IngestionStage.CHUNK)
+    progress.record(IngestionStage.SAVE, 10, 0.1)
+
+    snapshot = get_progress(db, document)
+    assert [stage.stage for stage in snapshot.stages] == [
+        IngestionStage.SAVE,
+        IngestionStage.CHUNK,
+    ]
+    assert snapshot.stages[1].unit == "chunks"
+    assert not snapshot.finished
+
+    document.status = DocumentStatus.COMPLETED
+    db.add(document)
+    db.commit()
+    job = enqueue_job(db, JobKind.GENERATE_QUIZZES, document.id)
+    assert not get_progress(db, document).finished
+    db.delete(job)
+    db.commit()
+    assert get_progress(db, document).finished
+
+    event = format_event("progress", snapshot.model_dump(mode="json"))
+    assert event.startswith("event: progress\ndata: {")
+    assert event.endswith("\n\n")
+
+    db.delete(document)
+    db.commit()
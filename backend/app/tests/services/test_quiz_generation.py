@@ -0,0 +1,301 @@
+import asyncio
+import json
+import re
+import uuid
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlmodel import Session, select
+
+from app import crud, tasks
+from app.core.config import settings
+from app.models.embeddings import ChunkCreate
+from app.models.jobs import IngestionProgress
+from app.models.quizzes import Quiz, QuizAttempt, QuizSession
+from app.prompts import quizzes as quiz_prompts
+from app.schemas.public import DifficultyLevel, IngestionStage, StageStatus
+from app.services import quiz_windows
+from app.services.quiz_windows import build_windows, select_quizzes, spread
+from app.tasks import generate_quiz_bank
+from app.tests.utils.chunking import WordEncoding
+from app.tests.utils.document import create_random_document
+from app.tests.utils.user import create_random_user
+
+
+def _completion(content: dict[str, object]) -> SimpleNamespace:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))],
+        usage=SimpleNamespace(prompt_tokens=100, completion_tokens=10),
+    )
+
+
+def _quiz(question: str, source: int) -> dict[str, object]:
+    return {
+        "quiz": question,
+        "correct_answer": "Right",
+        "distraction_1": "Wrong one",
+        "distraction_2": "Wrong two",
+        "distraction_3": "Wrong three",
+        "topic": "Testing",
+        "source": source,
+    }
+
+
+def test_build_windows_respects_token_budget() -> None:
+    ids = [uuid.uuid4() for _ in range(5)]
+    texts = ["one two three", "four five", "six seven eight nine", "ten", "a " * 12]
+    windows = build_windows(list(zip(ids, texts, strict=True)), 6, WordEncoding())
+    assert [window.chunk_ids for window in windows] == [
+        ids[0:2],
+        ids[2:4],
+        ids[4:5],
+    ]
+    assert windows[0].prompt_text() == "[1] one two three\n\n[2] four five"
+    assert windows[1].source_chunk(2) == ids[3]
+    assert windows[1].source_chunk(7) == ids[2]
+
+
+def test_select_quizzes_spreads_across_windows() -> None:
+    assert select_quizzes([["a1", "a2", "a3"], ["b1"], ["c1", "c2"]], 4) == [
+        "a1",
+        "b1",
+        "c1",
+        "c2",
+    ]
+
+
+def test_select_quizzes_strides_when_windows_exceed_limit() -> None:
+    per_window = [[f"w{n}q0", f"w{n}q1"] for n in range(40)]
+    assert select_quizzes(per_window, 10) == [f"w{n}q0" for n in range(2, 40, 4)]
+    assert spread(list(range(40)), 10) == list(range(2, 40, 4))
+    assert spread(list(range(3)), 10) == [0, 1, 2]
+
+
+def test_long_documents_prompt_evenly_spaced_windows(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "QUIZ_WINDOW_TOKENS", 4)
+    monkeypatch.setattr(settings, "QUIZ_MAX_PER_DIFFICULTY", 2)
+    monkeypatch.setattr(quiz_windows, "get_encoding", lambda name=None: WordEncoding())
+    # One window per chunk, twice as many windows as quizzes are kept
+    chunks = [(uuid.uuid4(), f"Part{n} one two.") for n in range(4)]
+    prompted: list[str] = []
+
+    async def fake_completion(**request: Any) -> SimpleNamespace:
+        assert request["response_format"] == quiz_prompts.QUIZ_LEVELS_FORMAT
+        word = re.findall(r"\[1\] (\w+)", request["messages"][-1]["content"])[0]
+        prompted.append(word)
+        return _completion(
+            {level: [_quiz(f"About {word}?", 1)] for level in quiz_prompts.QUIZ_LEVELS}
+        )
+
+    monkeypatch.setattr(quiz_prompts.client.chat.completions, "create", fake_completion)
+    quizzes, stats = asyncio.run(
+        generate_quiz_bank(uuid.uuid4(), chunks, combined=True)
+    )
+    assert sorted(prompted) == ["Part1", "Part3"]
+    assert (stats.windows, stats.prompts) == (2, 2)
+    assert {quiz.chunk_id for quiz in quizzes} == {chunks[1][0], chunks[3][0]}
+
+
+def test_windows_generate_concurrently_and_fail_independently(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "QUIZ_WINDOW_TOKENS", 4)
+    monkeypatch.setattr(settings, "QUIZ_MAX_PER_DIFFICULTY", 4)
+    monkeypatch.setattr(quiz_windows, "get_encoding", lambda name=None: WordEncoding())
+    document = create_random_document(db)
+    texts = ["Alpha one two.", "Beta one two.", "Gamma one two.", "Delta one two."]
+    chunk_ids = crud.create_chunks(
+        session=db,
+        chunks_in=[
+            ChunkCreate(
+                document_id=document.id,
+                text_content=text,
+                embedding_id=str(uuid.uuid4()),
+            )
+            for text in texts
+        ],
+    )
+    source_of = dict(zip(texts, chunk_ids, strict=True))
+
+    in_flight = 0
+    peak = 0
+
+    async def fake_completion(**request: Any) -> SimpleNamespace:
+        nonlocal in_flight, peak
+        assert request["response_format"] == quiz_prompts.QUIZ_LIST_FORMAT
+        prompt = request["messages"][-1]["content"]
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if "'hard'" in prompt:
+            raise RuntimeError("rate limited")
+        # Windows hold one chunk each; quiz every passage of the prompt
+        passages = re.findall(r"\[(\d)\] (\w+)", prompt)
+        return _completion(
+            {
+                "quizzes": [
+                    _quiz(f"About {word}?", int(number)) for number, word in passages
+                ]
+                + [{"quiz": "missing fields"}]
+            }
+        )
+
+    monkeypatch.setattr(quiz_prompts.client.chat.completions, "create", fake_completion)
+    asyncio.run(tasks.generate_quizzes_task(document.id))
+
+    # Four windows times three levels, at most two requests at once
+    assert peak == 2
+    quizzes = db.exec(
+        select(Quiz).where(Quiz.chunk_id.in_(chunk_ids))  # type: ignore[union-attr]
+    ).all()
+    for level in (DifficultyLevel.EASY, DifficultyLevel.MEDIUM):
+        kept = [quiz for quiz in quizzes if quiz.difficulty_level == level]
+        assert len(kept) == 4
+        for quiz in kept:
+            word = quiz.quiz_text.split()[1].rstrip("?")
+            assert quiz.chunk_id == source_of[f"{word} one two."]
+    assert not [q for q in quizzes if q.difficulty_level == DifficultyLevel.HARD]
+
+    progress = db.get(IngestionProgress, (document.id, IngestionStage.QUIZ_GENERATION))
+    assert progress
+    assert (progress.status, progress.done, progress.total) == (
+        StageStatus.COMPLETED,
+        12,
+        12,
+    )
+
+    db.delete(document)
+    db.commit()
+
+
+def test_combined_mode_sends_each_window_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "QUIZ_WINDOW_TOKENS", 4)
+    monkeypatch.setattr(quiz_windows, "get_encoding", lambda name=None: WordEncoding())
+    chunks = [(uuid.uuid4(), f"{word} one two.") for word in ("Alpha", "Beta")]
+    prompts: list[str] = []
+
+    async def fake_completion(**request: Any) -> SimpleNamespace:
+        prompts.append(request["messages"][-1]["content"])
+        if request["response_format"] == quiz_prompts.QUIZ_LIST_FORMAT:
+            return _completion({"quizzes": [_quiz("A question?", 1)]})
+        return _completion(
+            {
+                level: [_quiz(f"A {level} question?", 1)]
+                for level in quiz_prompts.QUIZ_LEVELS
+            }
+        )
+
+    monkeypatch.setattr(quiz_prompts.client.chat.completions, "create", fake_completion)
+    quizzes, stats = asyncio.run(
+        generate_quiz_bank(uuid.uuid4(), chunks, combined=True)
+    )
+    assert len(prompts) == stats.prompts == 2
+    assert (stats.prompt_tokens, stats.completion_tokens) == (200, 20)
+    assert sorted(
+        (quiz.difficulty_level.value, quiz.chunk_id) for quiz in quizzes
+    ) == sorted(
+        (level, chunk_id)
+        for level in quiz_prompts.QUIZ_LEVELS
+        for chunk_id, _ in chunks
+    )
+
+    prompts.clear()
+    _, stats = asyncio.run(generate_quiz_bank(uuid.uuid4(), chunks, combined=False))
+    assert len(prompts) == stats.prompts == 6
+
+
+def test_quiz_task_retries_failures_and_keeps_an_existing_bank(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(quiz_windows, "get_encoding", lambda name=None: WordEncoding())
+    document = create_random_document(db)
+    chunk_ids = crud.create_chunks(
+        session=db,
+        chunks_in=[
+            ChunkCreate(
+                document_id=document.id,
+                text_content="Alpha one two.",
+                embedding_id=str(uuid.uuid4()),
+            )
+        ],
+    )
+
+    async def failing_completion(**request: Any) -> SimpleNamespace:
+        raise RuntimeError(f"rate limited {request['model']}")
+
+    monkeypatch.setattr(
+        quiz_prompts.client.chat.completions, "create", failing_completion
+    )
+    with pytest.raises(RuntimeError):
+        asyncio.run(tasks.generate_quizzes_task(document.id))
+    progress = db.get(IngestionProgress, (document.id, IngestionStage.QUIZ_GENERATION))
+    assert progress
+    db.refresh(progress)
+    assert progress.status == StageStatus.FAILED
+
+    calls = 0
+
+    async def fake_completion(**request: Any) -> SimpleNamespace:
+        nonlocal calls
+        assert request["response_format"] == quiz_prompts.QUIZ_LIST_FORMAT
+        calls += 1
+        return _completion({"quizzes": [_quiz("About Alpha?", 1)]})
+
+    monkeypatch.setattr(quiz_prompts.client.chat.completions, "create", fake_completion)
+    asyncio.run(tasks.generate_quizzes_task(document.id))
+    assert calls == 3
+    quizzes = db.exec(
+        select(Quiz).where(Quiz.chunk_id.in_(chunk_ids))  # type: ignore[union-attr]
+    ).all()
+    assert len(quizzes) == 3
+
+    user = create_random_user(db)
+    quiz_session = QuizSession(
+        user_id=user.id,
+        course_id=document.course_id,
+        total_submitted=1,
+        total_correct=1,
+    )
+    db.add(quiz_session)
+    db.commit()
+    attempt = QuizAttempt(
+        user_id=user.id,
+        session_id=quiz_session.id,
+        quiz_id=quizzes[0].id,
+        selected_answer_text="Right",
+        is_correct=True,
+        correct_answer_text="Right",
+    )
+    db.add(attempt)
+    db.commit()
+
+    # A re-run (a retry after a lost lease, say) neither calls the LLM nor
+    # touches the bank students have attempted
+    asyncio.run(tasks.generate_quizzes_task(document.id))
+    assert calls == 3
+    db.expire_all()
+    assert db.get(QuizAttempt, attempt.id)
+    assert (
+        len(
+            db.exec(
+                select(Quiz).where(Quiz.chunk_id.in_(chunk_ids))  # type: ignore[union-attr]
+            ).all()
+        )
+        == 3
+    )
+
+    db.delete(db.get(QuizAttempt, attempt.id))
+    db.delete(db.get(QuizSession, quiz_session.id))
+    db.delete(document)
+    db.commit()
@@ -0,0 +1,212 @@
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.document import Document, DocumentPage
+from app.models.embeddings import Chunk
+from app.models.quizzes import Quiz
+from app.schemas.public import DifficultyLevel
+from app.services.chunking import TokenChunker
+from app.services.reingest import ReingestResult, reingest_document, stored_pages
+from app.tests.utils.chunking import WordEncoding
+from app.tests.utils.document import create_random_document
+from app.vector_stores.local_store import LocalVectorStore
+
+DIMENSION = 4
+
+
+def _page(name: str) -> str:
+    # Ten words: exactly one chunk per page with the chunker below
+    return f"{name} one two three four. {name} five six seven eight."
+
+
+async def _aiter(items: list[str]) -> AsyncIterator[str]:
+    for item in items:
+        yield item
+
+
+class Embedder:
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+
+    async def __call__(self, batch: list[str]) -> list[list[float]]:
+        self.texts.extend(batch)
+        return [[1.0, float(len(text)), 0.0, 0.0] for text in batch]
+
+
+def _reingest(
+    document: Document,
+    store: LocalVectorStore,
+    pages: list[str],
+    embed: Embedder,
+    chunk_size: int = 10,
+    **options: bool,
+) -> ReingestResult:
+    chunker = TokenChunker(chunk_size, 0, encoding=WordEncoding())
+    return asyncio.run(
+        reingest_document(document, _aiter(pages), store, embed, chunker, **options)
+    )
+
+
+def _chunks(db: Session, document: Document) -> dict[str, Chunk]:
+    chunks = db.exec(select(Chunk).where(Chunk.document_id == document.id)).all()
+    return {chunk.text_content.split()[0]: chunk for chunk in chunks}
+
+
+def test_replace_only_embeds_changed_chunks(db: Session, tmp_path: Path) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    document = create_random_document(db)
+
+    first = Embedder()
+    result = _reingest(
+        document, store, [_page("Alpha"), _page("Beta"), _page("Gamma")], first
+    )
+    assert (result.chunks_added, result.chunks_kept, result.pages) == (3, 0, 3)
+    before = _chunks(db, document)
+    beta_vector_id = before["Beta"].embedding_id
+    db.add(
+        Quiz(
+            chunk_id=before["Alpha"].id,
+            difficulty_level=DifficultyLevel.EASY,
+            quiz_text="What follows four?",
+            correct_answer="Alpha five",
+            distraction_1="a",
+            distraction_2="b",
+            distraction_3="c",
+            topic="Counting",
+        )
+    )
+    db.commit()
+
+    # Page two is rewritten and a page is appended
+    second = Embedder()
+    result = _reingest(
+        document,
+        store,
+        [_page("Alpha"), _page("Delta"), _page("Gamma"), _page("Omega")],
+        second,
+    )
+    assert result.pages_changed == 2
+    assert (result.chunks_kept, result.chunks_added, result.chunks_removed) == (2, 2, 1)
+    assert [text.split()[0] for text in second.texts] == ["Delta", "Omega"]
+
+    after = _chunks(db, document)
+    assert set(after) == {"Alpha", "Delta", "Gamma", "Omega"}
+    assert after["Alpha"].id == before["Alpha"].id
+    assert after["Gamma"].embedding_id == before["Gamma"].embedding_id
+    assert db.exec(select(Quiz).where(Quiz.chunk_id == after["Alpha"].id)).one()
+
+    stored = store.fetch([chunk.embedding_id for chunk in after.values()])
+    assert len(stored) == 4
+    assert store.fetch([beta_vector_id]) == []
+    pages = db.exec(
+        select(DocumentPage).where(DocumentPage.document_id == document.id)
+    ).all()
+    assert len(pages) == 4
+
+    # Same content again: nothing is embedded or rewritten
+    third = Embedder()
+    result = _reingest(
+        document,
+        store,
+        [_page("Alpha"), _page("Delta"), _page("Gamma"), _page("Omega")],
+        third,
+    )
+    assert (result.pages_changed, result.chunks_kept, result.chunks_added) == (0, 4, 0)
+    assert third.texts == []
+
+    db.delete(document)
+    db.commit()
+
+
+def test_failed_replace_rolls_back(
+    db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_RETRIES", 0)
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    document = create_random_document(db)
+    _reingest(document, store, [_page("Alpha"), _page("Beta")], Embedder())
+    before = _chunks(db, document)
+
+    class Failing(Embedder):
+        async def __call__(self, batch: list[str]) -> list[list[float]]:
+            raise RuntimeError("embedding service down")
+
+    with pytest.raises(RuntimeError):
+        _reingest(document, store, [_page("Alpha"), _page("Delta")], Failing())
+
+    after = _chunks(db, document)
+    assert {k: c.id for k, c in after.items()} == {k: c.id for k, c in before.items()}
+    assert len(store.fetch([c.embedding_id for c in after.values()])) == 2
+
+    db.delete(document)
+    db.commit()
+
+
+def test_rebuild_from_stored_text(db: Session, tmp_path: Path) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    document = create_random_document(db)
+    pages = [_page("Alpha"), _page("Beta"), _page("Gamma")]
+    _reingest(document, store, pages, Embedder())
+    assert stored_pages(db, document.id) == pages
+
+    # Same pages without `rebuild`: nothing to do
+    embed = Embedder()
+    result = _reingest(document, store, pages, embed, chunk_size=30)
+    assert (result.chunks_kept, result.chunks_added) == (3, 0)
+
+    # Larger chunks: the same pages are re-chunked without the PDF
+    result = _reingest(
+        document,
+        store,
+        stored_pages(db, document.id) or [],
+        embed,
+        chunk_size=30,
+        rebuild=True,
+    )
+    assert (result.chunks_kept, result.chunks_added, result.chunks_removed) == (0, 1, 3)
+    assert len(embed.texts) == 1
+
+    # Unchanged settings: rebuilding keeps every chunk
+    embed = Embedder()
+    result = _reingest(document, store, pages, embed, chunk_size=30, rebuild=True)
+    assert (result.chunks_kept, result.chunks_added) == (1, 0)
+    assert embed.texts == []
+
+    db.delete(document)
+    db.commit()
+
+
+def test_reembed_overwrites_vectors_in_place(db: Session, tmp_path: Path) -> None:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    document = create_random_document(db)
+    pages = [_page("Alpha"), _page("Beta")]
+    _reingest(document, store, pages, Embedder())
+    before = {k: (c.id, c.embedding_id) for k, c in _chunks(db, document).items()}
+
+    class NewModel(Embedder):
+        async def __call__(self, batch: list[str]) -> list[list[float]]:
+            self.texts.extend(batch)
+            return [[0.0, 0.0, 1.0, 0.0] for _ in batch]
+
+    embed = NewModel()
+    result = _reingest(document, store, pages, embed, reembed=True)
+    assert (result.chunks_kept, result.chunks_reembedded) == (2, 2)
+    assert len(embed.texts) == 2
+
+    db.expire_all()
+    after = {k: (c.id, c.embedding_id) for k, c in _chunks(db, document).items()}
+    assert after == before
+    vectors = store.fetch([embedding_id for _, embedding_id in after.values()])
+    assert [v["values"] for v in vectors] == [[0.0, 0.0, 1.0, 0.0]] * 2
+
+    db.delete(document)
+    db.commit()
@@ -0,0 +1,51 @@
+import asyncio
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.uploads import UploadTooLargeError, copy_with_hash, save_upload
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size: int | None = -1) -> bytes:
+        self.reads += 1
+        return super().read(size)
+
+
+def test_save_upload_hashes_while_streaming(tmp_path: Path) -> None:
+    data = b"%PDF-1.4 " + bytes(range(256)) * 4096
+    upload = UploadFile(io.BytesIO(data), filename="notes.pdf")
+
+    saved = asyncio.run(
+        save_upload(upload, max_bytes=len(data), directory=str(tmp_path))
+    )
+
+    assert saved.size == len(data)
+    assert saved.sha256 == hashlib.sha256(data).hexdigest()
+    assert Path(saved.path).read_bytes() == data
+    assert Path(saved.path).parent == tmp_path
+
+
+def test_oversized_upload_aborts_early_and_leaves_nothing(tmp_path: Path) -> None:
+    source = CountingReader(b"x" * 100_000)
+    with pytest.raises(UploadTooLargeError):
+        copy_with_hash(source, io.BytesIO(), max_bytes=10_000, buffer_size=4096)
+    # Stops right after crossing the limit instead of reading the whole body
+    assert source.reads == 3
+
+    upload = UploadFile(io.BytesIO(b"x" * 100_000), filename="big.pdf")
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_upload(upload, max_bytes=10_000, directory=str(tmp_path)))
+    assert list(tmp_path.iterdir()) == []
+
+    # A declared size over the limit is rejected without reading at all
+    declared = UploadFile(io.BytesIO(b"x"), filename="big.pdf", size=20_000)
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_upload(declared, max_bytes=10_000, directory=str(tmp_path)))
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from app.core.config import settings
+from app.services.vector_upsert import (
+    UpsertStage,
+    UpsertStats,
+    estimate_vector_bytes,
+    split_vectors,
+    upsert_vectors,
+)
+
+
+def _vector(i: int, text: str = "chunk") -> dict[str, Any]:
+    return {"id": f"v{i}", "values": [0.1] * 8, "metadata": {"text": text}}
+
+
+class FakeStore:
+    def __init__(self, fail_ids: set[str] | None = None, delay: float = 0.0) -> None:
+        self.fail_ids = set(fail_ids or ())
+        self.delay = delay
+        self.calls: list[list[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def upsert(
+        self, vectors: list[dict[str, Any]], namespace: str | None = None
+    ) -> None:
+        ids = [v["id"] for v in vectors]
+        with self._lock:
+            self.calls.append(ids)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            failing = self.fail_ids.intersection(ids)
+            if failing:
+                # Fail once per vector so the retry succeeds
+                self.fail_ids -= failing
+                raise ConnectionError("transient")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_split_vectors_bounds_count_and_bytes() -> None:
+    vectors = [_vector(i) for i in range(10)]
+    size = estimate_vector_bytes(vectors[0])
+
+    by_count = split_vectors(vectors, max_count=4, max_bytes=10**9)
+    assert [len(batch) for batch, _ in by_count] == [4, 4, 2]
+
+    by_bytes = split_vectors(vectors, max_count=100, max_bytes=size * 3)
+    assert [len(batch) for batch, _ in by_bytes] == [3, 3, 3, 1]
+    assert all(nbytes <= size * 3 for _, nbytes in by_bytes)
+    assert [v for batch, _ in by_bytes for v in batch] == vectors
+
+    huge = _vector(99, text="x" * 1000)
+    assert [len(b) for b, _ in split_vectors([huge], 10, max_bytes=10)] == [1]
+
+
+def test_upsert_vectors_retries_only_the_failed_batch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "VECTOR_UPSERT_BATCH_SIZE", 2)
+    store = FakeStore(fail_ids={"v3"})
+    stats = UpsertStats()
+
+    asyncio.run(upsert_vectors(store, [_vector(i) for i in range(6)], stats))
+
+    assert sorted(map(tuple, store.calls)) == [
+        ("v0", "v1"),
+        ("v2", "v3"),
+        ("v2", "v3"),
+        ("v4", "v5"),
+    ]
+    assert stats.vectors == 6
+    assert stats.requests == 3
+    assert stats.retries == 1
+
+
+def test_upsert_stage_overlaps_requests_and_records_throughput() -> None:
+    store = FakeStore(delay=0.05)
+
+    async def run() -> UpsertStage:
+        async with UpsertStage(store, concurrency=3) as stage:
+            for start in range(0, 12, 2):
+                await stage.submit([_vector(start), _vector(start + 1)])
+        return stage
+
+    stage = asyncio.run(run())
+
+    assert store.max_in_flight > 1
+    assert stage.stats.vectors == 12
+    assert stage.stats.seconds > 0
+    assert stage.stats.vectors_per_second > 0
+    assert stage.first_completed_at is not None
@@ -0,0 +1,15 @@
+from sqlmodel import Session
+
+from app.models.document import Document
+from app.tests.utils.course import create_random_course
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_document(db: Session) -> Document:
+    course = create_random_course(db)
+    title = random_lower_string()
+    document = Document(title=title, filename=f"{title}.pdf", course_id=course.id)
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+    return document
@@ -0,0 +1,110 @@
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from app.vector_stores.local_store import INITIAL_CAPACITY, LocalVectorStore
+
+DIMENSION = 8
+
+
+def _vector(
+    vector_id: str, values: list[float], course: str, document: str
+) -> dict[str, Any]:
+    return {
+        "id": vector_id,
+        "values": values,
+        "metadata": {"course_id": course, "document_id": document, "text": vector_id},
+    }
+
+
+def _basis(i: int, scale: float = 1.0) -> list[float]:
+    values = [0.0] * DIMENSION
+    values[i] = scale
+    return values
+
+
+@pytest.fixture()
+def store(tmp_path: Path) -> LocalVectorStore:
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    return store
+
+
+def test_query_ranks_by_cosine_within_filter(store: LocalVectorStore) -> None:
+    store.upsert(
+        [
+            _vector("a", _basis(0), "c1", "d1"),
+            _vector("b", [0.7, 0.7] + [0.0] * 6, "c1", "d1"),
+            _vector("c", _basis(1, scale=5.0), "c1", "d2"),
+            _vector("other", _basis(0), "c2", "d3"),
+        ]
+    )
+
+    matches = store.query(_basis(0), top_k=2, filter={"course_id": "c1"})
+    assert [m.id for m in matches] == ["a", "b"]
+    assert matches[0].score == pytest.approx(1.0)
+    assert matches[0].metadata["text"] == "a"
+
+    matches = store.query(_basis(1), top_k=5, filter={"document_id": {"$eq": "d2"}})
+    assert [m.id for m in matches] == ["c"]
+
+    matches = store.query(
+        _basis(0), top_k=5, filter={"document_id": {"$in": ["d1", "d3"]}}
+    )
+    assert {m.id for m in matches} == {"a", "b", "other"}
+
+    with pytest.raises(ValueError):
+        store.query(_basis(0), top_k=1, filter={"chunk_index": {"$gt": 1}})
+
+
+def test_delete_and_overwrite_survive_reopening(
+    store: LocalVectorStore, tmp_path: Path
+) -> None:
+    vectors = [
+        _vector(f"v{i}", list(np.random.rand(DIMENSION)), "c1", f"d{i % 2}")
+        for i in range(INITIAL_CAPACITY + 10)
+    ]
+    store.upsert(vectors)
+    store.delete(filter={"document_id": "d0"})
+    store.upsert([_vector("v1", _basis(3), "c1", "d1")])
+
+    reopened = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    matches = reopened.query(_basis(3), top_k=len(vectors), filter={"course_id": "c1"})
+
+    assert len(matches) == len(vectors) // 2
+    assert all(m.metadata["document_id"] == "d1" for m in matches)
+    assert matches[0].id == "v1"
+    assert matches[0].score == pytest.approx(1.0)
+
+    # Writes from another instance become visible without reopening
+    reopened.upsert([_vector("new", _basis(4), "c1", "d1")])
+    assert store.query(_basis(4), top_k=1)[0].id == "new"
+
+
+def test_ensure_index_resets_store_with_wrong_dimension(tmp_path: Path) -> None:
+    old = LocalVectorStore(tmp_path / "vectors", 4)
+    old.ensure_index()
+    old.upsert([_vector("a", [1.0, 0, 0, 0], "c1", "d1")])
+
+    store = LocalVectorStore(tmp_path / "vectors", DIMENSION)
+    store.ensure_index()
+    assert store.query(_basis(0), top_k=1) == []
+
+    with pytest.raises(ValueError):
+        store.upsert([_vector("bad", [1.0, 0, 0, 0], "c1", "d1")])
+
+
+def test_namespaces_are_isolated_and_dropped_whole(store: LocalVectorStore) -> None:
+    store.upsert([_vector("shared", _basis(0), "c1", "d1")])
+    store.upsert([_vector("own", _basis(0), "c1", "d2")], namespace="course-c1")
+
+    assert [m.id for m in store.query(_basis(0), top_k=5)] == ["shared"]
+    assert [m.id for m in store.query(_basis(0), 5, namespace="course-c1")] == ["own"]
+    assert store.fetch(["own"]) == []
+    assert [v["id"] for v in store.fetch(["own"], namespace="course-c1")] == ["own"]
+
+    store.delete_namespace("course-c1")
+    assert store.query(_basis(0), 5, namespace="course-c1") == []
+    assert [m.id for m in store.query(_basis(0), top_k=5)] == ["shared"]
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any
+
+from app.vector_stores.pinecone_store import PineconeVectorStore
+
+
+class FakeClient:
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.calls: list[str] = []
+        self.index_kwargs: list[dict[str, Any]] = []
+
+    def has_index(self, name: str) -> bool:
+        self.calls.append("has_index")
+        return True
+
+    def describe_index(self, name: str) -> SimpleNamespace:
+        self.calls.append("describe_index")
+        return SimpleNamespace(dimension=self.dimension, host="notes-abc.svc.io")
+
+    def delete_index(self, name: str) -> None:
+        self.calls.append("delete_index")
+
+    def create_index(self, **kwargs: Any) -> None:
+        self.calls.append("create_index")
+        self.dimension = kwargs["dimension"]
+
+    def Index(self, **kwargs: Any) -> object:
+        self.index_kwargs.append(kwargs)
+        return object()
+
+
+def test_index_schema_is_checked_once_and_client_is_shared() -> None:
+    client = FakeClient(dimension=4)
+    store = PineconeVectorStore(client, "notes", 4, connection_pool_maxsize=8)  # type: ignore[arg-type]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: store.ensure_index(), range(16)))
+        handles = set(pool.map(lambda _: id(store.index), range(16)))
+
+    assert client.calls == ["has_index", "describe_index"]
+    assert len(handles) == 1
+    # The host from the schema check avoids a second describe_index per client
+    assert client.index_kwargs == [
+        {"host": "notes-abc.svc.io", "connection_pool_maxsize": 8}
+    ]
+
+
+def test_wrong_dimension_recreates_index_once() -> None:
+    client = FakeClient(dimension=3)
+    store = PineconeVectorStore(client, "notes", 4)  # type: ignore[arg-type]
+
+    store.ensure_index()
+    store.ensure_index()
+
+    assert client.calls == [
+        "has_index",
+        "describe_index",
+        "delete_index",
+        "create_index",
+        "describe_index",
+    ]
@@ -0,0 +1,66 @@
+"""
+Vector store backends for document embeddings
+"""
+
+import logging
+import threading
+
+from app.core.config import settings
+from app.vector_stores.base import MetadataFilter, Vector, VectorMatch, VectorStore
+
+logger = logging.getLogger(__name__)
+
+_store: VectorStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """Return the process-wide store for the configured VECTOR_STORE_BACKEND."""
+    global _store
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is not None:
+            return _store
+        from app.llm_clients.pinecone_config import EXPECTED_DIMENSION
+
+        if settings.VECTOR_STORE_BACKEND == "local":
+            from app.vector_stores.local_store import LocalVectorStore
+
+            _store = LocalVectorStore(
+                settings.VECTOR_STORE_LOCAL_DIR, EXPECTED_DIMENSION
+            )
+        else:
+            from app.llm_clients.pinecone_config import pc
+            from app.vector_stores.pinecone_store import PineconeVectorStore
+
+            _store = PineconeVectorStore(
+                pc,
+                settings.PINECONE_INDEX_NAME,
+                EXPECTED_DIMENSION,
+                host=settings.PINECONE_INDEX_HOST,
+                connection_pool_maxsize=settings.PINECONE_CONNECTION_POOL_MAXSIZE,
+            )
+    return _store
+
+
+def warm_vector_store() -> None:
+    """
+    Check the index schema once, ahead of the first document or question.
+
+    A failure is only logged: `ensure_index` is retried on first use.
+    """
+    try:
+        get_vector_store().ensure_index()
+    except Exception as e:
+        logger.warning(f"Vector store bootstrap failed, retrying on first use: {e}")
+
+
+__all__ = [
+    "MetadataFilter",
+    "Vector",
+    "VectorMatch",
+    "VectorStore",
+    "get_vector_store",
+    "warm_vector_store",
+]
@@ -0,0 +1,78 @@
+"""
+Vector store interface shared by every backend
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+Vector = dict[str, Any]
+MetadataFilter = dict[str, Any]
+
+
+@dataclass
+class VectorMatch:
+    id: str
+    score: float
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+class VectorStore(Protocol):
+    """
+    Minimal vector store used by ingestion and retrieval.
+
+    Vectors are dicts with `id`, `values` and `metadata` keys. Filters use the
+    Pinecone subset every backend supports: `{"key": value}`,
+    `{"key": {"$eq": value}}` and `{"key": {"$in": [...]}}`, ANDed together.
+    Every call works on one namespace, the shared default one when
+    `namespace` is None; queries never cross namespaces.
+    Methods are blocking; call them from a thread when on the event loop.
+    """
+
+    def ensure_index(self) -> None:
+        """
+        Create the index, or fix it if its dimension is wrong. Cheap to call
+        again: backends only check the schema once per process.
+        """
+        ...
+
+    def upsert(self, vectors: list[Vector], namespace: str | None = None) -> None: ...
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        filter: MetadataFilter | None = None,
+        namespace: str | None = None,
+    ) -> list[VectorMatch]: ...
+
+    def fetch(self, ids: list[str], namespace: str | None = None) -> list[Vector]:
+        """Return the stored vectors (values and metadata) for `ids` that exist."""
+        ...
+
+    def delete(
+        self,
+        ids: list[str] | None = None,
+        filter: MetadataFilter | None = None,
+        namespace: str | None = None,
+    ) -> None:
+        """Delete the vectors with `ids`, or every vector matching `filter`."""
+        ...
+
+    def delete_namespace(self, namespace: str) -> None:
+        """Drop every vector in `namespace`."""
+        ...
+
+
+def filter_conditions(filter: MetadataFilter | None) -> list[tuple[str, set[Any]]]:
+    """Normalize a metadata filter into (key, allowed values) pairs."""
+    conditions = []
+    for key, condition in (filter or {}).items():
+        if not isinstance(condition, dict):
+            conditions.append((key, {condition}))
+        elif condition.keys() == {"$eq"}:
+            conditions.append((key, {condition["$eq"]}))
+        elif condition.keys() == {"$in"}:
+            conditions.append((key, set(condition["$in"])))
+        else:
+            raise ValueError(f"Unsupported metadata filter for {key!r}: {condition}")
+    return conditions
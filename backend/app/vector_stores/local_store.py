@@ -0,0 +1,368 @@
+"""
+Local vector store: float32 memory-mapped files per course or namespace,
+exact top-k search
+"""
+
+import hashlib
+import json
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.vector_stores.base import (
+    MetadataFilter,
+    Vector,
+    VectorMatch,
+    filter_conditions,
+)
+
+SHARD_KEY = "course_id"
+UNASSIGNED_SHARD = "_unassigned"
+# Directory prefix of named namespaces, which are one shard each
+NAMESPACE_PREFIX = "ns."
+INITIAL_CAPACITY = 1024
+
+Conditions = list[tuple[str, set[Any]]]
+
+
+def _shard_dir_name(value: Any) -> str:
+    name = str(value)
+    if re.fullmatch(r"[\w.-]+", name):
+        return name
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+def _normalize(values: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(values, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return values / norms
+
+
+class _Shard:
+    """
+    Vectors of one course or namespace.
+
+    `vectors.f32` holds unit-length float32 rows (so a dot product is the
+    cosine score) and grows by doubling. `metadata.jsonl` is an append-only
+    log of upserts and deletes; replaying it rebuilds ids, metadata and
+    tombstones, and tailing it picks up writes made by another process.
+    """
+
+    def __init__(self, path: Path, dimension: int) -> None:
+        self.path = path
+        self.dimension = dimension
+        self.vectors_path = path / "vectors.f32"
+        self.log_path = path / "metadata.jsonl"
+        self.ids: list[str] = []
+        self.metadata: list[dict[str, Any] | None] = []
+        self.rows: dict[str, int] = {}
+        self._log_offset = 0
+        self._matrix: np.memmap | None = None
+        self._capacity = 0
+        self._alive: np.ndarray | None = None
+        self._columns: dict[str, np.ndarray] = {}
+        path.mkdir(parents=True, exist_ok=True)
+        self.vectors_path.touch(exist_ok=True)
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        if record["op"] == "upsert":
+            row = record["row"]
+            if row == len(self.ids):
+                self.ids.append(record["id"])
+                self.metadata.append(record["metadata"])
+            else:
+                self.ids[row] = record["id"]
+                self.metadata[row] = record["metadata"]
+            self.rows[record["id"]] = row
+        elif record["op"] == "delete":
+            for row in record["rows"]:
+                self.rows.pop(self.ids[row], None)
+                self.metadata[row] = None
+
+    def _map(self) -> None:
+        row_bytes = self.dimension * np.dtype(np.float32).itemsize
+        self._capacity = self.vectors_path.stat().st_size // row_bytes
+        self._matrix = (
+            np.memmap(
+                self.vectors_path,
+                dtype=np.float32,
+                mode="r+",
+                shape=(self._capacity, self.dimension),
+            )
+            if self._capacity
+            else None
+        )
+
+    def _grow(self, rows: int) -> None:
+        capacity = max(self._capacity, INITIAL_CAPACITY)
+        while capacity < rows:
+            capacity *= 2
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self.vectors_path, "r+b") as f:
+            f.truncate(capacity * self.dimension * np.dtype(np.float32).itemsize)
+        self._map()
+
+    def _append_log(self, records: list[dict[str, Any]]) -> None:
+        data = b"".join(
+            json.dumps(record, separators=(",", ":")).encode() + b"\n"
+            for record in records
+        )
+        with open(self.log_path, "ab") as f:
+            f.write(data)
+        self._log_offset += len(data)
+        for record in records:
+            self._apply(record)
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._alive = None
+        self._columns.clear()
+
+    def refresh(self) -> None:
+        try:
+            size = self.log_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size > self._log_offset:
+            with open(self.log_path, "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read(size - self._log_offset)
+            # Ignore a trailing partial line still being written
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                self._apply(json.loads(line))
+            self._log_offset += end
+            self._invalidate()
+        if len(self.ids) > self._capacity:
+            self._map()
+
+    def _mask(self, conditions: Conditions) -> np.ndarray:
+        if self._alive is None:
+            self._alive = np.fromiter(
+                (m is not None for m in self.metadata), dtype=bool, count=len(self.ids)
+            )
+        mask = self._alive.copy()
+        for key, values in conditions:
+            if key not in self._columns:
+                column = np.empty(len(self.ids), dtype=object)
+                column[:] = [m.get(key) if m else None for m in self.metadata]
+                self._columns[key] = column
+            column = self._columns[key]
+            matches = np.zeros(len(self.ids), dtype=bool)
+            for value in values:
+                matches |= column == value
+            mask &= matches
+        return mask
+
+    def upsert(self, ids: list[str], values: np.ndarray, metadata: list[dict]) -> None:
+        self.refresh()
+        records = []
+        rows = []
+        assigned: dict[str, int] = {}
+        next_row = len(self.ids)
+        for vector_id, meta in zip(ids, metadata, strict=True):
+            row = assigned.get(vector_id, self.rows.get(vector_id))
+            if row is None:
+                row = next_row
+                next_row += 1
+            assigned[vector_id] = row
+            rows.append(row)
+            records.append(
+                {"op": "upsert", "row": row, "id": vector_id, "metadata": meta}
+            )
+
+        if next_row > self._capacity:
+            self._grow(next_row)
+        assert self._matrix is not None
+        self._matrix[rows] = values
+        self._matrix.flush()
+        # Vectors are durable before the log makes them visible
+        self._append_log(records)
+
+    def query(
+        self, vector: np.ndarray, top_k: int, conditions: Conditions
+    ) -> list[VectorMatch]:
+        self.refresh()
+        if not self.ids or self._matrix is None:
+            return []
+        candidates = np.flatnonzero(self._mask(conditions))
+        if candidates.size == 0:
+            return []
+        if candidates.size == len(self.ids):
+            scores = self._matrix[: len(self.ids)] @ vector
+        else:
+            scores = self._matrix[candidates] @ vector
+        k = min(top_k, candidates.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            VectorMatch(
+                id=self.ids[candidates[i]],
+                score=float(scores[i]),
+                metadata=dict(self.metadata[candidates[i]] or {}),
+            )
+            for i in top
+        ]
+
+    def fetch(self, ids: list[str]) -> list[Vector]:
+        self.refresh()
+        vectors = []
+        for vector_id in ids:
+            row = self.rows.get(vector_id)
+            if row is not None and self._matrix is not None:
+                vectors.append(
+                    {
+                        "id": vector_id,
+                        "values": self._matrix[row].tolist(),
+                        "metadata": dict(self.metadata[row] or {}),
+                    }
+                )
+        return vectors
+
+    def delete(self, conditions: Conditions, ids: list[str] | None = None) -> int:
+        self.refresh()
+        if ids is not None:
+            rows = sorted({self.rows[i] for i in ids if i in self.rows})
+        else:
+            rows = np.flatnonzero(self._mask(conditions)).tolist()
+        if rows:
+            self._append_log([{"op": "delete", "rows": rows}])
+        return len(rows)
+
+
+class LocalVectorStore:
+    """
+    Exact nearest-neighbour search over memory-mapped float32 files.
+
+    Vectors of the default namespace are sharded by `course_id` metadata, so
+    course-filtered queries only touch that course's file and score it with
+    one matrix-vector product. A named namespace is a shard of its own.
+    Meant for small deployments and load tests: any number of processes can
+    read a store, but only one process should write to it.
+    """
+
+    def __init__(self, root: str | Path, dimension: int) -> None:
+        self.root = Path(root)
+        self.dimension = dimension
+        self._shards: dict[str, _Shard] = {}
+        self._lock = threading.RLock()
+        self._ready = False
+
+    def ensure_index(self) -> None:
+        """Create the store directory, or wipe it if its dimension is wrong."""
+        with self._lock:
+            if self._ready:
+                return
+            info_path = self.root / "index.json"
+            if info_path.exists():
+                info = json.loads(info_path.read_text())
+                if info.get("dimension") == self.dimension:
+                    self._ready = True
+                    return
+                shutil.rmtree(self.root)
+                self._shards.clear()
+            self.root.mkdir(parents=True, exist_ok=True)
+            info_path.write_text(json.dumps({"dimension": self.dimension}))
+            self._ready = True
+
+    def _shard(self, name: str) -> _Shard:
+        if name not in self._shards:
+            self._shards[name] = _Shard(self.root / name, self.dimension)
+        return self._shards[name]
+
+    def _shards_for(
+        self, conditions: Conditions, namespace: str | None = None
+    ) -> list[_Shard]:
+        if namespace:
+            name = NAMESPACE_PREFIX + _shard_dir_name(namespace)
+            return [self._shard(name)] if (self.root / name).is_dir() else []
+        for key, values in conditions:
+            if key == SHARD_KEY:
+                names = [_shard_dir_name(v) for v in values]
+                return [self._shard(n) for n in names if (self.root / n).is_dir()]
+        if not self.root.is_dir():
+            return []
+        return [
+            self._shard(p.name)
+            for p in self.root.iterdir()
+            if p.is_dir() and not p.name.startswith(NAMESPACE_PREFIX)
+        ]
+
+    def upsert(self, vectors: list[Vector], namespace: str | None = None) -> None:
+        by_shard: dict[str, list[Vector]] = {}
+        for vector in vectors:
+            if namespace:
+                name = NAMESPACE_PREFIX + _shard_dir_name(namespace)
+            else:
+                course_id = (vector.get("metadata") or {}).get(SHARD_KEY)
+                name = _shard_dir_name(course_id) if course_id else UNASSIGNED_SHARD
+            by_shard.setdefault(name, []).append(vector)
+
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            for name, shard_vectors in by_shard.items():
+                values = np.asarray(
+                    [v["values"] for v in shard_vectors], dtype=np.float32
+                )
+                if values.ndim != 2 or values.shape[1] != self.dimension:
+                    raise ValueError(
+                        f"Expected vectors of dimension {self.dimension}, "
+                        f"got shape {values.shape}"
+                    )
+                self._shard(name).upsert(
+                    [str(v["id"]) for v in shard_vectors],
+                    _normalize(values),
+                    [dict(v.get("metadata") or {}) for v in shard_vectors],
+                )
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        filter: MetadataFilter | None = None,
+        namespace: str | None = None,
+    ) -> list[VectorMatch]:
+        conditions = filter_conditions(filter)
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        with self._lock:
+            matches = [
+                match
+                for shard in self._shards_for(conditions, namespace)
+                for match in shard.query(query, top_k, conditions)
+            ]
+        matches.sort(key=lambda m: m.score, reverse=True)
+        return matches[:top_k]
+
+    def fetch(self, ids: list[str], namespace: str | None = None) -> list[Vector]:
+        with self._lock:
+            found = {
+                vector["id"]: vector
+                for shard in self._shards_for([], namespace)
+                for vector in shard.fetch(ids)
+            }
+        return [found[vector_id] for vector_id in ids if vector_id in found]
+
+    def delete(
+        self,
+        ids: list[str] | None = None,
+        filter: MetadataFilter | None = None,
+        namespace: str | None = None,
+    ) -> None:
+        if not ids and not filter:
+            return
+        conditions = [] if ids else filter_conditions(filter)
+        with self._lock:
+            for shard in self._shards_for(conditions, namespace):
+                shard.delete(conditions, ids or None)
+
+    def delete_namespace(self, namespace: str) -> None:
+        name = NAMESPACE_PREFIX + _shard_dir_name(namespace)
+        with self._lock:
+            self._shards.pop(name, None)
+            shutil.rmtree(self.root / name, ignore_errors=True)
@@ -0,0 +1,152 @@
+"""
+Pinecone-backed vector store
+"""
+
+import threading
+from typing import Any
+
+from pinecone import NotFoundException, Pinecone, ServerlessSpec
+
+from app.vector_stores.base import MetadataFilter, Vector, VectorMatch
+
+# Ids go in the request, so keep fetch and delete-by-id requests short
+FETCH_BATCH_SIZE = 100
+
+
+class PineconeVectorStore:
+    """
+    Pinecone index shared by every request and job in the process.
+
+    The index schema is checked once (the first `ensure_index`) and the
+    data-plane host it reports is reused, so later calls make no control-plane
+    round-trips. The index client keeps a pool of keep-alive connections
+    sized for concurrent upserts and queries.
+    """
+
+    def __init__(
+        self,
+        client: Pinecone,
+        index_name: str,
+        dimension: int,
+        host: str = "",
+        connection_pool_maxsize: int | None = None,
+    ) -> None:
+        self.client = client
+        self.index_name = index_name
+        self.dimension = dimension
+        self.host = host
+        self.connection_pool_maxsize = connection_pool_maxsize
+        self._index: Any = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> Any:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    kwargs: dict[str, Any] = {}
+                    if self.connection_pool_maxsize:
+                        kwargs["connection_pool_maxsize"] = self.connection_pool_maxsize
+                    if self.host:
+                        kwargs["host"] = self.host
+                    else:
+                        kwargs["name"] = self.index_name
+                    self._index = self.client.Index(**kwargs)
+        return self._index
+
+    def _create_index(self) -> None:
+        self.client.create_index(
+            name=self.index_name,
+            dimension=self.dimension,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+        )
+
+    def ensure_index(self) -> None:
+        """
+        Ensure the index exists with the correct dimension, recreate if wrong.
+
+        Only the first successful call talks to the control plane.
+        """
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            if self.client.has_index(self.index_name):
+                existing = self.client.describe_index(self.index_name)
+                if existing.dimension != self.dimension:
+                    self.client.delete_index(self.index_name)
+                    self._create_index()
+                    existing = self.client.describe_index(self.index_name)
+                    self._index = None
+            else:
+                self._create_index()
+                existing = self.client.describe_index(self.index_name)
+            if not self.host and existing.host:
+                self.host = existing.host
+            self._ready = True
+
+    def upsert(self, vectors: list[Vector], namespace: str | None = None) -> None:
+        self.index.upsert(vectors=vectors, namespace=namespace or "")
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        filter: MetadataFilter | None = None,
+        namespace: str | None = None,
+    ) -> list[VectorMatch]:
+        result = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            filter=filter,
+            namespace=namespace or "",
+            include_metadata=True,
+        )
+        return [
+            VectorMatch(id=m.id, score=m.score, metadata=dict(m.metadata or {}))
+            for m in result.matches
+        ]
+
+    def fetch(self, ids: list[str], namespace: str | None = None) -> list[Vector]:
+        vectors = []
+        for i in range(0, len(ids), FETCH_BATCH_SIZE):
+            result = self.index.fetch(
+                ids=ids[i : i + FETCH_BATCH_SIZE], namespace=namespace or ""
+            )
+            vectors.extend(
+                {
+                    "id": vector.id,
+                    "values": list(vector.values),
+                    "metadata": dict(vector.metadata or {}),
+                }
+                for vector in result.vectors.values()
+            )
+        return vectors
+
+    def delete(
+        self,
+        ids: list[str] | None = None,
+        filter: MetadataFilter | None = None,
+        namespace: str | None = None,
+    ) -> None:
+        if not self._ready and not self.client.has_index(self.index_name):
+            return
+        if ids:
+            for i in range(0, len(ids), FETCH_BATCH_SIZE):
+                self.index.delete(
+                    ids=ids[i : i + FETCH_BATCH_SIZE], namespace=namespace or ""
+                )
+        elif filter:
+            self.index.delete(filter=filter, namespace=namespace or "")
+
+    def delete_namespace(self, namespace: str) -> None:
+        if not self._ready and not self.client.has_index(self.index_name):
+            return
+        try:
+            self.index.delete(delete_all=True, namespace=namespace)
+        except NotFoundException:
+            # Nothing was ever written to it
+            pass
@@ -0,0 +1,142 @@
+"""
+Standalone ingestion worker.
+
+Run with `python -m app.worker`. Any number of workers (and the embedded
+worker in the API process, when enabled) can share the same job table.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+
+from sqlmodel import Session
+
+from app.api.routes.documents import process_pdf_task, rebuild_document_task
+from app.core.config import settings
+from app.core.db import engine
+from app.models.jobs import IngestionJob, JobKind, JobStatus
+from app.services.job_queue import claim_job, complete_job, fail_job, renew_lease
+from app.services.namespaces import move_document_vectors
+from app.services.pdf_extraction import shutdown_extraction_executor
+from app.services.uploads import discard_upload
+from app.services.vector_upsert import shutdown_upsert_executor
+from app.tasks import generate_flashcards_task, generate_quizzes_task
+from app.vector_stores import get_vector_store, warm_vector_store
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_job(job: IngestionJob) -> None:
+    # Tasks open their own short-lived sessions per stage
+    if job.kind == JobKind.PROCESS_PDF:
+        await process_pdf_task(
+            job.payload["file_path"],
+            job.document_id,
+            uuid.UUID(job.payload["course_id"]),
+            content_sha256=job.payload.get("sha256"),
+            replace=job.payload.get("replace", False),
+        )
+    elif job.kind == JobKind.GENERATE_QUIZZES:
+        await generate_quizzes_task(job.document_id)
+    elif job.kind == JobKind.GENERATE_FLASHCARDS:
+        await generate_flashcards_task(
+            job.document_id, force=job.payload.get("force", False)
+        )
+    elif job.kind == JobKind.MOVE_VECTORS:
+        await move_document_vectors(job.document_id, get_vector_store())
+    elif job.kind in (JobKind.RECHUNK, JobKind.REEMBED):
+        await rebuild_document_task(
+            job.document_id, reembed=job.kind == JobKind.REEMBED
+        )
+    else:
+        raise ValueError(f"Unknown job kind: {job.kind}")
+
+
+async def _keep_lease(job_id: uuid.UUID, worker_id: str) -> None:
+    interval = settings.INGESTION_JOB_LEASE_SECONDS / 3
+    while True:
+        await asyncio.sleep(interval)
+        with Session(engine) as session:
+            if not renew_lease(session, job_id, worker_id):
+                logger.warning(f"[worker] Lost lease on job {job_id}")
+                return
+
+
+async def _run_claimed_job(job: IngestionJob, worker_id: str) -> None:
+    logger.info(
+        f"[worker] {worker_id} running {job.kind.value} job {job.id} "
+        f"(attempt {job.attempts}/{job.max_attempts})"
+    )
+    heartbeat = asyncio.create_task(_keep_lease(job.id, worker_id))
+    try:
+        await run_job(job)
+    except Exception as e:
+        logger.error(f"[worker] Job {job.id} failed: {e}")
+        with Session(engine) as session:
+            failed = fail_job(session, job.id, str(e))
+        if failed and failed.status == JobStatus.FAILED:
+            discard_upload(job)
+    else:
+        with Session(engine) as session:
+            complete_job(session, job.id)
+        discard_upload(job)
+    finally:
+        heartbeat.cancel()
+
+
+async def _worker_slot(worker_id: str, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            with Session(engine) as session:
+                job = claim_job(session, worker_id)
+        except Exception as e:
+            logger.error(f"[worker] Failed to claim a job: {e}")
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(
+                    stop.wait(), timeout=settings.INGESTION_JOB_POLL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        await _run_claimed_job(job, worker_id)
+
+
+async def run_worker(stop: asyncio.Event, concurrency: int | None = None) -> None:
+    """Run job slots until `stop` is set; each slot finishes its current job."""
+    concurrency = max(1, concurrency or settings.INGESTION_WORKER_CONCURRENCY)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    await asyncio.gather(
+        *(_worker_slot(f"{worker_id}:{slot}", stop) for slot in range(concurrency))
+    )
+
+
+async def _main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await asyncio.to_thread(warm_vector_store)
+    logger.info("Ingestion worker started")
+    try:
+        await run_worker(stop)
+    finally:
+        shutdown_extraction_executor()
+        shutdown_upsert_executor()
+    logger.info("Ingestion worker stopped")
+
+
+def main() -> None:
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
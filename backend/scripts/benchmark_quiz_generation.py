@@ -0,0 +1,69 @@
+"""
+Benchmark quiz generation: one prompt per difficulty level vs one combined prompt.
+
+Chunks a PDF the way ingestion does and generates its quiz bank in both modes
+against the real model (needs OPENAI_API_KEY). The LLM completion cache is
+switched off for the run, so every prompt reaches the model, repeat runs
+measure the same work, and nothing is written to the database. Reports
+prompts sent, prompt and completion tokens, wall-clock latency and the
+quizzes kept per level.
+
+Usage: python scripts/benchmark_quiz_generation.py path/to/file.pdf [--repeat N]
+"""
+
+import argparse
+import asyncio
+import logging
+import uuid
+from collections import Counter
+
+from pypdf import PdfReader
+
+from app.core.config import settings
+from app.services.chunking import TokenChunker
+from app.tasks import generate_quiz_bank
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def chunk_pdf(file_path: str) -> list[tuple[uuid.UUID, str]]:
+    with open(file_path, "rb") as f:
+        pages = [page.extract_text() or "" for page in PdfReader(f).pages]
+    chunker = TokenChunker()
+    chunks = [chunk for page in pages for chunk in chunker.feed(page)]
+    chunks += chunker.flush()
+    return [(uuid.uuid4(), chunk) for chunk in chunks]
+
+
+async def run_case(
+    name: str, chunks: list[tuple[uuid.UUID, str]], combined: bool, repeat: int
+) -> None:
+    for attempt in range(1, repeat + 1):
+        quizzes, stats = await generate_quiz_bank(
+            uuid.uuid4(), chunks, combined=combined
+        )
+        per_level = Counter(quiz.difficulty_level.value for quiz in quizzes)
+        logger.info(
+            f"{name:<15} #{attempt} prompts={stats.prompts:<4} "
+            f"failed={stats.failed:<3} prompt_tokens={stats.prompt_tokens:<8} "
+            f"completion_tokens={stats.completion_tokens:<7} "
+            f"seconds={stats.seconds:7.2f} quizzes={dict(per_level)}"
+        )
+
+
+async def main(file_path: str, repeat: int) -> None:
+    chunks = chunk_pdf(file_path)
+    logger.info(f"{len(chunks)} chunks")
+    await run_case("per_difficulty", chunks, combined=False, repeat=repeat)
+    await run_case("combined", chunks, combined=True, repeat=repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file_path")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    # Cached completions would skip the model and store rows in the database
+    settings.LLM_CACHE_ENABLED = False
+    asyncio.run(main(args.file_path, args.repeat))
@@ -1,5 +1,5 @@
 import { type NextRequest, NextResponse } from 'next/server'
-import { CoursesService, QaItem } from '@/client'
+import { CoursesService, Message, QaItem } from '@/client'
 import { get } from '@/utils'
 import API_ROUTES from '@/services/url-services'
 
@@ -8,12 +8,12 @@ interface ErrorResponse {
 }
 
 /**
- * Get flashcards
+ * Get flashcards, or a 202 message while the deck is still being generated
  */
 export async function GET(
   _req: NextRequest,
   ctx: RouteContext<typeof API_ROUTES.FLASHCARDS>,
-): Promise<NextResponse<QaItem[] | ErrorResponse>> {
+): Promise<NextResponse<QaItem[] | Message | ErrorResponse>> {
   try {
     const { id } = await ctx.params;
 
@@ -22,9 +22,9 @@ export async function GET(
       responseValidator: async (): Promise<void> => { },
     });
 
-    const flashcardList: QaItem[] = response.data as QaItem[];
+    const body = response.data as QaItem[] | Message;
 
-    return NextResponse.json(flashcardList);
+    return NextResponse.json(body, { status: response.status });
   } catch (error) {
     const clientError = error as Record<string, never>
 
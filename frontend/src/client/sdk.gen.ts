@@ -809,7 +809,14 @@ export class CoursesService {
 
     /**
      * Generate Flashcards By Course Id
-     * Generate flashcards for the most recent document associated with a course.
+     * Flashcards for the most recent document associated with a course.
+     *
+     * Decks are generated by a background job when a document finishes
+     * processing and served from the database; this endpoint never calls
+     * the LLM or queues work. While the document is processing or its deck
+     * job is waiting it answers 202; without a deck otherwise (the job failed
+     * for good, or the document predates decks) it answers 404 and
+     * POST /{id}/flashcards/regenerate queues one.
      */
     public static getApiV1CoursesByIdFlashcards<ThrowOnError extends boolean = true>(options: Options<GetApiV1CoursesByIdFlashcardsData, ThrowOnError>) {
         return (options.client ?? client).get<GetApiV1CoursesByIdFlashcardsResponses, GetApiV1CoursesByIdFlashcardsErrors, ThrowOnError>({
@@ -1862,6 +1862,10 @@ export type GetApiV1CoursesByIdFlashcardsResponses = {
      * Successful Response
      */
     200: Array<QaItem>;
+    /**
+     * Accepted
+     */
+    202: Message;
 };
 
 export type GetApiV1CoursesByIdFlashcardsResponse = GetApiV1CoursesByIdFlashcardsResponses[keyof GetApiV1CoursesByIdFlashcardsResponses];
@@ -966,11 +966,10 @@ export const zGetApiV1CoursesByIdFlashcardsData = z.object({
     query: z.optional(z.never())
 });
 
-/**
- * Response Courses-Generate Flashcards By Course Id
- * Successful Response
- */
-export const zGetApiV1CoursesByIdFlashcardsResponse = z.array(zQaItem);
+export const zGetApiV1CoursesByIdFlashcardsResponse = z.union([
+    z.array(zQaItem),
+    zMessage
+]);
 
 export const zPostApiV1ChatByCourseIdStreamData = z.object({
     body: zChatMessage,
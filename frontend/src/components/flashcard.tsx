@@ -1,6 +1,6 @@
 'use client'
 
-import React, {useState} from 'react'
+import React, {useEffect, useState} from 'react'
 import {motion, AnimatePresence} from 'framer-motion'
 import {getFlashcards} from '@/lib/flashcards'
 
@@ -13,6 +13,8 @@ export default function Flashcard({courseId}) {
   const [index, setIndex] = useState(0)
   const [showAnswer, setShowAnswer] = useState(false)
   const [loading, setLoading] = useState(false)
+  const [pending, setPending] = useState(false)
+  const [message, setMessage] = useState('')
 
   const handleNext = () => {
     setShowAnswer(false)
@@ -29,10 +31,18 @@ export default function Flashcard({courseId}) {
   const generateFlashcards = async () => {
     setLoading(true)
     try {
-      const flashcardsRaw = await getFlashcards(courseId)
-      const flashcards = flashcardsRaw.data || []
-      if (flashcards.length > 0) {
-        setFlashcards(flashcards)
+      const result = await getFlashcards(courseId)
+      if (!result.ok) {
+        setPending(false)
+        setMessage(result.error.message)
+      } else if (result.data.status === 'pending') {
+        // The deck is built by a background job; poll until it is ready
+        setPending(true)
+        setMessage(result.data.message)
+      } else {
+        setPending(false)
+        setMessage('')
+        setFlashcards(result.data.cards)
       }
       setLoading(false)
     } catch (err) {
@@ -40,12 +50,22 @@ export default function Flashcard({courseId}) {
     }
   }
 
+  useEffect(() => {
+    if (!pending) return
+
+    const intervalId = setInterval(() => {
+      generateFlashcards()
+    }, 5000)
+
+    return () => clearInterval(intervalId)
+  }, [pending, courseId])
+
   return (
     <div>
       <div className='mb-9'>
-        <Button onClick={() => generateFlashcards()} disabled={loading}>
-          {loading ? <Loader /> : null}
-          {loading ? 'Generating flashcards' : 'Generate Flashcards'}
+        <Button onClick={() => generateFlashcards()} disabled={loading || pending}>
+          {loading || pending ? <Loader /> : null}
+          {loading || pending ? 'Generating flashcards' : 'Generate Flashcards'}
         </Button>
       </div>
       {cards.length > 0 ? (
@@ -119,7 +139,8 @@ export default function Flashcard({courseId}) {
         </div>
       ) : (
         <div>
-          No flashcards available yet. You can click on generate to create.
+          {message ||
+            'No flashcards available yet. You can click on generate to create.'}
         </div>
       )}
     </div>
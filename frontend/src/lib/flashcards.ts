@@ -1,13 +1,18 @@
 import {
+  Message,
   QaItem
 } from "@/client";
 import { Result } from '@/lib/result'
 import { mapApiError } from '@/lib/mapApiError'
 import API_ROUTES, { buildApiPath } from '@/services/url-services'
 
+export type Flashcards =
+  | { status: 'ready'; cards: QaItem[] }
+  | { status: 'pending'; message: string }
+
 export async function getFlashcards(
   id: string,
-): Promise<Result<QaItem[]>> {
+): Promise<Result<Flashcards>> {
   const apiUrl = buildApiPath(API_ROUTES.FLASHCARDS, { id: id })
   try {
     const res = await fetch(apiUrl, {
@@ -15,7 +20,21 @@ export async function getFlashcards(
       headers: { 'Content-Type': 'application/json' },
       credentials: 'include',
     })
-    return { ok: true, data: (await res.json()) }
+    const body = await res.json()
+    if (!res.ok) {
+      return {
+        ok: false,
+        error: {
+          code: `HTTP_${res.status}`,
+          message: body?.detail ?? 'Something went wrong',
+          status: res.status,
+        },
+      }
+    }
+    if (res.status === 202) {
+      return { ok: true, data: { status: 'pending', message: (body as Message).message } }
+    }
+    return { ok: true, data: { status: 'ready', cards: body as QaItem[] } }
   } catch (error) {
     return {
       ok: false,